@@ -0,0 +1 @@
+"""Benchmarks for Smarter Kettle and Coffee integration."""
@@ -0,0 +1,119 @@
+"""
+Run every benchmark and store the results for comparison across commits.
+
+Results are written to ``benchmarks/results/<commit>.json``. Pass ``--compare``
+with an earlier results file to print the relative change of every metric.
+
+Run with ``python -m benchmarks``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime
+import json
+import platform
+import subprocess
+from pathlib import Path
+
+from . import bench_database, bench_entity_state, bench_ingest, bench_storage
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+def current_commit() -> str:
+    """Return the abbreviated hash of the checked out commit."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+    dirty = subprocess.run(
+        ["git", "diff", "--quiet", "HEAD"], capture_output=True, check=False
+    )
+    return f"{commit}-dirty" if dirty.returncode else commit
+
+
+def run_all(recording: Path | None = None) -> dict[str, dict[str, float]]:
+    """Run every benchmark, keyed by benchmark and scenario."""
+    results = {
+        f"ingest.{scenario}": result
+        for scenario, result in bench_ingest.run(recording=recording).items()
+    }
+    results["entity_state.cached"] = bench_entity_state.run(
+        devices=50, reads_per_write=2, recompute=False
+    )
+    for scenario, result in bench_database.run(items=5000, reads=20).items():
+        results[f"database.{scenario}"] = result
+    for mode, result in bench_storage.run(size_mb=64).items():
+        results[f"storage.{mode}"] = result
+    return results
+
+
+def compare(results: dict, baseline: dict) -> None:
+    """Print the relative change of every metric against a baseline."""
+    for name, metrics in results["benchmarks"].items():
+        previous = baseline["benchmarks"].get(name)
+        if previous is None:
+            print(f"{name}: not in baseline")
+            continue
+        print(f"{name}:")
+        for metric, value in metrics.items():
+            before = previous.get(metric)
+            if not before:
+                continue
+            print(
+                f"  {metric:>28}: {before:12.3f} -> {value:12.3f} "
+                f"({(value - before) / before:+.1%})"
+            )
+
+
+def main() -> None:
+    """Run the benchmarks from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--compare",
+        type=Path,
+        metavar="RESULTS",
+        help="results file of an earlier run to compare against",
+    )
+    parser.add_argument(
+        "--recording",
+        type=Path,
+        help="stream recording to replay through the ingestion benchmark",
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        help="file to store results in (default: benchmarks/results/<commit>.json)",
+    )
+    args = parser.parse_args()
+
+    commit = current_commit()
+    results = {
+        "commit": commit,
+        "timestamp": datetime.datetime.now(datetime.UTC).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "benchmarks": run_all(args.recording),
+    }
+
+    output = args.output or RESULTS_DIR / f"{commit}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2) + "\n")
+    print(f"Results written to {output}")
+
+    if args.compare:
+        compare(results, json.loads(args.compare.read_text()))
+    else:
+        for name, metrics in results["benchmarks"].items():
+            print(f"{name}: {json.dumps(metrics)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""
+Benchmark reading list and dict responses through ``Database.get``.
+
+A response is served from memory as the encoded JSON of a Firebase node, so
+the benchmark measures what the client does with it: decoding the JSON and
+turning it into the value returned by ``PyreResponse.raw()``, as
+``SmarterClient`` does for every fetch, and iterating the items of a response
+with ``PyreResponse.each()``.
+
+Two scenarios are measured: a list of command instances, as Firebase returns
+for nodes keyed by consecutive integers, and a dict of command instances keyed
+by push identifiers, as stored under ``devices/<id>/commands/<name>``.
+Allocation is measured in a separate pass under ``tracemalloc`` as the peak
+memory traced while reading a response, and reported next to the peak of
+decoding the JSON alone, which every approach has to pay. Iterating is
+measured on a fresh response every time, together with reading it.
+
+The generation of push IDs, as used for the keys of written command instances,
+is measured too.
+
+Run with ``python -m benchmarks.bench_database``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import time
+import tracemalloc
+from collections.abc import Callable
+from typing import Any
+
+from custom_components.smarter.pyrebase.pyrebase import (
+    Database,
+    PyreResponse,
+    generate_push_id,
+)
+
+
+def make_instance(index: int) -> dict[str, Any]:
+    """Return a command instance as stored by the Smarter API."""
+    return {
+        "user_id": "user0",
+        "value": index,
+        "state": "success",
+        "response": {"code": 0},
+    }
+
+
+def list_payload(items: int) -> list[dict[str, Any]]:
+    """Return a list node of `items` command instances."""
+    return [make_instance(index) for index in range(items)]
+
+
+def dict_payload(items: int) -> dict[str, dict[str, Any]]:
+    """Return a dict node of `items` command instances keyed by push ID."""
+    return {f"-instance{index:06d}": make_instance(index) for index in range(items)}
+
+
+class MemoryResponse:
+    """Response serving encoded JSON from memory."""
+
+    def __init__(self, content: bytes) -> None:
+        """Initialize the response."""
+        self.content = content
+
+    def json(self, **kwargs: Any) -> Any:
+        """Decode the content, as requests does."""
+        return json.loads(self.content, **kwargs)
+
+    def raise_for_status(self) -> None:
+        """Accept the response."""
+
+
+class MemorySession:
+    """Session answering every request with the same content."""
+
+    def __init__(self, content: bytes) -> None:
+        """Initialize the session."""
+        self.content = content
+
+    def get(self, url: str, **kwargs: Any) -> MemoryResponse:
+        """Return the content."""
+        return MemoryResponse(self.content)
+
+
+def measure(read: Callable[[], Any], reads: int) -> tuple[float, int]:
+    """Return the seconds per call of `read` and the peak memory it traced."""
+    started = time.perf_counter()
+    for _ in range(reads):
+        read()
+    elapsed = (time.perf_counter() - started) / reads
+
+    peaks = []
+    tracemalloc.start()
+    try:
+        for _ in range(reads):
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+            read()
+            peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+    finally:
+        tracemalloc.stop()
+
+    return elapsed, int(statistics.median(peaks))
+
+
+def run_scenario(payload: Any, reads: int) -> dict[str, float]:
+    """Read a payload through the database and summarise time and allocations."""
+    content = json.dumps(payload).encode()
+    database = Database(None, "api-key", "https://memory/", MemorySession(content))
+
+    def get() -> PyreResponse:
+        return database.child("devices").child("kettle0").get("token")
+
+    def iterate(response: PyreResponse) -> None:
+        for pyre in response.each():
+            pyre.val()
+
+    seconds, peak = measure(lambda: get().raw(), reads)
+    _, decode_peak = measure(lambda: json.loads(content), reads)
+    each_seconds, each_peak = measure(lambda: iterate(get()), reads)
+
+    return {
+        "items": len(payload),
+        "response_bytes": len(content),
+        "read_ms": seconds * 1000,
+        "reads_per_second": 1 / seconds,
+        "peak_alloc_bytes": peak,
+        "decode_peak_alloc_bytes": decode_peak,
+        "overhead_alloc_bytes": peak - decode_peak,
+        "each_ms": each_seconds * 1000,
+        "each_peak_alloc_bytes": each_peak,
+        "each_overhead_alloc_bytes": each_peak - peak,
+    }
+
+
+def run_push_ids(count: int) -> dict[str, float]:
+    """Generate `count` push IDs and summarise their throughput."""
+    started = time.perf_counter()
+    for _ in range(count):
+        generate_push_id()
+    elapsed = time.perf_counter() - started
+
+    return {
+        "ids": count,
+        "id_us": elapsed / count * 1e6,
+        "ids_per_second": count / elapsed,
+    }
+
+
+def run(
+    items: int = 5000, reads: int = 20, push_ids: int = 100_000
+) -> dict[str, dict[str, float]]:
+    """Run the list and dict scenarios and the push ID generation."""
+    return {
+        "list": run_scenario(list_payload(items), reads),
+        "dict": run_scenario(dict_payload(items), reads),
+        "push_id": run_push_ids(push_ids),
+    }
+
+
+def main() -> None:
+    """Run the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--items",
+        type=int,
+        default=5000,
+        help="items in every response",
+    )
+    parser.add_argument("--reads", type=int, default=20)
+    args = parser.parse_args()
+
+    results = run(args.items, args.reads)
+    push_ids = results.pop("push_id")
+    for scenario, result in results.items():
+        print(
+            f"{scenario:>4}: {result['items']} items in {result['response_bytes']} B, "
+            f"{result['read_ms']:.3f} ms/read, "
+            f"peak {result['peak_alloc_bytes']} B "
+            f"({result['overhead_alloc_bytes']:+} B over decoding), "
+            f"each() {result['each_ms']:.3f} ms, "
+            f"{result['each_overhead_alloc_bytes']:+} B over reading"
+        )
+    print(
+        f"push IDs: {push_ids['id_us']:.3f} us/id, {push_ids['ids_per_second']:.0f}/s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""
+Benchmark entity state computation over a simulated boil cycle.
+
+Every status change notifies each entity of a device once, after which Home
+Assistant reads the state properties of the entity while writing its state. The
+benchmark compares the cached implementation (derived state computed once per
+notification) against recomputing the derived state on every property read.
+
+Run with ``python -m benchmarks.bench_entity_state``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from collections.abc import Iterator
+from types import SimpleNamespace
+
+from custom_components.smarter.binary_sensor import (
+    BINARY_SENSOR_TYPES,
+    SmarterBinarySensor,
+)
+from custom_components.smarter.entity import SmarterEntity
+from custom_components.smarter.number import NUMBER_TYPES, SmarterNumber
+from custom_components.smarter.sensor import (
+    HISTORY_SENSOR_TYPES,
+    SENSOR_TYPES,
+    SmarterDeviceSensor,
+    SmarterHistorySensor,
+    SmarterSensor,
+    SmarterSensorEntityDescription,
+)
+from custom_components.smarter.smarter_client.history import StatusHistory
+from custom_components.smarter.switch import SWITCH_TYPES, SmarterSwitch
+
+# Properties read by Home Assistant when writing the state of an entity.
+STATE_PROPERTIES = (
+    "available",
+    "native_value",
+    "is_on",
+    "extra_state_attributes",
+)
+
+
+def boil_cycle(start: float = 20.0, target: float = 100.0) -> Iterator[dict]:
+    """Yield the status payloads a kettle reports during a boil cycle."""
+    status = {
+        "device_model": "SMKET01",
+        "firmware_version": "1.0.0",
+        "state": "Ready",
+        "boil_temperature": target,
+        "target_temperature": target,
+        "water_temperature": start,
+        "water_level": 3,
+        "keep_warm_time": 5,
+        "kettle_is_present": True,
+        "calibrated": True,
+    }
+    yield dict(status)
+
+    status["state"] = "Boiling"
+    temperature = start
+    while temperature < target:
+        temperature += 0.5
+        status["water_temperature"] = temperature
+        yield dict(status)
+
+    status["state"] = "Keeping Warm"
+    yield dict(status)
+    status["state"] = "Ready"
+    yield dict(status)
+
+
+def make_device(index: int) -> SimpleNamespace:
+    """Create a lightweight stand-in for a managed kettle."""
+    identifier = f"kettle{index}"
+    device = SimpleNamespace(
+        id=identifier,
+        type="kettle",
+        model="SMKET01",
+        firmware_version="1.0.0",
+        friendly_name=f"Kettle {index}",
+        status={},
+        history=StatusHistory(),
+    )
+    device.device = SimpleNamespace(identifier=identifier, status=device.status)
+    return device
+
+
+def make_coordinator() -> SimpleNamespace:
+    """
+    Create a stand-in for the coordinator of a config entry.
+
+    Without coordinator data, entities read the status from their device.
+    """
+    return SimpleNamespace(data=None, changed=set(), last_update_success=True)
+
+
+def make_entities(device, coordinator=None) -> list[SmarterEntity]:
+    """Create every entity the integration sets up for a device."""
+    coordinator = coordinator or make_coordinator()
+    return [
+        *(
+            SmarterSensor(coordinator, device, description)
+            for description in SENSOR_TYPES
+        ),
+        SmarterDeviceSensor(
+            coordinator,
+            device,
+            SmarterSensorEntityDescription(key="device", name=None),
+        ),
+        *(
+            SmarterHistorySensor(coordinator, device, description)
+            for description in HISTORY_SENSOR_TYPES
+        ),
+        *(
+            SmarterBinarySensor(coordinator, device, description)
+            for description in BINARY_SENSOR_TYPES
+        ),
+        *(
+            SmarterNumber(coordinator, device, description)
+            for description in NUMBER_TYPES
+        ),
+        *(
+            SmarterSwitch(coordinator, device, description)
+            for description in SWITCH_TYPES
+        ),
+    ]
+
+
+def read_state(entity: SmarterEntity, recompute: bool) -> None:
+    """Read the state properties of an entity as a state write would."""
+    for name in STATE_PROPERTIES:
+        if recompute:
+            entity._update_derived_state()
+        getattr(entity, name, None)
+
+
+def run(devices: int, reads_per_write: int, recompute: bool) -> dict[str, float]:
+    """Simulate a boil cycle on every device and time the state writes."""
+    device_entities = []
+    for index in range(devices):
+        device = make_device(index)
+        device_entities.append((device, make_entities(device)))
+
+    writes = 0
+    started = time.perf_counter()
+    for status in boil_cycle():
+        for device, entities in device_entities:
+            device.status = device.device.status = status
+            device.history.append(status)
+            for entity in entities:
+                if not recompute:
+                    entity._update_derived_state()
+                for _ in range(reads_per_write):
+                    read_state(entity, recompute)
+                writes += 1
+    elapsed = time.perf_counter() - started
+
+    return {
+        "state_writes": writes,
+        "seconds": elapsed,
+        "writes_per_second": writes / elapsed,
+    }
+
+
+def main() -> None:
+    """Run the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--devices", type=int, default=50)
+    parser.add_argument("--reads-per-write", type=int, default=2)
+    args = parser.parse_args()
+
+    for label, recompute in (("recompute on read", True), ("cached", False)):
+        result = run(args.devices, args.reads_per_write, recompute)
+        print(
+            f"{label:>18}: {result['state_writes']} state writes in "
+            f"{result['seconds']:.3f}s ({result['writes_per_second']:.0f}/s)"
+        )
+
+
+if __name__ == "__main__":
+    main()
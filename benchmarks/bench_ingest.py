@@ -0,0 +1,288 @@
+"""
+Benchmark the event ingestion path from raw stream bytes to entity state.
+
+Each event is served as raw server-sent event text to the stream client and
+follows the path a live update takes: ``SSEClient`` parsing, JSON decoding in
+``Stream.start_stream``, ``Device._on_event`` applying the update to the device
+model, ``BaseDevice._on_event`` notifying subscribers and every entity of the
+device recomputing its state.
+
+Two scenarios are measured: small status patches, as reported during a boil
+cycle, and large puts of the whole device, as sent when a stream (re)connects.
+A stream recording (see ``smarter_client.recording``) can be replayed as a
+third scenario with ``--recording``.
+Latency is measured from the first byte of an event to the last entity update.
+Allocation is measured in a separate pass under ``tracemalloc`` as the peak
+memory traced while handling an event.
+
+Run with ``python -m benchmarks.bench_ingest``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import time
+import tracemalloc
+from collections.abc import Callable, Iterator
+from types import SimpleNamespace
+from typing import Any
+
+from custom_components.smarter.pyrebase.pyrebase import Stream
+from custom_components.smarter.smarter_client.domain.models import Device
+from custom_components.smarter.smarter_client.managed_devices.kettle_v3 import (
+    SmarterKettleV3,
+)
+from custom_components.smarter.smarter_client.metrics import Metrics
+from custom_components.smarter.smarter_client.recording import read_recording
+
+from .bench_entity_state import boil_cycle, make_entities
+
+DEVICE_ID = "kettle0"
+USER_ID = "user0"
+
+
+def make_device_data(history: int) -> dict[str, Any]:
+    """Create the database node of a kettle with `history` instances per command."""
+    return {
+        "commands": {
+            name: {
+                "example": {"value": 0},
+                **{
+                    f"-instance{index:04d}": {
+                        "user_id": USER_ID,
+                        "value": index,
+                        "state": "success",
+                        "response": {"code": 0},
+                    }
+                    for index in range(history)
+                },
+            }
+            for name in sorted(SmarterKettleV3.typed_commands)
+        },
+        "settings": {"network": "network0", "network_ssid": "kitchen"},
+        "status": next(boil_cycle()),
+    }
+
+
+def status_patches() -> list[dict[str, Any]]:
+    """Return the status patch events of a boil cycle."""
+    events = []
+    previous: dict[str, Any] = {}
+    for status in boil_cycle():
+        changes = {
+            key: value for key, value in status.items() if previous.get(key) != value
+        }
+        events.append({"event": "patch", "path": "/status", "data": changes})
+        previous = status
+    return events
+
+
+def device_puts(device_data: dict[str, Any], count: int) -> list[dict[str, Any]]:
+    """Return `count` put events replacing the whole device."""
+    return [{"event": "put", "path": "/", "data": device_data}] * count
+
+
+def encode_events(events: list[dict[str, Any]]) -> list[str]:
+    """Encode events as the server-sent event text a stream receives."""
+    encoded = []
+    for index, event in enumerate(events):
+        # Ask the client to reconnect immediately once the stream is exhausted
+        retry = "retry: 1\n" if index == 0 else ""
+        data = json.dumps({"path": event["path"], "data": event["data"]})
+        encoded.append(f"event: {event['event']}\n{retry}data: {data}\n\n")
+    return encoded
+
+
+class ReplayResponse:
+    """Streaming response serving pre-encoded events."""
+
+    def __init__(self, events: list[str], on_event_start: Callable[[], None]) -> None:
+        """Initialize the response."""
+        self._events = events
+        self._on_event_start = on_event_start
+
+    def iter_content(self, decode_unicode: bool = False) -> Iterator[str]:
+        """Yield the events one character at a time, as requests does."""
+        for event in self._events:
+            self._on_event_start()
+            yield from event
+
+    def raise_for_status(self) -> None:
+        """Accept the response."""
+
+    def close(self) -> None:
+        """Close the response."""
+
+
+class ReplaySession:
+    """Session serving a single replay response, then refusing to reconnect."""
+
+    def __init__(self, response: ReplayResponse) -> None:
+        """Initialize the session."""
+        self._response = response
+
+    def get(self, url: str, **kwargs: Any) -> ReplayResponse:
+        """Return the replay response on the first request only."""
+        if self._response is None:
+            # Propagates out of the stream iterator and ends start_stream
+            raise StopIteration
+        response, self._response = self._response, None
+        return response
+
+
+class ReplayStream(Stream):
+    """Stream reading from a replay session instead of the network."""
+
+    def __init__(self, session: ReplaySession, stream_handler) -> None:
+        """Run the stream to completion."""
+        self._session = session
+        super().__init__(
+            f"replay://devices/{DEVICE_ID}", stream_handler, dict, None, False
+        )
+
+    def make_session(self) -> ReplaySession:
+        """Return the replay session."""
+        return self._session
+
+
+def make_kettle(device_data: dict[str, Any]) -> SmarterKettleV3:
+    """Create a managed kettle from its database node without a client."""
+    client = SimpleNamespace(metrics=Metrics())
+    device = Device.from_data(client, device_data, DEVICE_ID)
+    device.is_stub = False
+    return SmarterKettleV3(device, USER_ID)
+
+
+def replay(
+    device_data: dict[str, Any],
+    events: list[str],
+    trace_memory: bool,
+) -> tuple[list[float], list[int]]:
+    """
+    Replay events through the ingestion path.
+
+    Returns the latency of every event in seconds and, when tracing memory, the
+    peak memory in bytes traced while handling every event.
+    """
+    kettle = make_kettle(device_data)
+    for entity in make_entities(kettle):
+        kettle._status_subscriptions.add(
+            lambda status, entity=entity: entity._update_derived_state()
+        )
+
+    started: list[float] = []
+    latencies: list[float] = []
+    baselines: list[int] = []
+    peaks: list[int] = []
+
+    def on_event_start() -> None:
+        if trace_memory:
+            tracemalloc.reset_peak()
+            baselines.append(tracemalloc.get_traced_memory()[0])
+        started.append(time.perf_counter())
+
+    def on_data(event: dict) -> None:
+        # Mirrors the handler installed by Device.watch
+        kettle.device._on_event(event)
+        kettle._on_event(event)
+        latencies.append(time.perf_counter() - started[len(latencies)])
+        if trace_memory:
+            peaks.append(tracemalloc.get_traced_memory()[1] - baselines[len(peaks)])
+
+    session = ReplaySession(ReplayResponse(events, on_event_start))
+    if trace_memory:
+        tracemalloc.start()
+    try:
+        ReplayStream(session, on_data)
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+
+    assert len(latencies) == len(events), "not every event reached the entities"
+    return latencies, peaks
+
+
+def percentile(values: list[float], percent: int) -> float:
+    """Return the `percent` percentile of `values`."""
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[percent - 1]
+
+
+def run_scenario(device_data: dict[str, Any], events: list[dict]) -> dict[str, float]:
+    """Replay a scenario and summarise its throughput, latency and allocations."""
+    encoded = encode_events(events)
+
+    started = time.perf_counter()
+    latencies, _ = replay(device_data, encoded, trace_memory=False)
+    elapsed = time.perf_counter() - started
+    _, peaks = replay(device_data, encoded, trace_memory=True)
+
+    return {
+        "events": len(events),
+        "event_bytes": sum(map(len, encoded)) // len(encoded),
+        "seconds": elapsed,
+        "events_per_second": len(events) / elapsed,
+        "latency_p50_ms": percentile(latencies, 50) * 1000,
+        "latency_p99_ms": percentile(latencies, 99) * 1000,
+        "peak_alloc_bytes_per_event": statistics.median(peaks),
+    }
+
+
+def recorded_events(path: str) -> tuple[dict[str, Any], list[dict[str, Any]]]:
+    """
+    Return the device data and events of a stream recording.
+
+    A recording starts with the put of the whole device sent when the stream
+    connects, which provides the initial device data.
+    """
+    events = [event for _, event in read_recording(path)]
+    if not events or events[0]["event"] != "put" or events[0]["path"] != "/":
+        raise ValueError(f"{path} does not start with the data of the device")
+    return events[0]["data"], events[1:]
+
+
+def run(
+    history: int = 5, puts: int = 5, recording: str | None = None
+) -> dict[str, dict[str, float]]:
+    """Run every ingestion scenario, and the events of a recording if given."""
+    device_data = make_device_data(history)
+    results = {
+        "status_patch": run_scenario(device_data, status_patches()),
+        "initial_put": run_scenario(device_data, device_puts(device_data, puts)),
+    }
+    if recording is not None:
+        results["recording"] = run_scenario(*recorded_events(recording))
+    return results
+
+
+def main() -> None:
+    """Run the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--history",
+        type=int,
+        default=5,
+        help="command instances stored per command",
+    )
+    parser.add_argument("--puts", type=int, default=5)
+    parser.add_argument(
+        "--recording",
+        help="stream recording to replay in addition to the synthetic scenarios",
+    )
+    args = parser.parse_args()
+
+    for scenario, result in run(args.history, args.puts, args.recording).items():
+        print(
+            f"{scenario:>12}: {result['events']} events of {result['event_bytes']} B, "
+            f"{result['events_per_second']:.0f}/s, "
+            f"p50 {result['latency_p50_ms']:.3f} ms, "
+            f"p99 {result['latency_p99_ms']:.3f} ms, "
+            f"peak {result['peak_alloc_bytes_per_event']:.0f} B/event"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Benchmark uploading large files through ``Storage.put``.
+
+Files are uploaded to the Storage endpoint of the local Firebase stand-in,
+which counts the bytes it receives without keeping them. Three upload modes are
+compared:
+
+- ``in_memory``: the whole file is read and sent from memory, as uploads of
+  file contents through ``upload_from_string`` do
+- ``chunked``: the file is read and sent in chunks
+- ``mmap``: the file is memory-mapped and sent from the mapping
+
+Every upload runs in a fresh process, so its peak resident set size (RSS) can
+be measured. The peak is reported above the RSS of the process before the
+upload. The file is written right before the uploads, so all of them read it
+from the page cache.
+
+The stand-in lives in the test tree, so the benchmark runs from a checkout of
+the repository only, and is skipped when the stand-in cannot be imported.
+
+Run with ``python -m benchmarks.bench_storage``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import requests
+from custom_components.smarter.pyrebase.pyrebase import DEFAULT_CHUNK_SIZE, Storage
+
+try:
+    from tests.fake_firebase import FakeFirebase
+except ImportError:
+    FakeFirebase = None
+
+MODES = ("in_memory", "chunked", "mmap")
+MIB = 1024 * 1024
+
+
+def peak_rss() -> int:
+    """Return the peak resident set size of this process in bytes."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in kilobytes on Linux, in bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def write_file(path: Path, size_mb: int) -> None:
+    """Write `size_mb` MiB of incompressible data to `path`."""
+    block = os.urandom(MIB)
+    with path.open("wb") as file:
+        for _ in range(size_mb):
+            file.write(block)
+
+
+def upload(mode: str, url: str, path: str, chunk_size: int) -> dict[str, float]:
+    """Upload a file in one of the `MODES`, in this process."""
+    storage = Storage(None, "bucket", requests.Session(), url)
+    baseline = peak_rss()
+
+    started = time.perf_counter()
+    if mode == "in_memory":
+        with open(path, "rb") as file:
+            data = file.read()
+        response = storage.child("upload.bin").put(
+            io.BytesIO(data), chunk_size=len(data)
+        )
+    else:
+        response = storage.child("upload.bin").put(
+            path, chunk_size=chunk_size, use_mmap=mode == "mmap"
+        )
+    elapsed = time.perf_counter() - started
+
+    size = int(response["size"])
+    assert size == os.path.getsize(path), "the upload is incomplete"
+    return {
+        "mb": size / MIB,
+        "seconds": elapsed,
+        "mb_per_second": size / MIB / elapsed,
+        "peak_rss_mb": (peak_rss() - baseline) / MIB,
+    }
+
+
+def run(
+    size_mb: int = 256, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> dict[str, dict[str, float]]:
+    """
+    Upload a file of `size_mb` MiB in every mode, each in a fresh process.
+
+    Returns no results when the Firebase stand-in is unavailable.
+    """
+    results = {}
+    if FakeFirebase is None:
+        return results
+    with (
+        FakeFirebase(keep_uploads=False) as firebase,
+        tempfile.TemporaryDirectory() as directory,
+    ):
+        path = Path(directory) / "upload.bin"
+        write_file(path, size_mb)
+        for mode in MODES:
+            child = subprocess.run(
+                [
+                    sys.executable,
+                    "-m",
+                    "benchmarks.bench_storage",
+                    "--upload",
+                    mode,
+                    firebase.url,
+                    str(path),
+                    "--chunk-size",
+                    str(chunk_size),
+                ],
+                capture_output=True,
+                check=True,
+                text=True,
+            )
+            results[mode] = json.loads(child.stdout)
+    return results
+
+
+def main() -> None:
+    """Run the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--size-mb",
+        type=int,
+        default=256,
+        help="size of the uploaded file in MiB",
+    )
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument(
+        "--upload",
+        nargs=3,
+        metavar=("MODE", "URL", "PATH"),
+        help=argparse.SUPPRESS,
+    )
+    args = parser.parse_args()
+
+    if args.upload:
+        print(json.dumps(upload(*args.upload, args.chunk_size)))
+        return
+
+    if FakeFirebase is None:
+        parser.exit(message="Skipped: the Firebase stand-in in tests/ is unavailable\n")
+
+    for mode, result in run(args.size_mb, args.chunk_size).items():
+        print(
+            f"{mode:>9}: {result['mb']:.0f} MiB in {result['seconds']:.3f} s, "
+            f"{result['mb_per_second']:.0f} MiB/s, "
+            f"peak RSS +{result['peak_rss_mb']:.1f} MiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
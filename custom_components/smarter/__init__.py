@@ -2,26 +2,79 @@
 
 from __future__ import annotations
 
-from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import Config, HomeAssistant
-
-from custom_components.smarter.smarter_hub import SmarterHub
+import asyncio
+from contextlib import suppress
+from functools import partial
 
-from .const import DOMAIN, LOGGER, PLATFORMS
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import Config, HomeAssistant, SupportsResponse, callback
+from homeassistant.helpers import device_registry as dr
+from requests import HTTPError
+
+from custom_components.smarter.smarter_hub import DeviceNotFoundError, SmarterHub
+
+from .const import (
+    CONF_COALESCE_WINDOW,
+    CONF_RECORD_STREAMS,
+    CONF_REFRESH_TOKEN,
+    DEFAULT_COALESCE_WINDOW,
+    DOMAIN,
+    LOGGER,
+    PLATFORMS,
+    RECORDINGS_DIR,
+    SERVICE_PROFILE,
+    SERVICE_SCHEMA_PROFILE,
+)
+from .coordinator import SmarterCoordinator
+from .profiling import async_handle_profile
+from .smarter_client.domain.models import LoginSession
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Smarter Kettle and Coffee from a config entry."""
     hass.data.setdefault(DOMAIN, {})
     hub = SmarterHub(hass)
-    session = await hub.sign_in(entry.data["username"], entry.data["password"])
-    user = await hub.get_user(session)
 
+    # Discovery opens the device streams, so recording must be enabled first
+    if entry.options.get(CONF_RECORD_STREAMS, False):
+        session, _ = await asyncio.gather(
+            _async_sign_in(hub, entry),
+            hass.async_add_executor_job(
+                hub.client.start_recording, hass.config.path(RECORDINGS_DIR)
+            ),
+        )
+    else:
+        session = await _async_sign_in(hub, entry)
+    _async_store_refresh_token(hass, entry, session)
+    entry.async_on_unload(
+        hub.client.add_session_listener(
+            lambda session: hass.loop.call_soon_threadsafe(
+                _async_store_refresh_token, hass, entry, session
+            )
+        )
+    )
+
+    user = await hub.get_user(session)
     devices = await hub.discover_devices(user)
+    coalesce_window = entry.options.get(CONF_COALESCE_WINDOW, DEFAULT_COALESCE_WINDOW)
     for device in devices:
         device.set_logger(LOGGER)
-
-    hass.data[DOMAIN][entry.entry_id] = {"user": user, "devices": devices}
+        device.set_coalesce_window(coalesce_window / 1000)
+
+    coordinator = SmarterCoordinator(hass, devices, hub.commands)
+    await coordinator.async_config_entry_first_refresh()
+    await coordinator.async_start()
+    entry.async_on_unload(coordinator.async_stop)
+
+    hass.data[DOMAIN][entry.entry_id] = {
+        "options": dict(entry.options),
+        "user": user,
+        "devices": devices,
+        "hub": hub,
+        "coordinator": coordinator,
+    }
+    hub.index_devices(entry.entry_id)
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
@@ -30,19 +83,69 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     return True
 
 
+async def _async_sign_in(hub: SmarterHub, entry: ConfigEntry) -> LoginSession:
+    """Resume the session of the stored refresh token, or sign in with the password."""
+    if refresh_token := entry.data.get(CONF_REFRESH_TOKEN):
+        try:
+            return await hub.sign_in_with_refresh_token(refresh_token)
+        except HTTPError as ex:
+            LOGGER.info("Stored refresh token rejected, signing in again: %s", ex)
+
+    return await hub.sign_in(entry.data[CONF_USERNAME], entry.data[CONF_PASSWORD])
+
+
+@callback
+def _async_store_refresh_token(
+    hass: HomeAssistant, entry: ConfigEntry, session: LoginSession
+) -> None:
+    """Store the refresh token of a session, which rotates on refresh."""
+    if session.refresh_token != entry.data.get(CONF_REFRESH_TOKEN):
+        hass.config_entries.async_update_entry(
+            entry, data={**entry.data, CONF_REFRESH_TOKEN: session.refresh_token}
+        )
+
+
+async def async_remove_config_entry_device(
+    hass: HomeAssistant, entry: ConfigEntry, device_entry: dr.DeviceEntry
+) -> bool:
+    """Stop tracking a device removed from the device registry."""
+    data = hass.data[DOMAIN][entry.entry_id]
+    hub: SmarterHub = data["hub"]
+    coordinator: SmarterCoordinator = data["coordinator"]
+    for domain, identifier in device_entry.identifiers:
+        if domain == DOMAIN:
+            with suppress(DeviceNotFoundError):
+                device = hub.remove_device(identifier, entry.entry_id)
+                coordinator.async_remove_device(device.id)
+                await hass.async_add_executor_job(device.dispose)
+
+    return True
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
-        hass.data[DOMAIN].pop(entry.entry_id)
+        data = hass.data[DOMAIN].pop(entry.entry_id)
+        await hass.async_add_executor_job(data["hub"].client.stop_recording)
 
     return unload_ok
 
 
 async def async_setup(hass: HomeAssistant, config: Config):
     """Set up this integration using YAML is not supported."""
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PROFILE,
+        partial(async_handle_profile, hass),
+        SERVICE_SCHEMA_PROFILE,
+        SupportsResponse.OPTIONAL,
+    )
     return True
 
 
 async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
-    """Reload config entry."""
-    await hass.config_entries.async_reload(entry.entry_id)
+    """Reload config entry when its options change."""
+    data = hass.data[DOMAIN].get(entry.entry_id)
+    # Storing a rotated refresh token updates the entry too
+    if data is None or data["options"] != entry.options:
+        await hass.config_entries.async_reload(entry.entry_id)
@@ -60,13 +60,14 @@ async def async_setup_entry(
 ) -> None:
     """Set up Smarter sensors."""
     data = hass.data[DOMAIN][config_entry.entry_id]
+    coordinator = data["coordinator"]
     entities = [
-        SmarterBinarySensor(device, description)
+        SmarterBinarySensor(coordinator, device, description)
         for device in data.get("devices")
         for description in BINARY_SENSOR_TYPES
     ]
 
-    async_add_entities(entities, True)
+    async_add_entities(entities)
 
 
 class SmarterBinarySensor(SmarterEntity, BinarySensorEntity):
@@ -76,11 +77,10 @@ class SmarterBinarySensor(SmarterEntity, BinarySensorEntity):
 
     _attr_has_entity_name = True
 
-    @property
-    def is_on(self) -> bool | None:
-        """Return true if the binary sensor is on."""
+    def _update_derived_state(self) -> None:
+        """Cache whether the binary sensor is on."""
+        super()._update_derived_state()
         description = self.entity_description
-        return (
-            self.device.status.get(description.get_status_field)
-            in description.state_on_values
+        self._attr_is_on = (
+            self.status.get(description.get_status_field) in description.state_on_values
         )
@@ -0,0 +1,76 @@
+"""Pipeline sending commands to Smarter devices."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import Callable
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+
+from .const import MAX_CONCURRENT_COMMANDS
+from .smarter_client.managed_devices.base import BaseDevice
+from .smarter_client.metrics import Metrics
+
+
+class CommandPipeline:
+    """
+    Send commands to devices in order, with bounded concurrency.
+
+    Commands to one device are sent one at a time, in the order they were
+    issued, so e.g. `set_boil_temperature` always reaches the kettle before a
+    `start_boil` issued after it. Commands to different devices are sent
+    concurrently, up to `max_concurrency` at a time. Commands are not retried
+    here: the client retries transient failures itself, rewriting the same
+    command instance, so a retry never sends a command twice.
+
+    Records, per device, the commands that had to wait (`commands.queued`),
+    the time spent waiting (`commands.queue_wait`) and the latency from issue
+    to completion (`commands.latency`).
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        metrics: Metrics,
+        max_concurrency: int = MAX_CONCURRENT_COMMANDS,
+    ) -> None:
+        """Initialize the pipeline."""
+        self.hass = hass
+        self.metrics = metrics
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        # Waiters on an asyncio.Lock are woken in FIFO order
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._depths: dict[str, int] = {}
+
+    def queue_depth(self, device_id: str) -> int:
+        """Return the number of commands issued to a device and not completed."""
+        return self._depths.get(device_id, 0)
+
+    async def async_send(
+        self, device: BaseDevice, func: Callable[..., Any], *args: Any
+    ) -> Any:
+        """
+        Run the blocking call `func(*args)` sending a command to `device`.
+
+        Returns the result of the call, or raises its error.
+        """
+        device_id = device.id
+        issued = time.perf_counter()
+        lock = self._locks.setdefault(device_id, asyncio.Lock())
+        depth = self._depths[device_id] = self._depths.get(device_id, 0) + 1
+        if depth > 1 or self._semaphore.locked():
+            self.metrics.increment("commands.queued", device_id)
+
+        try:
+            async with lock, self._semaphore:
+                self.metrics.record(
+                    "commands.queue_wait", time.perf_counter() - issued, device_id
+                )
+                return await self.hass.async_add_executor_job(func, *args)
+        finally:
+            self._depths[device_id] -= 1
+            self.metrics.record(
+                "commands.latency", time.perf_counter() - issued, device_id
+            )
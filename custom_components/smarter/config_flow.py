@@ -6,14 +6,26 @@ import logging
 from typing import Any
 
 import voluptuous as vol
-from homeassistant.config_entries import ConfigFlow, ConfigFlowResult
+from homeassistant.config_entries import (
+    ConfigEntry,
+    ConfigFlow,
+    ConfigFlowResult,
+    OptionsFlow,
+)
 from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import HomeAssistantError
 
 from custom_components.smarter.smarter_hub import SmarterHub
 
-from .const import CONF_REFRESH_TOKEN, DOMAIN
+from .const import (
+    CONF_COALESCE_WINDOW,
+    CONF_RECORD_STREAMS,
+    CONF_REFRESH_TOKEN,
+    DEFAULT_COALESCE_WINDOW,
+    DOMAIN,
+    MAX_COALESCE_WINDOW,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -56,6 +68,12 @@ class SmarterConfigFlow(ConfigFlow, domain=DOMAIN):
 
     VERSION = 1
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: ConfigEntry) -> OptionsFlow:
+        """Get the options flow for this handler."""
+        return SmarterOptionsFlow(config_entry)
+
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> ConfigFlowResult:
@@ -82,6 +100,42 @@ class SmarterConfigFlow(ConfigFlow, domain=DOMAIN):
         )
 
 
+class SmarterOptionsFlow(OptionsFlow):
+    """Handle options for Smarter Kettle and Coffee."""
+
+    def __init__(self, config_entry: ConfigEntry) -> None:
+        """Initialize options flow."""
+        self.config_entry = config_entry
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Manage the options."""
+        if user_input is not None:
+            return self.async_create_entry(title="", data=user_input)
+
+        options = self.config_entry.options
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Optional(
+                        CONF_COALESCE_WINDOW,
+                        default=options.get(
+                            CONF_COALESCE_WINDOW, DEFAULT_COALESCE_WINDOW
+                        ),
+                    ): vol.All(
+                        vol.Coerce(int), vol.Range(min=0, max=MAX_COALESCE_WINDOW)
+                    ),
+                    vol.Optional(
+                        CONF_RECORD_STREAMS,
+                        default=options.get(CONF_RECORD_STREAMS, False),
+                    ): bool,
+                }
+            ),
+        )
+
+
 class CannotConnect(HomeAssistantError):
     """Error to indicate we cannot connect."""
 
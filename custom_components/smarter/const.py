@@ -1,6 +1,7 @@
 """Constants for the Smarter Kettle and Coffee integration."""
 
 import logging
+from datetime import timedelta
 from enum import IntFlag
 
 import voluptuous as vol
@@ -12,6 +13,32 @@ DOMAIN = "smarter"
 MANUFACTURER = "Smarter"
 
 CONF_REFRESH_TOKEN = "refresh_token"
+CONF_COALESCE_WINDOW = "coalesce_window"
+CONF_RECORD_STREAMS = "record_streams"
+
+# Window, in milliseconds, during which status events from a device are batched
+# into a single state update. 0 disables coalescing.
+DEFAULT_COALESCE_WINDOW = 0
+MAX_COALESCE_WINDOW = 5000
+
+# Directory, relative to the configuration directory, of stream recordings
+RECORDINGS_DIR = "smarter_recordings"
+
+# A stream without events or keep-alives (sent every 30s) for this many seconds
+# is unhealthy, and the status of its device is polled until it recovers.
+STREAM_MAX_IDLE = timedelta(seconds=90)
+STREAM_HEALTH_CHECK_INTERVAL = timedelta(seconds=30)
+# Polling interval of unhealthy devices, shorter while a device is boiling,
+# keeping warm or cooling
+ACTIVE_POLL_INTERVAL = timedelta(seconds=10)
+IDLE_POLL_INTERVAL = timedelta(seconds=60)
+
+# Commands sent at once across devices
+MAX_CONCURRENT_COMMANDS = 4
+
+# Time for a device to report the status expected from a command, after which
+# the optimistic state published for the command is rolled back
+OPTIMISTIC_TIMEOUT = timedelta(seconds=15)
 
 LOGGER = logging.getLogger(__package__)
 
@@ -26,11 +53,20 @@ PLATFORMS: list[Platform] = [
 SERVICE_QUICK_BOIL = "quick_boil"
 SERVICE_SEND_COMMAND = "send_command"
 SERVICE_GET_COMMANDS = "get_commands"
+SERVICE_PROFILE = "profile"
 
 SERVICE_ATTR_COMMAND_NAME = "command_name"
 SERVICE_ATTR_COMMAND_DATA_TEXT = "command_data_text"
 SERVICE_ATTR_COMMAND_DATA_NUMBER = "command_data_number"
 SERVICE_ATTR_COMMAND_DATA_BOOLEAN = "command_data_boolean"
+SERVICE_ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+SERVICE_ATTR_DURATION = "duration"
+SERVICE_ATTR_INTERVAL = "interval"
+
+# Profiling window in seconds and sampling interval in milliseconds
+DEFAULT_PROFILE_DURATION = 60
+MAX_PROFILE_DURATION = 600
+DEFAULT_PROFILE_INTERVAL = 5
 
 SERVICES: list[str] = [
     SERVICE_QUICK_BOIL,
@@ -61,6 +97,18 @@ SERVICE_SCHEMA_SEND_COMMAND = vol.Schema(
     )
 )
 
+SERVICE_SCHEMA_PROFILE = vol.Schema(
+    {
+        vol.Optional(SERVICE_ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Optional(SERVICE_ATTR_DURATION, default=DEFAULT_PROFILE_DURATION): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=MAX_PROFILE_DURATION)
+        ),
+        vol.Optional(SERVICE_ATTR_INTERVAL, default=DEFAULT_PROFILE_INTERVAL): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=1000)
+        ),
+    }
+)
+
 SERVICE_SCHEMA_QUICK_BOIL = cv.make_entity_service_schema({})
 SERVICE_SCHEMA_GET_COMMANDS = cv.make_entity_service_schema({})
 
@@ -0,0 +1,311 @@
+"""Coordinator of the state of Smarter devices."""
+
+from __future__ import annotations
+
+import threading
+from collections.abc import Mapping
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from functools import partial
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, HassJob, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later, async_track_time_interval
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+
+from .commands import CommandPipeline
+from .const import (
+    ACTIVE_POLL_INTERVAL,
+    DOMAIN,
+    IDLE_POLL_INTERVAL,
+    LOGGER,
+    OPTIMISTIC_TIMEOUT,
+    STREAM_HEALTH_CHECK_INTERVAL,
+    STREAM_MAX_IDLE,
+)
+from .smarter_client.managed_devices.base import BaseDevice
+
+StatusData = dict[str, Mapping[str, Any]]
+
+
+@dataclass
+class OptimisticValue:
+    """A status value expected from a command, until the device reports it."""
+
+    value: Any
+    # Value reported by the device when the command was issued
+    baseline: Any
+    cancel_timeout: CALLBACK_TYPE | None = None
+
+
+class SmarterCoordinator(DataUpdateCoordinator[StatusData]):
+    """
+    Own the status of the devices of a config entry.
+
+    Status notifications arrive on the stream threads of the devices. They are
+    handed to the event loop once per loop iteration, however many devices
+    reported meanwhile, and published through `async_set_updated_data`. The
+    coordinator data is a snapshot of the status of every device, keyed by
+    device identifier, and `changed` holds the devices updated by the last
+    publication so entities of other devices can skip recomputing their state.
+    Notifications of a status version already published, e.g. a poll reading
+    what the stream delivered, are not published again.
+
+    The status of devices whose stream is unhealthy is polled instead, with
+    ETag-conditional reads, more often while they are active. Notifications of
+    polled changes are published the same way. Nothing is polled while all
+    streams are healthy.
+
+    Entities send commands through the `commands` pipeline. Values expected
+    from commands are published before the device reports them, see
+    `async_set_optimistic`, so entities reflect commands without waiting for
+    the cloud round trip.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        devices: list[BaseDevice],
+        commands: CommandPipeline,
+    ) -> None:
+        """Initialize the coordinator."""
+        super().__init__(hass, LOGGER, name=DOMAIN)
+        self.devices = {device.id: device for device in devices}
+        self.commands = commands
+        self.changed: set[str] = set()
+        self.unhealthy: set[str] = set()
+        self._handlers: dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self._health_lock = threading.Lock()
+        self._pending: set[str] = set()
+        self._flush_scheduled = False
+        self._unsub_health_check: CALLBACK_TYPE | None = None
+        self._optimistic: dict[str, dict[str, OptimisticValue]] = {}
+        # Status version of every device as last published
+        self._versions: dict[str, int | None] = {}
+
+    async def async_start(self) -> None:
+        """Subscribe to the status notifications of the devices."""
+        self._handlers = {
+            device_id: partial(self._on_status, device_id) for device_id in self.devices
+        }
+        await self.hass.async_add_executor_job(self._subscribe)
+        self._unsub_health_check = async_track_time_interval(
+            self.hass,
+            self._async_check_streams,
+            STREAM_HEALTH_CHECK_INTERVAL,
+            cancel_on_shutdown=True,
+        )
+
+    async def async_stop(self) -> None:
+        """Unsubscribe from the devices and stop polling."""
+        if self._unsub_health_check is not None:
+            self._unsub_health_check()
+            self._unsub_health_check = None
+        for values in self._optimistic.values():
+            for optimistic in values.values():
+                optimistic.cancel_timeout()
+        self._optimistic = {}
+        await self.async_shutdown()
+        await self.hass.async_add_executor_job(self._unsubscribe)
+        self.unhealthy = set()
+
+    @callback
+    def async_remove_device(self, device_id: str) -> None:
+        """Stop tracking a device removed from the config entry."""
+        self.devices.pop(device_id, None)
+        self._handlers.pop(device_id, None)
+        self.unhealthy.discard(device_id)
+        self._versions.pop(device_id, None)
+        for optimistic in self._optimistic.pop(device_id, {}).values():
+            optimistic.cancel_timeout()
+
+    @callback
+    def async_set_optimistic(
+        self,
+        device_id: str,
+        values: Mapping[str, Any],
+        timeout: timedelta = OPTIMISTIC_TIMEOUT,
+    ) -> CALLBACK_TYPE:
+        """
+        Publish status values expected from a command being issued.
+
+        Every value is published in place of the reported one until the device
+        reports it or any other change of that field, and rolled back if the
+        device reports neither within `timeout`. Returns a callback rolling the
+        values back at once, e.g. when sending the command failed.
+        """
+        status = self.devices[device_id].status
+        pending = self._optimistic.setdefault(device_id, {})
+        issued = []
+        for key, value in values.items():
+            baseline = status.get(key)
+            if (previous := pending.get(key)) is not None:
+                previous.cancel_timeout()
+                baseline = previous.baseline
+            optimistic = pending[key] = OptimisticValue(value, baseline)
+            optimistic.cancel_timeout = async_call_later(
+                self.hass,
+                timeout,
+                HassJob(
+                    partial(self._async_expire, device_id, key, optimistic),
+                    cancel_on_shutdown=True,
+                ),
+            )
+            issued.append((key, optimistic))
+        self._async_publish({device_id})
+
+        @callback
+        def rollback() -> None:
+            discarded = [
+                self._async_discard(device_id, key, optimistic)
+                for key, optimistic in issued
+            ]
+            if any(discarded):
+                self._async_publish({device_id})
+
+        return rollback
+
+    @callback
+    def _async_discard(
+        self, device_id: str, key: str, optimistic: OptimisticValue
+    ) -> bool:
+        pending = self._optimistic.get(device_id, {})
+        if pending.get(key) is not optimistic:
+            return False
+        optimistic.cancel_timeout()
+        del pending[key]
+        return True
+
+    @callback
+    def _async_expire(
+        self, device_id: str, key: str, optimistic: OptimisticValue, _now: datetime
+    ) -> None:
+        if self._async_discard(device_id, key, optimistic):
+            LOGGER.debug("%s of %s not confirmed, rolled back", key, device_id)
+            self.devices[device_id].device.client.metrics.increment(
+                "optimistic.rolled_back", device_id
+            )
+            self._async_publish({device_id})
+
+    @callback
+    def _async_reconcile(self, device_id: str) -> None:
+        """Drop optimistic values of a device once it reports their field."""
+        pending = self._optimistic.get(device_id)
+        if not pending:
+            return
+        device = self.devices[device_id]
+        for key, optimistic in list(pending.items()):
+            reported = device.status.get(key)
+            if reported == optimistic.value or reported != optimistic.baseline:
+                self._async_discard(device_id, key, optimistic)
+                device.device.client.metrics.increment(
+                    "optimistic.confirmed"
+                    if reported == optimistic.value
+                    else "optimistic.superseded",
+                    device_id,
+                )
+
+    def _status_version(self, device_id: str) -> int | None:
+        """Return the version of the status of a device, None if unversioned."""
+        return getattr(self.devices[device_id].status, "version", None)
+
+    def _is_published(self, device_id: str) -> bool:
+        version = self._status_version(device_id)
+        return version is not None and self._versions.get(device_id) == version
+
+    def _device_status(self, device_id: str) -> dict[str, Any]:
+        self._versions[device_id] = self._status_version(device_id)
+        status = dict(self.devices[device_id].status)
+        for key, optimistic in self._optimistic.get(device_id, {}).items():
+            status[key] = optimistic.value
+        return status
+
+    def _subscribe(self) -> None:
+        for device_id, handler in self._handlers.items():
+            self.devices[device_id].subscribe_status(handler)
+
+    def _unsubscribe(self) -> None:
+        for device_id, handler in self._handlers.items():
+            device = self.devices[device_id]
+            device.stop_polling()
+            device.unsubscribe_status(handler)
+        self._handlers = {}
+
+    def _on_status(self, device_id: str, status: Mapping[str, Any]) -> None:
+        """Queue a status notification, called on the stream thread of a device."""
+        with self._lock:
+            self._pending.add(device_id)
+            if self._flush_scheduled:
+                return
+            self._flush_scheduled = True
+        self.hass.loop.call_soon_threadsafe(self._async_flush)
+
+    @callback
+    def _async_flush(self) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, set()
+            self._flush_scheduled = False
+
+        pending = {
+            device_id
+            for device_id in pending & self.devices.keys()
+            if not self._is_published(device_id)
+        }
+        if not pending:
+            return
+        for device_id in pending:
+            self._async_reconcile(device_id)
+        self._async_publish(pending)
+
+    @callback
+    def _async_publish(self, device_ids: set[str]) -> None:
+        data = dict(self.data or {})
+        for device_id in device_ids:
+            data[device_id] = self._device_status(device_id)
+        self.changed = device_ids
+        self.async_set_updated_data(data)
+
+    def _update_health(self, devices: dict[str, BaseDevice]) -> None:
+        """
+        Poll the status of devices while their stream is unhealthy.
+
+        `devices` is a snapshot taken on the event loop, where devices are
+        removed while this runs in an executor. Polling is only started for
+        devices still tracked.
+        """
+        with self._health_lock:
+            unhealthy = {
+                device_id
+                for device_id, device in devices.items()
+                if not device.is_stream_healthy(STREAM_MAX_IDLE.total_seconds())
+            }
+            for device_id in unhealthy - self.unhealthy:
+                if (device := self.devices.get(device_id)) is None:
+                    unhealthy.discard(device_id)
+                    continue
+                LOGGER.warning(
+                    "Stream of %s is unhealthy, polling its status", device_id
+                )
+                device.start_polling(
+                    ACTIVE_POLL_INTERVAL.total_seconds(),
+                    IDLE_POLL_INTERVAL.total_seconds(),
+                )
+            for device_id in self.unhealthy - unhealthy:
+                LOGGER.info("Stream of %s recovered, polling stopped", device_id)
+                if (device := self.devices.get(device_id)) is not None:
+                    device.stop_polling()
+            self.unhealthy = unhealthy
+
+    async def _async_update_health(self) -> None:
+        await self.hass.async_add_executor_job(self._update_health, dict(self.devices))
+
+    async def _async_check_streams(self, _now: datetime) -> None:
+        await self._async_update_health()
+
+    async def _async_update_data(self) -> StatusData:
+        """Check the streams and return the status of every device."""
+        await self._async_update_health()
+
+        self.changed = set(self.devices)
+        return {device_id: self._device_status(device_id) for device_id in self.devices}
@@ -0,0 +1,51 @@
+"""Diagnostics support for Smarter Kettle and Coffee."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import HomeAssistant
+
+from .const import CONF_REFRESH_TOKEN, DOMAIN
+from .smarter_client.managed_devices.base import BaseDevice
+from .smarter_hub import SmarterHub
+
+TO_REDACT = {CONF_PASSWORD, CONF_REFRESH_TOKEN, CONF_USERNAME, "title", "unique_id"}
+
+
+def _device_diagnostics(device: BaseDevice, hub: SmarterHub) -> dict[str, Any]:
+    return {
+        "type": device.type,
+        "model": device.model,
+        "firmware_version": device.firmware_version,
+        "watching": device.device.is_watching,
+        "polling": device.is_polling,
+        "coalesce_window": device.coalesce_window,
+        "coalesce_stats": device.coalesce_stats,
+        "command_queue_depth": hub.commands.queue_depth(device.id),
+        "status": dict(device.status),
+    }
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """
+    Return diagnostics for a config entry.
+
+    Includes the counters and timers of every stage of the event and command
+    paths, keyed by device identifier or HTTP endpoint.
+    """
+    data = hass.data[DOMAIN][entry.entry_id]
+    hub: SmarterHub = data["hub"]
+
+    return {
+        "entry": async_redact_data(entry.as_dict(), TO_REDACT),
+        "devices": {
+            device.id: _device_diagnostics(device, hub) for device in data["devices"]
+        },
+        "metrics": hub.client.metrics.snapshot(),
+    }
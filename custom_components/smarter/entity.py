@@ -1,16 +1,20 @@
 """Smarter base entity definitions."""
 
+from collections.abc import Callable, Mapping
+from types import MappingProxyType
+from typing import Any
+
 from homeassistant.core import callback
 from homeassistant.helpers.device_registry import DeviceInfo
-from homeassistant.helpers.entity import Entity, EntityDescription
+from homeassistant.helpers.entity import EntityDescription
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from .smarter_client.managed_devices.base import BaseDevice
 
 from .const import DOMAIN, MANUFACTURER
-
-# from .const import LOGGER
+from .coordinator import SmarterCoordinator
 
 
-class SmarterEntity(Entity):
+class SmarterEntity(CoordinatorEntity[SmarterCoordinator]):
     """Representation of a Smarter sensor."""
 
     _attr_has_entity_name = True
@@ -21,72 +25,84 @@ class SmarterEntity(Entity):
 
     def __init__(
         self,
+        coordinator: SmarterCoordinator,
         device: BaseDevice,
         description: EntityDescription,
     ) -> None:
         """Initialize the sensor."""
+        super().__init__(coordinator)
         self.entity_description = description
         self.device = device
         self._state = None
+        self._attr_unique_id = "-".join(
+            (
+                device.id,
+                device.type,
+                description.key if description else "device",
+            )
+        )
+        self._device_info_key = None
+        self._update_derived_state()
 
-    async def async_added_to_hass(self) -> None:
-        """Run when entity about to be added to hass.
+    @property
+    def status(self) -> Mapping[str, Any]:
+        """Return the status of the device as last published by the coordinator."""
+        data = self.coordinator.data or {}
+        return data.get(self.device.id, self.device.status)
 
-        To be extended by integrations.
+    async def _async_send_optimistic(
+        self, values: Mapping[str, Any], func: Callable[..., Any], *args: Any
+    ) -> None:
         """
-        self.device.subscribe_status(self._on_state_update)
+        Send a command, showing the status values it is expected to cause meanwhile.
 
-    async def async_will_remove_from_hass(self) -> None:
-        """Run when entity will be removed from hass.
-
-        To be extended by integrations.
+        The values are rolled back if sending the command fails.
         """
-        self.device.unsubscribe_status(self._on_state_update)
+        rollback = self.coordinator.async_set_optimistic(self.device.id, values)
+        try:
+            await self.coordinator.commands.async_send(self.device, func, *args)
+        except Exception:
+            rollback()
+            raise
 
     @callback
-    def _on_state_update(self, state):
-        """Handle state update."""
-        # LOGGER.debug(
-        #     "[%s] Received state update for %s",
-        #     self.unique_id,
-        #     self.device.device.identifier,
-        # )
-        # LOGGER.debug(state)
-        self.schedule_update_ha_state()
+    def _handle_coordinator_update(self) -> None:
+        """Recompute the state when the status of this device changed."""
+        if self.device.id not in self.coordinator.changed:
+            return
+        self._update_derived_state()
+        self.async_write_ha_state()
+
+    def _update_derived_state(self) -> None:
+        """
+        Recompute the cached entity state from the device status.
 
-    @property
-    def unique_id(self):
-        """Return a unique identifier for this sensor."""
-        return "-".join(
-            (
-                self.device.id,
-                self.device.type,
-                self.entity_description.key if self.entity_description else "device",
-            )
+        Home Assistant reads the state properties on every state write, so they
+        return values computed here, once per status change notification.
+        Platforms extend this to cache their own state.
+        """
+        status = self.status
+        self._attr_extra_state_attributes = MappingProxyType(
+            {
+                "device_id": self.device.id,
+                "kettle_is_present": status.get("kettle_is_present"),
+                "calibrated": status.get("calibrated"),
+            }
         )
 
-    @property
-    def device_info(self) -> DeviceInfo | None:
-        """Return device information for this sensor."""
-        return DeviceInfo(
-            identifiers={(DOMAIN, self.device.device.identifier)},
-            manufacturer=MANUFACTURER,
-            model=self.device.model,
-            name=self.device.friendly_name,
-            suggested_area="Kitchen",
-            sw_version=self.device.firmware_version,
-        )
+        device_info_key = (self.device.model, self.device.firmware_version)
+        if device_info_key != self._device_info_key:
+            self._device_info_key = device_info_key
+            self._attr_device_info = DeviceInfo(
+                identifiers={(DOMAIN, self.device.device.identifier)},
+                manufacturer=MANUFACTURER,
+                model=self.device.model,
+                name=self.device.friendly_name,
+                suggested_area="Kitchen",
+                sw_version=self.device.firmware_version,
+            )
 
     @property
     def available(self) -> bool:
         """Return true if device is available."""
-        return self.device is not None
-
-    @property
-    def extra_state_attributes(self):
-        """Return extra device attributes associated with entity."""
-        return {
-            "device_id": self.device.id,
-            "kettle_is_present": self.device.status.get("kettle_is_present"),
-            "calibrated": self.device.status.get("calibrated"),
-        }
+        return super().available and self.device is not None
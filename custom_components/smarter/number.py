@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from collections.abc import Awaitable, Callable
+from collections.abc import Callable
 from dataclasses import dataclass
 
 from homeassistant.components.number import (
@@ -24,7 +24,7 @@ from .entity import SmarterEntity
 class SmarterNumberEntityDescription(NumberEntityDescription):
     """Class describing Ecobee number entities."""
 
-    set_fn: Callable[[BaseDevice, int], Awaitable]
+    set_fn: Callable[[BaseDevice, int], None]
 
 
 NUMBER_TYPES = [
@@ -58,13 +58,14 @@ async def async_setup_entry(
 ) -> None:
     """Set up Smarter sensors."""
     data = hass.data[DOMAIN][config_entry.entry_id]
+    coordinator = data["coordinator"]
     entities = [
-        SmarterNumber(device, description)
+        SmarterNumber(coordinator, device, description)
         for device in data.get("devices")
         for description in NUMBER_TYPES
     ]
 
-    async_add_entities(entities, True)
+    async_add_entities(entities)
 
 
 class SmarterNumber(SmarterEntity, NumberEntity):
@@ -73,11 +74,15 @@ class SmarterNumber(SmarterEntity, NumberEntity):
     entity_description: SmarterNumberEntityDescription
     _attr_has_entity_name = True
 
-    def set_native_value(self, value: float) -> None:
+    async def async_set_native_value(self, value: float) -> None:
         """Set value."""
-        self.entity_description.set_fn(self.device, int(value))
-
-    @property
-    def native_value(self) -> float | None:
-        """Return the value reported by the number."""
-        return float(self.device.status.get(self.entity_description.key))
+        description = self.entity_description
+        await self._async_send_optimistic(
+            {description.key: int(value)}, description.set_fn, self.device, int(value)
+        )
+
+    def _update_derived_state(self) -> None:
+        """Cache the value reported by the number."""
+        super()._update_derived_state()
+        value = self.status.get(self.entity_description.key)
+        self._attr_native_value = None if value is None else float(value)
@@ -0,0 +1,82 @@
+"""Profiling of the threads handling events of Smarter devices."""
+
+from __future__ import annotations
+
+import threading
+
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    DOMAIN,
+    LOGGER,
+    SERVICE_ATTR_CONFIG_ENTRY_ID,
+    SERVICE_ATTR_DURATION,
+    SERVICE_ATTR_INTERVAL,
+)
+from .smarter_client.managed_devices.base import BaseDevice
+from .smarter_client.profiling import ProfileResult, SamplingProfiler
+
+DATA_PROFILER = f"{DOMAIN}_profiler"
+
+
+def _worker_threads(devices: list[BaseDevice]) -> dict[str, threading.Thread]:
+    return {
+        f"{device.id} {role}": thread
+        for device in devices
+        for role, thread in device.worker_threads.items()
+    }
+
+
+async def async_handle_profile(
+    hass: HomeAssistant, call: ServiceCall
+) -> ServiceResponse:
+    """
+    Sample the stream and event delivery threads of devices for a while.
+
+    The sampled stacks are written in collapsed stack format to a
+    `smarter_profile_<time>.folded` file in the configuration directory. When a
+    response is requested, the call waits for the profiling window to end and
+    returns the most expensive functions as well.
+    """
+    entry_id = call.data.get(SERVICE_ATTR_CONFIG_ENTRY_ID)
+    devices = [
+        device
+        for config_entry_id, data in hass.data.get(DOMAIN, {}).items()
+        if entry_id in (None, config_entry_id)
+        for device in data["devices"]
+    ]
+    if not devices:
+        raise HomeAssistantError("No Smarter devices to profile")
+
+    profiler: SamplingProfiler = hass.data.get(DATA_PROFILER)
+    if profiler is not None and profiler.active:
+        raise HomeAssistantError("A profile is already being recorded")
+
+    profiler = hass.data[DATA_PROFILER] = SamplingProfiler(
+        lambda: _worker_threads(devices),
+        call.data[SERVICE_ATTR_INTERVAL] / 1000,
+    )
+    profiler.start(call.data[SERVICE_ATTR_DURATION])
+    path = hass.config.path(
+        f"smarter_profile_{dt_util.now().strftime('%Y%m%d_%H%M%S')}.folded"
+    )
+
+    async def _async_finish() -> ProfileResult:
+        result = await hass.async_add_executor_job(profiler.wait)
+        await hass.async_add_executor_job(result.write_collapsed, path)
+        LOGGER.info(
+            "Wrote profile of %d samples over %.1fs to %s",
+            result.sample_count,
+            result.duration,
+            path,
+        )
+        return result
+
+    if not call.return_response:
+        hass.async_create_background_task(_async_finish(), "smarter profile")
+        return None
+
+    result = await _async_finish()
+    return {"path": path, **result.summary()}
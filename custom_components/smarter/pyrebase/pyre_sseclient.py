@@ -81,7 +81,8 @@ class SSEClient(object):
         self.buf = tail
         msg = Event.parse(head)
 
-        if msg.data == "credential is no longer valid":
+        # Firebase sends the reason as a JSON string
+        if msg.event == 'auth_revoked' or msg.data == "credential is no longer valid":
             self._connect()
             return None
 
@@ -5,8 +5,9 @@ from requests.exceptions import HTTPError
 
 from urllib.parse import urlencode, quote
 import json
-import math
-from random import randrange
+import mmap
+import os
+import random
 import time
 from collections import OrderedDict
 from .pyre_sseclient import SSEClient
@@ -19,6 +20,19 @@ from uuid import uuid4
 import python_jwt as jwt
 from Crypto.PublicKey import RSA
 import datetime
+import logging
+
+_LOGGER = logging.getLogger(__name__)
+
+# Bytes read or written at once by storage transfers
+DEFAULT_CHUNK_SIZE = 256 * 1024
+# Size from which uploads of files are sent from a memory mapping by default
+MMAP_THRESHOLD = 64 * 1024 * 1024
+
+
+IDENTITY_TOOLKIT_URL = "https://www.googleapis.com/identitytoolkit/v3/relyingparty"
+SECURE_TOKEN_URL = "https://securetoken.googleapis.com/v1"
+STORAGE_URL = "https://firebasestorage.googleapis.com"
 
 
 def initialize_app(config):
@@ -32,6 +46,11 @@ class Firebase:
         self.auth_domain = config["authDomain"]
         self.database_url = config["databaseURL"]
         self.storage_bucket = config["storageBucket"]
+        # Allow pointing authentication at another server, e.g. a local emulator
+        self.identity_toolkit_url = config.get("identityToolkitURL",
+                                               IDENTITY_TOOLKIT_URL)
+        self.secure_token_url = config.get("secureTokenURL", SECURE_TOKEN_URL)
+        self.storage_url = config.get("storageURL", STORAGE_URL)
         self.credentials = None
         self.requests = requests.Session()
         if config.get("serviceAccount"):
@@ -52,37 +71,44 @@ class Firebase:
             self.requests.mount(scheme, adapter)
 
     def auth(self):
-        return Auth(self.api_key, self.requests, self.credentials)
+        return Auth(self.api_key, self.requests, self.credentials,
+                    self.identity_toolkit_url, self.secure_token_url)
 
     def database(self):
         return Database(self.credentials, self.api_key, self.database_url, self.requests)
 
     def storage(self):
-        return Storage(self.credentials, self.storage_bucket, self.requests)
+        return Storage(self.credentials, self.storage_bucket, self.requests,
+                       self.storage_url)
 
 
 class Auth:
     """ Authentication Service """
-    def __init__(self, api_key, requests, credentials):
+    def __init__(self, api_key, requests, credentials,
+                 identity_toolkit_url=IDENTITY_TOOLKIT_URL,
+                 secure_token_url=SECURE_TOKEN_URL):
+        """Create the service, against the Google endpoints unless overridden."""
         self.api_key = api_key
         self.current_user = None
         self.requests = requests
         self.credentials = credentials
+        self.identity_toolkit_url = identity_toolkit_url
+        self.secure_token_url = secure_token_url
 
     def sign_in_with_email_and_password(self, email, password):
-        request_ref = "https://www.googleapis.com/identitytoolkit/v3/relyingparty/verifyPassword?key={0}".format(self.api_key)
+        request_ref = f"{self.identity_toolkit_url}/verifyPassword?key={self.api_key}"
         headers = {"content-type": "application/json; charset=UTF-8"}
         data = json.dumps({"email": email, "password": password, "returnSecureToken": True})
-        request_object = requests.post(request_ref, headers=headers, data=data)
+        request_object = self.requests.post(request_ref, headers=headers, data=data)
         raise_detailed_error(request_object)
         self.current_user = request_object.json()
         return request_object.json()
 
     def sign_in_anonymous(self):
-        request_ref = "https://www.googleapis.com/identitytoolkit/v3/relyingparty/signupNewUser?key={0}".format(self.api_key)
+        request_ref = f"{self.identity_toolkit_url}/signupNewUser?key={self.api_key}"
         headers = {"content-type": "application/json; charset=UTF-8" }
         data = json.dumps({"returnSecureToken": True})
-        request_object = requests.post(request_ref, headers=headers, data=data)
+        request_object = self.requests.post(request_ref, headers=headers, data=data)
         raise_detailed_error(request_object)
         self.current_user = request_object.json()
         return request_object.json()
@@ -102,73 +128,77 @@ class Auth:
         return jwt.generate_jwt(payload, private_key, "RS256", exp)
 
     def sign_in_with_custom_token(self, token):
-        request_ref = "https://www.googleapis.com/identitytoolkit/v3/relyingparty/verifyCustomToken?key={0}".format(self.api_key)
+        request_ref = (f"{self.identity_toolkit_url}/verifyCustomToken"
+                       f"?key={self.api_key}")
         headers = {"content-type": "application/json; charset=UTF-8"}
         data = json.dumps({"returnSecureToken": True, "token": token})
-        request_object = requests.post(request_ref, headers=headers, data=data)
+        request_object = self.requests.post(request_ref, headers=headers, data=data)
         raise_detailed_error(request_object)
         return request_object.json()
 
     def refresh(self, refresh_token):
-        request_ref = "https://securetoken.googleapis.com/v1/token?key={0}".format(self.api_key)
+        request_ref = f"{self.secure_token_url}/token?key={self.api_key}"
         headers = {"content-type": "application/json; charset=UTF-8"}
         data = json.dumps({"grantType": "refresh_token", "refreshToken": refresh_token})
-        request_object = requests.post(request_ref, headers=headers, data=data)
+        request_object = self.requests.post(request_ref, headers=headers, data=data)
         raise_detailed_error(request_object)
         request_object_json = request_object.json()
         # handle weirdly formatted response
         user = {
             "userId": request_object_json["user_id"],
             "idToken": request_object_json["id_token"],
-            "refreshToken": request_object_json["refresh_token"]
+            "refreshToken": request_object_json["refresh_token"],
+            "expiresIn": request_object_json.get("expires_in")
         }
         return user
 
     def get_account_info(self, id_token):
-        request_ref = "https://www.googleapis.com/identitytoolkit/v3/relyingparty/getAccountInfo?key={0}".format(self.api_key)
+        request_ref = f"{self.identity_toolkit_url}/getAccountInfo?key={self.api_key}"
         headers = {"content-type": "application/json; charset=UTF-8"}
         data = json.dumps({"idToken": id_token})
-        request_object = requests.post(request_ref, headers=headers, data=data)
+        request_object = self.requests.post(request_ref, headers=headers, data=data)
         raise_detailed_error(request_object)
         return request_object.json()
 
     def send_email_verification(self, id_token):
-        request_ref = "https://www.googleapis.com/identitytoolkit/v3/relyingparty/getOobConfirmationCode?key={0}".format(self.api_key)
+        request_ref = (f"{self.identity_toolkit_url}/getOobConfirmationCode"
+                       f"?key={self.api_key}")
         headers = {"content-type": "application/json; charset=UTF-8"}
         data = json.dumps({"requestType": "VERIFY_EMAIL", "idToken": id_token})
-        request_object = requests.post(request_ref, headers=headers, data=data)
+        request_object = self.requests.post(request_ref, headers=headers, data=data)
         raise_detailed_error(request_object)
         return request_object.json()
 
     def send_password_reset_email(self, email):
-        request_ref = "https://www.googleapis.com/identitytoolkit/v3/relyingparty/getOobConfirmationCode?key={0}".format(self.api_key)
+        request_ref = (f"{self.identity_toolkit_url}/getOobConfirmationCode"
+                       f"?key={self.api_key}")
         headers = {"content-type": "application/json; charset=UTF-8"}
         data = json.dumps({"requestType": "PASSWORD_RESET", "email": email})
-        request_object = requests.post(request_ref, headers=headers, data=data)
+        request_object = self.requests.post(request_ref, headers=headers, data=data)
         raise_detailed_error(request_object)
         return request_object.json()
 
     def verify_password_reset_code(self, reset_code, new_password):
-        request_ref = "https://www.googleapis.com/identitytoolkit/v3/relyingparty/resetPassword?key={0}".format(self.api_key)
+        request_ref = f"{self.identity_toolkit_url}/resetPassword?key={self.api_key}"
         headers = {"content-type": "application/json; charset=UTF-8"}
         data = json.dumps({"oobCode": reset_code, "newPassword": new_password})
-        request_object = requests.post(request_ref, headers=headers, data=data)
+        request_object = self.requests.post(request_ref, headers=headers, data=data)
         raise_detailed_error(request_object)
         return request_object.json()
 
     def create_user_with_email_and_password(self, email, password):
-        request_ref = "https://www.googleapis.com/identitytoolkit/v3/relyingparty/signupNewUser?key={0}".format(self.api_key)
+        request_ref = f"{self.identity_toolkit_url}/signupNewUser?key={self.api_key}"
         headers = {"content-type": "application/json; charset=UTF-8" }
         data = json.dumps({"email": email, "password": password, "returnSecureToken": True})
-        request_object = requests.post(request_ref, headers=headers, data=data)
+        request_object = self.requests.post(request_ref, headers=headers, data=data)
         raise_detailed_error(request_object)
         return request_object.json()
 
     def delete_user_account(self, id_token):
-        request_ref = "https://www.googleapis.com/identitytoolkit/v3/relyingparty/deleteAccount?key={0}".format(self.api_key)
+        request_ref = f"{self.identity_toolkit_url}/deleteAccount?key={self.api_key}"
         headers = {"content-type": "application/json; charset=UTF-8"}
         data = json.dumps({"idToken": id_token})
-        request_object = requests.post(request_ref, headers=headers, data=data)
+        request_object = self.requests.post(request_ref, headers=headers, data=data)
         raise_detailed_error(request_object)
         return request_object.json()
 
@@ -179,7 +209,7 @@ class Auth:
         request_ref = "https://identitytoolkit.googleapis.com/v1/accounts:update?key={0}".format(self.api_key)
         headers = {"content-type": "application/json; charset=UTF-8"}
         data = json.dumps({"idToken": id_token, "displayName": display_name, "photoURL": photo_url, "deleteAttribute": delete_attribute, "returnSecureToken": True})
-        request_object = requests.post(request_ref, headers=headers, data=data)
+        request_object = self.requests.post(request_ref, headers=headers, data=data)
         raise_detailed_error(request_object)
         return request_object.json()
 
@@ -200,8 +230,6 @@ class Database:
 
         self.path = ""
         self.build_query = {}
-        self.last_push_time = 0
-        self.last_rand_chars = []
 
     def order_by_key(self):
         self.build_query["orderBy"] = "$key"
@@ -277,6 +305,7 @@ class Database:
         json_kwargs = json_kwargs or {}
         build_query = self.build_query
         query_key = self.path.split("/")[-1]
+        warn_unbounded_query(self.path, build_query)
         request_ref = self.build_request_url(token)
         # headers
         headers = self.build_headers(token)
@@ -286,25 +315,17 @@ class Database:
         request_dict = request_object.json(**json_kwargs)
 
         # if primitive or simple query return
-        if isinstance(request_dict, list):
-            return PyreResponse(convert_list_to_pyre(request_dict), query_key)
-        if not isinstance(request_dict, dict):
-            return PyreResponse(request_dict, query_key)
-        if not build_query:
-            return PyreResponse(convert_to_pyre(request_dict.items()), query_key)
+        if not isinstance(request_dict, dict) or not build_query:
+            return PyreResponse.from_data(request_dict, query_key)
         # return keys if shallow
         if build_query.get("shallow"):
             return PyreResponse(request_dict.keys(), query_key)
-        # otherwise sort
-        sorted_response = None
+        # the server filters and limits the children, but returns them in no particular
+        # order, so only what it returned is sorted
         if build_query.get("orderBy"):
-            if build_query["orderBy"] == "$key":
-                sorted_response = sorted(request_dict.items(), key=lambda item: item[0])
-            elif build_query["orderBy"] == "$value":
-                sorted_response = sorted(request_dict.items(), key=lambda item: item[1])
-            else:
-                sorted_response = sorted(request_dict.items(), key=lambda item: (build_query["orderBy"] in item[1], item[1].get(build_query["orderBy"], "")))
-        return PyreResponse(convert_to_pyre(sorted_response), query_key)
+            sort_key = query_sort_key(build_query["orderBy"])
+            request_dict = dict(sorted(request_dict.items(), key=sort_key))
+        return PyreResponse.from_data(request_dict, query_key)
 
     def push(self, data, token=None, json_kwargs=None):
         json_kwargs = json_kwargs or {}
@@ -341,9 +362,12 @@ class Database:
         raise_detailed_error(request_object)
         return request_object.json()
 
-    def stream(self, stream_handler, token=None, stream_id=None, is_async=True):
+    def stream(self, stream_handler, token=None, stream_id=None, is_async=True,
+               metrics=None, recorder=None):
+        """Return a Stream passing the events of the path to `stream_handler`."""
         request_ref = self.build_request_url(token)
-        return Stream(request_ref, stream_handler, self.build_headers, stream_id, is_async)
+        return Stream(request_ref, stream_handler, self.build_headers, stream_id,
+                      is_async, metrics, recorder)
 
     def check_token(self, database_url, path, token):
         if token:
@@ -352,25 +376,7 @@ class Database:
             return '{0}{1}.json'.format(database_url, path)
 
     def generate_key(self):
-        push_chars = '-0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ_abcdefghijklmnopqrstuvwxyz'
-        now = int(time.time() * 1000)
-        duplicate_time = now == self.last_push_time
-        self.last_push_time = now
-        time_stamp_chars = [0] * 8
-        for i in reversed(range(0, 8)):
-            time_stamp_chars[i] = push_chars[now % 64]
-            now = int(math.floor(now / 64))
-        new_id = "".join(time_stamp_chars)
-        if not duplicate_time:
-            self.last_rand_chars = [randrange(64) for _ in range(12)]
-        else:
-            for i in range(0, 11):
-                if self.last_rand_chars[i] == 63:
-                    self.last_rand_chars[i] = 0
-                self.last_rand_chars[i] += 1
-        for i in range(0, 12):
-            new_id += push_chars[self.last_rand_chars[i]]
-        return new_id
+        return generate_push_id()
 
     def sort(self, origin, by_key, reverse=False):
         # unpack pyre objects
@@ -395,6 +401,44 @@ class Database:
             'value': request_object.json()
         }
 
+    def conditional_get(self, etag=None, token=None, json_kwargs=None, timeout=None):
+        """
+        Read the node unless its ETag is still `etag`.
+
+        Returns the ETag, whether the value was modified, whether the server
+        answered 304 Not Modified, the value (None when not modified, without
+        parsing the body) and the size of the body received. A server ignoring
+        `if-none-match` sends the unmodified value in full. `timeout` limits the
+        seconds the request may wait for the server, as in requests.
+        """
+        json_kwargs = json_kwargs or {}
+        request_ref = self.build_request_url(token)
+        headers = self.build_headers(token)
+        headers['X-Firebase-ETag'] = 'true'
+        if etag:
+            headers['if-none-match'] = etag
+        request_object = self.requests.get(request_ref, headers=headers,
+                                           timeout=timeout)
+        raise_detailed_error(request_object)
+        new_etag = request_object.headers.get('ETag', etag)
+        size = len(request_object.content)
+        not_modified = request_object.status_code == 304
+        if not_modified or (etag and new_etag == etag):
+            return {
+                'ETag': etag,
+                'modified': False,
+                'not_modified': not_modified,
+                'value': None,
+                'size': size
+            }
+        return {
+            'ETag': new_etag,
+            'modified': True,
+            'not_modified': False,
+            'value': request_object.json(**json_kwargs),
+            'size': size
+        }
+
     def conditional_set(self, data, etag, token=None, json_kwargs=None):
         json_kwargs = json_kwargs or {}
         request_ref = self.check_token(self.database_url, self.path, token)
@@ -445,10 +489,144 @@ class Database:
         return request_object.json()
 
 
+class TransferProgress:
+    """
+    Progress of a storage upload or download.
+
+    Passed to progress callbacks after every chunk. `total` is None if the size
+    is unknown.
+    """
+
+    def __init__(self, total=None, transferred=0):
+        """Start a transfer of `total` bytes, `transferred` of them already."""
+        self.total = total
+        # bytes transferred before this transfer, e.g. by an interrupted download
+        self.resumed_from = transferred
+        self.transferred = transferred
+        self.started = time.monotonic()
+        self.elapsed = 0.0
+
+    @property
+    def throughput(self):
+        """Bytes per second transferred by this transfer."""
+        if not self.elapsed:
+            return 0.0
+        return (self.transferred - self.resumed_from) / self.elapsed
+
+    def update(self, size, callback=None):
+        """Count `size` more bytes transferred, then call `callback`."""
+        self.transferred += size
+        self.elapsed = time.monotonic() - self.started
+        if callback is not None:
+            callback(self)
+
+
+class _ChunkedReader:
+    """
+    File-like body streaming a file object in chunks of `chunk_size`.
+
+    The body has a length, so requests sends a Content-Length rather than a
+    chunked body.
+    """
+
+    def __init__(self, file_object, size, chunk_size, progress, callback):
+        self.file_object = file_object
+        self.size = size
+        self.chunk_size = chunk_size
+        self.progress = progress
+        self.callback = callback
+
+    def __len__(self):
+        return self.size - (self.progress.transferred - self.progress.resumed_from)
+
+    def read(self, size=-1):
+        chunk = self.file_object.read(self.chunk_size)
+        if chunk:
+            self.progress.update(len(chunk), self.callback)
+        return chunk
+
+
+class _MappedReader:
+    """
+    Sized body sending a file from a read-only memory mapping.
+
+    Chunks are views of the mapping rather than copies. Pages already sent are
+    released as the upload proceeds, so the resident size stays bounded by a
+    few chunks.
+    """
+
+    def __init__(self, file_object, size, chunk_size, callback):
+        """Map `size` bytes of `file_object`, sent in chunks of whole pages."""
+        self.mapping = mmap.mmap(file_object.fileno(), 0, access=mmap.ACCESS_READ)
+        self.view = memoryview(self.mapping)
+        self.size = size
+        # whole pages, so sent chunks can be released
+        self.chunk_size = max(mmap.PAGESIZE, chunk_size - chunk_size % mmap.PAGESIZE)
+        self.offset = 0
+        self.progress = TransferProgress(size)
+        self.callback = callback
+        if hasattr(self.mapping, 'madvise'):
+            self.mapping.madvise(mmap.MADV_SEQUENTIAL)
+
+    def __len__(self):
+        return self.size - self.offset
+
+    def read(self, size=-1):
+        # the previous chunk has been sent by now
+        if self.offset >= self.chunk_size and hasattr(mmap, 'MADV_DONTNEED'):
+            self.mapping.madvise(mmap.MADV_DONTNEED,
+                                 self.offset - self.chunk_size,
+                                 self.chunk_size)
+        chunk = self.view[self.offset:self.offset + self.chunk_size]
+        self.offset += len(chunk)
+        if chunk:
+            self.progress.update(len(chunk), self.callback)
+        return chunk
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        try:
+            self.view.release()
+            self.mapping.close()
+        except BufferError:
+            # a chunk is still referenced, the mapping is closed once it is not
+            pass
+
+
+def _upload_body(file_object, chunk_size, callback):
+    """
+    Return a body streaming a file object in chunks.
+
+    The body is sized if the file is seekable, otherwise it is sent with chunked
+    transfer encoding.
+    """
+    size = _remaining_size(file_object)
+    transfer = TransferProgress(size)
+    if size is None:
+        return iter(lambda: _read_chunk(file_object, chunk_size, transfer, callback),
+                    b'')
+    return _ChunkedReader(file_object, size, chunk_size, transfer, callback)
+
+
+def _remaining_size(file_object):
+    """Return the bytes left to read from a file object, None if not seekable."""
+    try:
+        position = file_object.tell()
+        end = file_object.seek(0, os.SEEK_END)
+        file_object.seek(position)
+    except (AttributeError, OSError):
+        return None
+    return end - position
+
+
 class Storage:
     """ Storage Service """
-    def __init__(self, credentials, storage_bucket, requests):
-        self.storage_bucket = "https://firebasestorage.googleapis.com/v0/b/" + storage_bucket
+    def __init__(self, credentials, storage_bucket, requests,
+                 storage_url=STORAGE_URL):
+        """Create the service, against the Google endpoint unless overridden."""
+        self.storage_bucket = storage_url + "/v0/b/" + storage_bucket
         self.credentials = credentials
         self.requests = requests
         self.path = ""
@@ -466,37 +644,56 @@ class Storage:
             self.path = new_path
         return self
 
-    def put(self, file, token=None, content_type=None):
+    def put(self, file, token=None, content_type=None, chunk_size=DEFAULT_CHUNK_SIZE,
+            progress=None, use_mmap=None):
+        """
+        Upload `file`, a path or a binary file object.
+
+        The file is streamed in chunks of `chunk_size` so memory use does not
+        grow with the file. `progress` is called with a TransferProgress after
+        every chunk.
+
+        With `use_mmap`, a file given by path is memory-mapped and sent straight
+        from the mapping instead of being read into buffers. By default files of
+        MMAP_THRESHOLD bytes or more are.
+        """
         # reset path
         path = self.path
         self.path = None
-        if isinstance(file, str):
-            file_object = open(file, 'rb')
-        else:
-            file_object = file
-        request_ref = self.storage_bucket + "/o?name={0}".format(path)
-        if token:
-            headers = {"Authorization": "Firebase " + token}
-            request_object = self.requests.post(request_ref, headers=headers, data=file_object)
-            raise_detailed_error(request_object)
-            return request_object.json()
-        elif self.credentials:
+        if self.credentials:
             blob = self.bucket.blob(path)
 
             # Add metadata to enable file previews in console
             blob.metadata = {"firebaseStorageDownloadTokens": str(uuid4())}
             if isinstance(file, str):
-                return blob.upload_from_filename(filename=file)
-            else:
-                # If the file is not a string we need to patch the blob after upload to set the content type
-                blob.upload_from_string(file)
-                if content_type:
-                    blob.content_type = content_type
-                blob.patch()
-        else:
-            request_object = self.requests.post(request_ref, data=file_object)
-            raise_detailed_error(request_object)
-            return request_object.json()
+                return blob.upload_from_filename(filename=file,
+                                                 content_type=content_type)
+            blob.chunk_size = chunk_size
+            return blob.upload_from_file(file, content_type=content_type)
+
+        if not isinstance(file, str):
+            body = _upload_body(file, chunk_size, progress)
+            return self._post(path, token, content_type, body)
+        with open(file, 'rb') as file_object:
+            size = os.fstat(file_object.fileno()).st_size
+            # empty files cannot be mapped
+            if size and (use_mmap or (use_mmap is None and size >= MMAP_THRESHOLD)):
+                with _MappedReader(file_object, size, chunk_size, progress) as body:
+                    return self._post(path, token, content_type, body)
+            body = _upload_body(file_object, chunk_size, progress)
+            return self._post(path, token, content_type, body)
+
+    def _post(self, path, token, content_type, data):
+        request_ref = f"{self.storage_bucket}/o?name={quote(path, safe='')}"
+        headers = {}
+        if token:
+            headers["Authorization"] = "Firebase " + token
+        if content_type:
+            headers["Content-Type"] = content_type
+
+        request_object = self.requests.post(request_ref, headers=headers, data=data)
+        raise_detailed_error(request_object)
+        return request_object.json()
 
     def delete(self, name, token):
         if self.credentials:
@@ -510,7 +707,17 @@ class Storage:
                 request_object = self.requests.delete(request_ref)
             raise_detailed_error(request_object)
 
-    def download(self, path, filename, token=None):
+    def download(self, path, filename, token=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                 progress=None, resume=False):
+        """
+        Download the file at the path of the reference to `filename`.
+
+        The file is streamed in chunks of `chunk_size` over the shared session.
+        `progress` is called with a TransferProgress after every chunk.
+
+        With `resume`, a partial `filename` left by an interrupted download is
+        completed with an HTTP Range request rather than downloaded again.
+        """
         # remove leading backlash
         url = self.get_url(token)
         if path.startswith('/'):
@@ -519,19 +726,32 @@ class Storage:
             blob = self.bucket.get_blob(path)
             if not blob is None:
                 blob.download_to_filename(filename)
-        elif token:
-                headers = {"Authorization": "Firebase " + token}
-                r = requests.get(url, stream=True, headers=headers)
-                if r.status_code == 200:
-                    with open(filename, 'wb') as f:
-                        for chunk in r:
-                            f.write(chunk)
-        else:
-            r = requests.get(url, stream=True)
-            if r.status_code == 200:
-                with open(filename, 'wb') as f:
-                    for chunk in r:
-                        f.write(chunk)
+            return
+
+        headers = {}
+        if token:
+            headers["Authorization"] = "Firebase " + token
+        offset = os.path.getsize(filename) if resume and os.path.exists(filename) else 0
+        if offset:
+            headers["Range"] = f"bytes={offset}-"
+
+        with self.requests.get(url, stream=True, headers=headers) as r:
+            if r.status_code == 416 and offset:
+                # the partial file is already complete
+                return
+            raise_detailed_error(r)
+            if r.status_code != 206:
+                # the server sent the whole file
+                offset = 0
+            length = r.headers.get('Content-Length')
+            total = offset + int(length) if length else None
+            transfer = TransferProgress(total, offset)
+            with open(filename, 'ab' if offset else 'wb') as f:
+                for chunk in r.iter_content(chunk_size):
+                    f.write(chunk)
+                    transfer.update(len(chunk), progress)
+        _LOGGER.debug('Downloaded %s: %d bytes at %.0f B/s',
+                      filename, transfer.transferred, transfer.throughput)
 
     def get_url(self, token):
         path = self.path if self.path else ''
@@ -546,6 +766,141 @@ class Storage:
         return self.bucket.list_blobs()
 
 
+def _read_chunk(file_object, chunk_size, transfer, callback):
+    chunk = file_object.read(chunk_size)
+    if chunk:
+        transfer.update(len(chunk), callback)
+    return chunk
+
+
+def firebase_order(value):
+    """
+    Return a sort key ordering values as Firebase orders children.
+
+    Values are ordered null, false, true, numbers, strings and finally objects.
+    """
+    if value is None:
+        return (0,)
+    if isinstance(value, bool):
+        return (1 + value,)
+    if isinstance(value, (int, float)):
+        return (3, value)
+    if isinstance(value, str):
+        return (4, value)
+    return (5,)
+
+
+def key_order(key):
+    """
+    Return a sort key ordering keys as Firebase does.
+
+    Keys parsing as 32-bit integers come first, numerically, then the other keys
+    lexicographically.
+    """
+    try:
+        number = int(key)
+    except ValueError:
+        return (1, 0, key)
+    if -2 ** 31 <= number < 2 ** 31 and str(number) == key:
+        return (0, number, key)
+    return (1, 0, key)
+
+
+def query_sort_key(order_by):
+    """
+    Return the sort key of the (key, value) children of a response.
+
+    The key orders children by the orderBy parameter of the query of the
+    response. Children ordering equal are ordered by key.
+    """
+    if order_by == "$key":
+        return lambda item: key_order(item[0])
+    if order_by == "$value":
+        return lambda item: (firebase_order(item[1]), key_order(item[0]))
+
+    path = order_by.split("/")
+
+    def child_order(item):
+        value = item[1]
+        for token in path:
+            value = value.get(token) if isinstance(value, dict) else None
+        return (firebase_order(value), key_order(item[0]))
+
+    return child_order
+
+
+# Queries already warned about, see warn_unbounded_query
+_unbounded_queries = set()
+
+
+def warn_unbounded_query(path, query):
+    """
+    Log a warning when a query is sure to download a whole subtree.
+
+    That is when it orders children without limiting them or when it reads a
+    root collection, such as /devices, as a whole. The warning is logged once
+    per path and ordering.
+    """
+    if query.get("shallow") or any(
+            param in query for param in ("limitToFirst", "limitToLast", "equalTo")):
+        return
+    if "orderBy" in query:
+        if "startAt" in query and "endAt" in query:
+            return
+        reason = f"orders by {query['orderBy']} without a limit or range"
+    elif path.count("/") == 0:
+        reason = "reads a root collection"
+    else:
+        return
+
+    signature = (path, query.get("orderBy"))
+    if signature in _unbounded_queries:
+        return
+    _unbounded_queries.add(signature)
+    _LOGGER.warning("Query of /%s %s and downloads the whole subtree", path, reason)
+
+
+PUSH_CHARS = '-0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ_abcdefghijklmnopqrstuvwxyz'
+# Every pair of push characters, indexed by the 12 bits they encode
+_PUSH_CHAR_PAIRS = [a + b for a in PUSH_CHARS for b in PUSH_CHARS]
+# A push ID encodes 48 bits of milliseconds and 72 random bits, 12 bits a pair
+_RANDOM_BITS = 72
+_PAIR_SHIFTS = tuple(range(108, -1, -12))
+
+
+class PushIdGenerator:
+    """
+    Generator of Firebase push IDs, sorting in the order they were generated.
+
+    An ID is 8 characters of the time in milliseconds followed by 12 random
+    characters. IDs are strictly increasing across all threads. IDs of the same
+    millisecond increment the random part of the previous ID, and so do IDs
+    generated while the clock is behind the previous ID.
+    """
+
+    def __init__(self):
+        """Create a generator, independent of the IDs of other generators."""
+        self._lock = threading.Lock()
+        self._last = 0
+
+    def __call__(self):
+        """Return a new push ID."""
+        now = int(time.time() * 1000) << _RANDOM_BITS
+        with self._lock:
+            if now > self._last:
+                value = now | random.getrandbits(_RANDOM_BITS)
+            else:
+                # carries into the time once the random part overflows
+                value = self._last + 1
+            self._last = value
+        return ''.join([_PUSH_CHAR_PAIRS[(value >> shift) & 0xfff]
+                        for shift in _PAIR_SHIFTS])
+
+
+# Shared by every Database, as SmarterClient creates one per request
+generate_push_id = PushIdGenerator()
+
+
 def raise_detailed_error(request_object):
     try:
         request_object.raise_for_status()
@@ -564,20 +919,51 @@ def convert_to_pyre(items):
 
 def convert_list_to_pyre(items):
     pyre_list = []
-    for item in items:
-        pyre_list.append(Pyre([items.index(item), item]))
+    for index, item in enumerate(items):
+        pyre_list.append(Pyre([index, item]))
     return pyre_list
 
 
+# Marks a response built from Pyre objects rather than the decoded JSON
+_NO_DATA = object()
+
+
 class PyreResponse:
     def __init__(self, pyres, query_key):
         self.pyres = pyres
         self.query_key = query_key
+        self._data = _NO_DATA
+
+    @classmethod
+    def from_data(cls, data, query_key):
+        """
+        Wrap decoded JSON as is.
+
+        The items of a list or dict are only wrapped in Pyre objects as they are
+        accessed, see PyreView.
+        """
+        pyres = PyreView(data) if isinstance(data, (list, dict)) else data
+        response = cls(pyres, query_key)
+        response._data = data
+        return response
 
     def __getitem__(self,index):
         return self.pyres[index]
 
+    def raw(self):
+        """
+        Return the decoded JSON of the response, without copying it.
+
+        Responses of ordered queries return their items in order, as val() does.
+        """
+        if self._data is not _NO_DATA:
+            return self._data
+        return self.val()
+
     def val(self):
+        if self._data is not _NO_DATA:
+            # the decoded JSON, already in the shape val() would rebuild
+            return self._data
         if isinstance(self.pyres, list) and self.pyres:
             # unpack pyres into OrderedDict
             pyre_list = []
@@ -598,10 +984,50 @@ class PyreResponse:
         return self.query_key
 
     def each(self):
-        if isinstance(self.pyres, list):
+        if isinstance(self.pyres, (list, PyreView)):
             return self.pyres
 
 
+class PyreView:
+    """
+    Read-only sequence of the items of a decoded list or dict.
+
+    Items are wrapped in Pyre objects as they are accessed rather than all up
+    front.
+    """
+
+    def __init__(self, data):
+        """Create a view of `data`, a decoded list or dict."""
+        self.data = data
+        # Items of a dict, listed on the first access by position
+        self._dict_items = None
+
+    def _items(self):
+        if isinstance(self.data, list):
+            return enumerate(self.data)
+        return iter(self.data.items())
+
+    def __len__(self):
+        """Return the number of items."""
+        return len(self.data)
+
+    def __iter__(self):
+        """Iterate over the items, wrapped in Pyre objects."""
+        for item in self._items():
+            yield Pyre(item)
+
+    def __getitem__(self, index):
+        """Return the item at a position, or a list of the items of a slice."""
+        if isinstance(index, slice):
+            return [self[i] for i in range(len(self))[index]]
+        index = range(len(self))[index]
+        if isinstance(self.data, list):
+            return Pyre((index, self.data[index]))
+        if self._dict_items is None:
+            self._dict_items = list(self.data.items())
+        return Pyre(self._dict_items[index])
+
+
 class Pyre:
     def __init__(self, item):
         self.item = item
@@ -623,13 +1049,17 @@ class KeepAuthSession(Session):
 
 
 class ClosableSSEClient(SSEClient):
-    def __init__(self, *args, **kwargs):
+    def __init__(self, *args, on_connect=None, **kwargs):
+        """Create the client, calling `on_connect` after every connect."""
         self.should_connect = True
+        self.on_connect = on_connect
         super(ClosableSSEClient, self).__init__(*args, **kwargs)
 
     def _connect(self):
         if self.should_connect:
             super(ClosableSSEClient, self)._connect()
+            if self.on_connect is not None:
+                self.on_connect()
         else:
             raise StopIteration()
 
@@ -641,13 +1071,22 @@ class ClosableSSEClient(SSEClient):
 
 
 class Stream:
-    def __init__(self, url, stream_handler, build_headers, stream_id, is_async):
+    def __init__(self, url, stream_handler, build_headers, stream_id, is_async,
+                 metrics=None, recorder=None):
+        """Open the stream of `url`, in a thread of its own if `is_async`."""
         self.build_headers = build_headers
         self.url = url
         self.stream_handler = stream_handler
         self.stream_id = stream_id
         self.sse = None
         self.thread = None
+        # Optional recorder of stream counters and timings, see smarter_client.metrics
+        self.metrics = metrics
+        # Optional recorder of the raw event data, see smarter_client.recording
+        self.recorder = recorder
+        self.connects = 0
+        # Monotonic time of the last connect, event or keep-alive
+        self.last_message_at = time.monotonic()
 
         if is_async:
             self.start()
@@ -666,11 +1105,36 @@ class Stream:
         self.thread.start()
         return self
 
+    def _on_connect(self):
+        self.connects += 1
+        self.last_message_at = time.monotonic()
+        if self.metrics is not None:
+            self.metrics.increment("stream.connects" if self.connects == 1
+                                   else "stream.reconnects")
+
     def start_stream(self):
-        self.sse = ClosableSSEClient(self.url, session=self.make_session(), build_headers=self.build_headers)
+        self.sse = ClosableSSEClient(self.url,
+                                     session=self.make_session(),
+                                     build_headers=self.build_headers,
+                                     on_connect=self._on_connect)
+        try:
+            self._handle_messages()
+        except HTTPError as e:
+            # e.g. reconnecting with a revoked token, the stream then reports unhealthy
+            _LOGGER.warning('Stream of %s ended: %s', self.url.split('?')[0], e)
+
+    def _handle_messages(self):
         for msg in self.sse:
+            self.last_message_at = time.monotonic()
             if msg:
-                msg_data = json.loads(msg.data)
+                if self.metrics is not None:
+                    started = time.perf_counter()
+                    msg_data = json.loads(msg.data)
+                    self.metrics.record("stream.parse", time.perf_counter() - started)
+                else:
+                    msg_data = json.loads(msg.data)
+                if self.recorder is not None:
+                    self.recorder.record(msg.event, msg.data)
                 msg_data["event"] = msg.event
                 if self.stream_id:
                     msg_data["stream_id"] = self.stream_id
@@ -2,8 +2,12 @@
 
 from __future__ import annotations
 
+import asyncio
+from collections.abc import Callable, Mapping
 from dataclasses import dataclass
 from functools import partial
+from types import MappingProxyType
+from typing import Any
 
 from homeassistant.components.sensor import (
     SensorDeviceClass,
@@ -12,13 +16,28 @@ from homeassistant.components.sensor import (
     SensorStateClass,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import PERCENTAGE, UnitOfTemperature
-from homeassistant.core import HassJobType, HomeAssistant, SupportsResponse
+from homeassistant.const import (
+    PERCENTAGE,
+    EntityCategory,
+    UnitOfTemperature,
+    UnitOfTime,
+)
+from homeassistant.core import (
+    HassJobType,
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+)
 from homeassistant.helpers import service
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
 from .const import (
     DOMAIN,
+    SERVICE_ATTR_COMMAND_DATA_BOOLEAN,
+    SERVICE_ATTR_COMMAND_DATA_NUMBER,
+    SERVICE_ATTR_COMMAND_DATA_TEXT,
+    SERVICE_ATTR_COMMAND_NAME,
     SERVICE_GET_COMMANDS,
     SERVICE_QUICK_BOIL,
     SERVICE_SCHEMA_GET_COMMANDS,
@@ -28,6 +47,10 @@ from .const import (
     SmarterSensorEntityFeature,
 )
 from .entity import SmarterEntity
+from .smarter_client.history import StatusHistory
+from .smarter_client.managed_devices.base import BaseDevice
+from .smarter_client.metrics import Metrics
+from .smarter_hub import SmarterHub
 
 
 @dataclass(frozen=True, kw_only=True)
@@ -76,6 +99,95 @@ SENSOR_TYPES: tuple[SmarterSensorEntityDescription, ...] = (
 )
 
 
+@dataclass(frozen=True, kw_only=True)
+class SmarterDiagnosticSensorEntityDescription(SmarterSensorEntityDescription):
+    """Describe a sensor exposing a metric recorded for a device."""
+
+    value_fn: Callable[[Metrics, str], float]
+
+
+DIAGNOSTIC_SENSOR_TYPES: tuple[SmarterDiagnosticSensorEntityDescription, ...] = (
+    SmarterDiagnosticSensorEntityDescription(
+        key="events_received",
+        name="Events Received",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        icon="mdi:counter",
+        value_fn=lambda metrics, device_id: metrics.counter("model.events", device_id),
+    ),
+    SmarterDiagnosticSensorEntityDescription(
+        key="stream_reconnects",
+        name="Stream Reconnects",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        icon="mdi:connection",
+        value_fn=lambda metrics, device_id: metrics.counter(
+            "stream.reconnects", device_id
+        ),
+    ),
+    SmarterDiagnosticSensorEntityDescription(
+        key="commands_sent",
+        name="Commands Sent",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        icon="mdi:send",
+        value_fn=lambda metrics, device_id: metrics.counter("commands.sent", device_id),
+    ),
+    SmarterDiagnosticSensorEntityDescription(
+        key="command_round_trip",
+        name="Command Round Trip",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda metrics, device_id: metrics.timer_stats(
+            "commands.round_trip", device_id
+        )["last_ms"],
+    ),
+    SmarterDiagnosticSensorEntityDescription(
+        key="event_apply_time",
+        name="Event Apply Time",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda metrics, device_id: metrics.timer_stats(
+            "model.apply", device_id
+        )["mean_ms"],
+    ),
+)
+
+
+def _per_minute(rate: float | None) -> float | None:
+    return None if rate is None else rate * 60
+
+
+@dataclass(frozen=True, kw_only=True)
+class SmarterHistorySensorEntityDescription(SmarterSensorEntityDescription):
+    """Describe a sensor derived from the recent status samples of a device."""
+
+    value_fn: Callable[[StatusHistory, Mapping[str, Any]], float | None]
+
+
+HISTORY_SENSOR_TYPES: tuple[SmarterHistorySensorEntityDescription, ...] = (
+    SmarterHistorySensorEntityDescription(
+        key="heating_rate",
+        name="Heating Rate",
+        native_unit_of_measurement=f"{UnitOfTemperature.CELSIUS}/min",
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=1,
+        icon="mdi:thermometer-chevron-up",
+        value_fn=lambda history, status: _per_minute(history.rate("water_temperature")),
+    ),
+    SmarterHistorySensorEntityDescription(
+        key="time_to_target",
+        name="Time to Target",
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        suggested_display_precision=0,
+        icon="mdi:timer-sand",
+        value_fn=lambda history, status: history.time_to(
+            "water_temperature", status.get("target_temperature")
+        ),
+    ),
+)
+
+
 async def async_setup_entry(
     hass: HomeAssistant,
     config_entry: ConfigEntry,
@@ -84,10 +196,11 @@ async def async_setup_entry(
     """Set up Smarter sensors."""
     data = hass.data[DOMAIN][config_entry.entry_id]
     devices = data.get("devices")
+    coordinator = data["coordinator"]
 
     # Create detailed sensor entities for each device
     entities = [
-        SmarterSensor(device, description)
+        SmarterSensor(coordinator, device, description)
         for device in devices
         for description in SENSOR_TYPES
     ]
@@ -96,6 +209,7 @@ async def async_setup_entry(
     # These will be the entities targeted by the services
     device_entities = [
         SmarterDeviceSensor(
+            coordinator,
             device,
             SmarterSensorEntityDescription(
                 key="device", name=None, has_entity_name=True, icon="mdi:kettle"
@@ -104,8 +218,25 @@ async def async_setup_entry(
         for device in data.get("devices")
     ]
 
-    async_add_entities(entities + device_entities, True)
+    # Metrics of the event and command paths, disabled until enabled by the user
+    diagnostic_entities = [
+        SmarterDiagnosticSensor(coordinator, device, description)
+        for device in devices
+        for description in DIAGNOSTIC_SENSOR_TYPES
+    ]
+
+    # Statistics of the recent status samples kept by every device
+    history_entities = [
+        SmarterHistorySensor(coordinator, device, description)
+        for device in devices
+        for description in HISTORY_SENSOR_TYPES
+    ]
+
+    async_add_entities(
+        entities + device_entities + diagnostic_entities + history_entities
+    )
 
+    data["device_entities"] = device_entities
     device_entities_map = {entity.entity_id: entity for entity in device_entities}
 
     _register_services(hass, device_entities_map)
@@ -117,25 +248,101 @@ def _register_services(hass, device_entities_map):
         handler_name,
         schema,
     ) in SmarterDeviceSensor.get_service_metadata():
-        hass.services.async_register(
-            DOMAIN,
-            service_name,
-            partial(
+        if service_name in BULK_COMMAND_SERVICES:
+            handler = partial(_async_handle_bulk_command, hass)
+        else:
+            handler = partial(
                 service.entity_service_call,
                 hass,
                 device_entities_map,
                 handler_name,
                 required_features=[SmarterSensorEntityFeature.SERVICE_AGENT],
-            ),
+            )
+
+        hass.services.async_register(
+            DOMAIN,
+            service_name,
+            handler,
             schema,
             SupportsResponse.OPTIONAL,
             job_type=HassJobType.Coroutinefunction,
         )
 
 
+def get_command_value(
+    command_data_text: str = None,
+    command_data_number: float = None,
+    command_data_boolean: bool = None,
+) -> Any:
+    """Get the value to send with a command from the service call data."""
+    # The API requires a `value` to be set. The official client sends `True` if no
+    # actual value is needed
+    return command_data_text or command_data_number or command_data_boolean or True
+
+
+def _get_send_command(call: ServiceCall) -> tuple[str, Any]:
+    return (
+        call.data[SERVICE_ATTR_COMMAND_NAME],
+        get_command_value(
+            call.data.get(SERVICE_ATTR_COMMAND_DATA_TEXT),
+            call.data.get(SERVICE_ATTR_COMMAND_DATA_NUMBER),
+            call.data.get(SERVICE_ATTR_COMMAND_DATA_BOOLEAN),
+        ),
+    )
+
+
+def _get_quick_boil_command(call: ServiceCall) -> tuple[str, Any]:
+    return ("start_auto_boil", True)
+
+
+# Services that send one command to every targeted device at once through the hub,
+# instead of calling each entity in turn.
+BULK_COMMAND_SERVICES = {
+    SERVICE_QUICK_BOIL: _get_quick_boil_command,
+    SERVICE_SEND_COMMAND: _get_send_command,
+}
+
+
+async def _async_handle_bulk_command(
+    hass: HomeAssistant, call: ServiceCall
+) -> ServiceResponse:
+    """
+    Send a command to all targeted devices concurrently.
+
+    Returns a dictionary keyed by entity ID of the targeted device sensors. Each
+    value holds the API `result` (or an `error`) and the `latency_ms` of the call.
+    """
+    command_name, command_data = BULK_COMMAND_SERVICES[call.service](call)
+
+    hubs: dict[SmarterDeviceSensor, SmarterHub] = {
+        entity: data["hub"]
+        for data in hass.data[DOMAIN].values()
+        for entity in data.get("device_entities", ())
+    }
+    targets: dict[SmarterHub, dict[str, BaseDevice]] = {}
+    for entity in await service.async_extract_entities(hass, hubs, call):
+        # As entity_service_call does with `required_features`
+        if not entity.supported_features & SmarterSensorEntityFeature.SERVICE_AGENT:
+            continue
+        targets.setdefault(hubs[entity], {})[entity.entity_id] = entity.device
+
+    responses = await asyncio.gather(
+        *(
+            hub.send_command_bulk(devices, command_name, command_data)
+            for hub, devices in targets.items()
+        )
+    )
+
+    return {
+        entity_id: response
+        for hub_response in responses
+        for entity_id, response in hub_response.items()
+    }
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry):
     """Remove services and unload sensor entry."""
-    for (service_name,) in SmarterDeviceSensor.get_service_metadata():
+    for service_name, *_ in SmarterDeviceSensor.get_service_metadata():
         hass.services.async_remove(DOMAIN, service_name)
 
 
@@ -146,10 +353,10 @@ class SmarterSensor(SmarterEntity, SensorEntity):
 
     entity_description: SmarterSensorEntityDescription
 
-    @property
-    def native_value(self):
-        """Return the state of the sensor."""
-        return self.device.status.get(self.entity_description.key)
+    def _update_derived_state(self) -> None:
+        """Cache the sensor value from the device status."""
+        super()._update_derived_state()
+        self._attr_native_value = self.status.get(self.entity_description.key)
 
 
 class SmarterDeviceSensor(SmarterSensor):
@@ -167,8 +374,11 @@ class SmarterDeviceSensor(SmarterSensor):
         """
         Get metadata for supported services.
 
+        Services sending commands are handled for all targeted devices at once,
+        see `BULK_COMMAND_SERVICES`, so they have no entity handler.
+
         Returns:
-            tuple[str,str,Schema]: (Service Name, Handler name, Schema)
+            tuple[str,str|None,Schema]: (Service Name, Handler name, Schema)
         """
         return (
             (
@@ -176,64 +386,88 @@ class SmarterDeviceSensor(SmarterSensor):
                 clazz.async_get_commands.__name__,
                 SERVICE_SCHEMA_GET_COMMANDS,
             ),
-            (
-                SERVICE_QUICK_BOIL,
-                clazz.async_quick_boil.__name__,
-                SERVICE_SCHEMA_QUICK_BOIL,
-            ),
-            (
-                SERVICE_SEND_COMMAND,
-                clazz.async_send_command.__name__,
-                SERVICE_SCHEMA_SEND_COMMAND,
-            ),
+            (SERVICE_QUICK_BOIL, None, SERVICE_SCHEMA_QUICK_BOIL),
+            (SERVICE_SEND_COMMAND, None, SERVICE_SCHEMA_SEND_COMMAND),
         )
 
-    @property
-    def native_value(self):
-        """Return the state of the sensor."""
-        return self.device.status.get("state")
-
-    @property
-    def extra_state_attributes(self):
-        """Return extra device attributes associated with entity."""
-        return {"device_id": self.device.id, **self.device.status}
-
-    async def async_quick_boil(self):
-        """
-        Send the quick_boil command on the device.
-
-        Equivalent to send_command("start_auto_boil", True).
-        """
-        return self.async_send_command("start_auto_boil", True)
-
-    async def async_send_command(
-        self,
-        command_name: str,
-        command_data_text: str = None,
-        command_data_number: float = None,
-        command_data_boolean: bool = None,
-    ):
-        """Send command to device."""
-        # The API requires a `value` to be set. The official client sends `True` if no
-        # actual value is needed
-        return await self.hass.async_add_executor_job(
-            self.device.send_command,
-            command_name,
-            command_data_text or command_data_number or command_data_boolean or True,
+    def _update_derived_state(self) -> None:
+        """Cache the device state and expose the full status as attributes."""
+        super()._update_derived_state()
+        status = self.status
+        self._attr_native_value = status.get("state")
+        self._attr_extra_state_attributes = MappingProxyType(
+            {"device_id": self.device.id, **status}
         )
 
     async def async_get_commands(self):
         """
         Get list of commands supported by the underlying device.
 
-        Returns a list of dictionaries. Each dictionary has `name` and `example` keys.
-        The value under the `example` key is a dictionary providing information on the
-        data that can be passed to the command.
+        Returns a list of dictionaries. Each dictionary has `name`, `example` and
+        `value_type` keys. The value under the `example` key is a dictionary providing
+        information on the data that can be passed to the command, and `value_type`
+        is the type inferred from it (`boolean`, `number`, `text`, `object` or None).
 
         Returns:
-            list[dict["name"|"example]]
+            list[dict["name"|"example"|"value_type"]]
         """
-        return [
-            {"name": command.name, "example": command.example}
-            for command in self.device.device.commands.values()
-        ]
+        return [command._asdict() for command in self.device.command_catalogue.values()]
+
+
+class SmarterDiagnosticSensor(SmarterSensor):
+    """
+    Representation of a metric recorded for a device.
+
+    Metrics change without a status update of the device, so these sensors are
+    polled.
+    """
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+
+    entity_description: SmarterDiagnosticSensorEntityDescription
+
+    def _update_derived_state(self) -> None:
+        """Cache the metric value."""
+        super()._update_derived_state()
+        self._attr_native_value = self.entity_description.value_fn(
+            self.device.device.client.metrics, self.device.id
+        )
+
+    @property
+    def should_poll(self) -> bool:
+        """Poll for metric changes."""
+        return True
+
+    async def async_update(self) -> None:
+        """Read the latest metric value, without refreshing the coordinator."""
+        self._update_derived_state()
+
+
+class SmarterHistorySensor(SmarterSensor):
+    """
+    Representation of a statistic of the recent status samples of a device.
+
+    The samples are kept by the device as its status changes, so the statistic
+    is computed without querying the recorder. Samples age out of the window of
+    the statistic while the device reports nothing, so these sensors are also
+    polled.
+    """
+
+    entity_description: SmarterHistorySensorEntityDescription
+
+    def _update_derived_state(self) -> None:
+        """Cache the statistic."""
+        super()._update_derived_state()
+        self._attr_native_value = self.entity_description.value_fn(
+            self.device.history, self.status
+        )
+
+    @property
+    def should_poll(self) -> bool:
+        """Poll for samples leaving the window of the statistic."""
+        return True
+
+    async def async_update(self) -> None:
+        """Recompute the statistic, without refreshing the coordinator."""
+        self._update_derived_state()
@@ -2,11 +2,13 @@ from __future__ import annotations
 
 from abc import ABCMeta
 from abc import abstractmethod
-from typing import Any, Callable, Self
-from pprint import pprint
+from collections.abc import Callable
+from typing import Any, NamedTuple, Self
 from ...pyrebase.pyrebase import Stream
 
 import datetime
+import threading
+import time
 from ..dict_util import delete_dict, patch_dict, put_dict
 from . import smarter_client
 import logging
@@ -41,14 +43,19 @@ class BaseEntity(metaclass=ABCMeta):
 
     def __init__(self, client: smarter_client.SmarterClient):
         self.client = client
+        # Serialises the events applied to the entity, e.g. by its stream and poller
+        self._event_lock = threading.Lock()
 
     # Public methods
     def fetch(self):
         if self.is_stub:
-            self._data = self._fetch()
-            _LOGGER.info('Fetched network %o', self._data)
-            self._init_data()
-            self.is_stub = False
+            data = self._fetch()
+            _LOGGER.info('Fetched network %o', data)
+            # Published as events are, so readers never see data and state apart
+            with self._event_lock:
+                self._data = data
+                self._init_data()
+                self.is_stub = False
 
     # Private methods
 
@@ -70,19 +77,25 @@ class BaseEntity(metaclass=ABCMeta):
         path: str = event.get('path')
         data: dict = event.get('data')
 
+        metrics = self.client.metrics
+        metrics.increment('model.events', self.identifier)
+
         if event_name not in ('put', 'patch'):
-            print(f'Unexpected event: {event_name}')
-            pprint(event)
+            metrics.increment('model.unexpected_events', self.identifier)
+            _LOGGER.debug('Unexpected event for %s: %s', self, event)
             return
 
         handler = self._get_handler(event)
 
         try:
-            self._data = handler(self._data, path, data)
-            self._init_data()
+            with self._event_lock, metrics.timer('model.apply', self.identifier):
+                self._data = handler(self._data, path, data)
+                self._init_data()
         except BaseException as e:
-            print(f'Error handling update: {e}')
-            pprint((event_name, path, data))
+            metrics.increment('model.errors', self.identifier)
+            _LOGGER.warning('Error handling %s of %s at %s: %s',
+                            event_name, self, path, e)
+            _LOGGER.debug('Event data: %s', data)
 
     @abstractmethod
     def _fetch(self) -> dict:
@@ -124,7 +137,6 @@ class Commands(BaseEntity, dict[str, 'Command']):
         self._build_commands()
 
     def _build_commands(self):
-        super().clear()
         super().update({
             key: Command.from_data(self.client, value, key, self.device)
             for key, value
@@ -221,10 +233,26 @@ class Command(BaseEntity):
 # </Command>
 
 
+class DeviceState(NamedTuple):
+    """The models of a device as of an event."""
+
+    commands: Commands
+    settings: Settings
+    status: Status
+
+
 class Device(BaseEntity):
-    commands: Commands = None
-    settings: Settings = None
-    status: Status = None
+    """
+    A device, updated by the events of its stream.
+
+    Every event is applied to a copy of the device data, from which new commands,
+    settings and status are built and published together by replacing `state`.
+    Readers on other threads thus see the models of one event or the next, never
+    a partial update, as long as they read them from the same `state`. Events
+    leaving the status as it was keep the same status, see Status.version.
+    """
+
+    _state: DeviceState = DeviceState(None, None, None)
     _stream: Stream = None
 
     def __init__(self, client: smarter_client.SmarterClient):
@@ -247,15 +275,50 @@ class Device(BaseEntity):
             try:
                 self._stream.close()
             except Exception as e:
-                print(f'Error closing stream: {e}')
-                # TODO: log
+                _LOGGER.warning('Error closing stream of %s: %s', self, e)
             self._stream = None
 
+    @property
+    def state(self) -> DeviceState:
+        """Returns the commands, settings and status as of the same event."""
+        return self._state
+
+    @property
+    def commands(self) -> Commands:
+        """Returns the commands of the device."""
+        return self._state.commands
+
+    @property
+    def settings(self) -> Settings:
+        """Returns the settings of the device."""
+        return self._state.settings
+
+    @property
+    def status(self) -> Status:
+        """Returns the status of the device."""
+        return self._state.status
+
     @property
     def is_watching(self):
         """Returns True if the device is being watched."""
         return self._stream is not None
 
+    @property
+    def stream_thread(self) -> threading.Thread | None:
+        """Returns the thread receiving the events of the device, if watching."""
+        return self._stream.thread if self._stream is not None else None
+
+    @property
+    def stream_idle_time(self) -> float | None:
+        """
+        Returns the seconds since the stream last received a message, if watching.
+
+        Keep-alives count as messages.
+        """
+        if self._stream is None:
+            return None
+        return time.monotonic() - self._stream.last_message_at
+
     @property
     def is_stream_active(self):
         """Experimental: Returns True if the stream connection is active."""
@@ -263,15 +326,21 @@ class Device(BaseEntity):
 
     # Private methods
     def _init_data(self):
-        self.commands = Commands.from_data(
+        commands = Commands.from_data(
             self.client, self._data.get('commands'), self)
 
-        self.settings = Settings.from_data(
+        settings = Settings.from_data(
             self.client, self._data.get('settings'))
 
-        # Status(client: smarter_client.SmarterClient, data.get('status'))
-        self.status = Status.from_data(
-            self.client, self._data.get('status'), self)
+        previous = self._state.status
+        status_data = self._data.get('status') or {}
+        if previous is not None and previous == status_data:
+            # Events of the commands or settings leave the status as it was
+            status = previous
+        else:
+            status = Status.from_data(self.client, status_data, self, previous)
+
+        self._state = DeviceState(commands, settings, status)
 
     def _fetch(self) -> dict:
         return self.client.get_device(self.identifier)
@@ -376,14 +445,45 @@ class Settings(BaseEntity):
 # </Settings>
 
 
+def _read_only(self, *args, **kwargs):
+    raise TypeError(f'{self} is read-only, events replace the status of the device')
+
+
+_MISSING = object()
+
+
 class Status(BaseEntity, dict):
+    """
+    The status of a device as of an event, read-only once built.
+
+    `version` increases by one with every change of the status of the device, so
+    readers can tell whether it changed since they last read it by comparing
+    versions. `timestamp` is the time of the change in seconds since the epoch,
+    and `changed` holds the keys it added, changed or removed.
+    """
+
     device: Device
+    version: int = 0
+    timestamp: float = None
+    changed: frozenset[str] = frozenset()
 
     # Class methods
     @classmethod
-    def from_data(cls, client: smarter_client.SmarterClient, data: dict, device: Device) -> Self:
+    def from_data(cls, client: smarter_client.SmarterClient, data: dict, device: Device,
+                  previous: Status = None) -> Self:
+        """Create the status of `device`, the version after `previous` if given."""
         self = super().from_data(client, data, f'{device.identifier}/status')
         self.device = device
+        self.timestamp = time.time()
+        if previous is None:
+            self.version = 1
+            self.changed = frozenset(self)
+        else:
+            self.version = previous.version + 1
+            self.changed = frozenset(
+                key for key in self.keys() | previous.keys()
+                if self.get(key, _MISSING) != previous.get(key, _MISSING)
+            )
 
         return self
 
@@ -391,12 +491,14 @@ class Status(BaseEntity, dict):
         super().__init__(client)
 
     def _init_data(self) -> None:
-        self.clear()
-        self.update(self._data)
+        dict.update(self, self._data)
 
     def _fetch(self) -> dict:
         self.client.get_status(self.device.identifier)
 
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
 # </Status>
 
 
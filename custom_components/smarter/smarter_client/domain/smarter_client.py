@@ -2,12 +2,41 @@
 Module contains implementation of Smarter Firebase API
 """
 from __future__ import annotations
+import re
 from typing import Callable
+from urllib.parse import urlsplit
 from ...pyrebase import pyrebase
+from ...pyrebase.pyrebase import generate_push_id
 
 from .decorators.session import refreshsession
 from .models import LoginSession
 from .._consts import API_KEY
+from ..metrics import Metrics
+from ..polling import READ_TIMEOUT, StatusPoller
+from ..recording import StreamRecorders
+from ..retry import call_with_retries
+
+# Lifetime in seconds of Firebase ID tokens, if a token response omits it
+DEFAULT_SESSION_DURATION = 3600
+
+# Identifier of the user, network or device at the start of a database path
+_PATH_ID = re.compile(r'^(/[^/]+/)[^/]+')
+
+
+def endpoint_name(method: str, url: str) -> str:
+    """
+    Return the name of the endpoint requested, without identifiers.
+
+    Database paths keep everything but the user, network or device identifier,
+    e.g. 'POST /devices/*/commands/start_boil'. Authentication endpoints are
+    named after their method, e.g. 'POST verifyPassword'.
+    """
+    path = urlsplit(url).path
+    if path.endswith('.json'):
+        path = _PATH_ID.sub(r'\1*', path[:-len('.json')])
+    else:
+        path = path.rsplit('/', 1)[-1]
+    return f'{method} {path}'
 
 
 class SmarterClient:  # pragma: no cover
@@ -16,72 +45,233 @@ class SmarterClient:  # pragma: no cover
     """
     session: LoginSession
 
-    def __init__(self):
+    def __init__(self, config: dict = None):
+        """
+        Create a client for the Smarter Firebase project.
+
+        `config` entries override the default Firebase configuration, for example
+        `databaseURL`, `identityToolkitURL` and `secureTokenURL` to run against a
+        local stand-in server.
+        """
         config = {
             "apiKey": API_KEY,
             "authDomain": "smarter-live.firebaseapp.com",
             "databaseURL": "https://smarter-live.firebaseio.com",
             "projectId": "smarter-live",
             "storageBucket": "smarter-live.appspot.com",
-            "messagingSenderId": "41919779740"
+            "messagingSenderId": "41919779740",
+            **(config or {}),
         }
         app = pyrebase.initialize_app(config)
         self.app = app
         self.token = None
+        self.metrics = Metrics()
+        self.recorders: StreamRecorders = None
+        self._session_listeners: list[Callable[[LoginSession], None]] = []
+        # ETag and body size of the last status read of each device
+        self._status_etags: dict[str, tuple[str, int]] = {}
+        app.requests.hooks['response'].append(self._record_response)
+
+    def _record_response(self, response, *args, **kwargs):
+        endpoint = endpoint_name(response.request.method, response.url)
+        self.metrics.record('http.latency', response.elapsed.total_seconds(), endpoint)
+        if not response.ok:
+            self.metrics.increment('http.errors', endpoint)
+
+    def start_recording(self, directory: str):
+        """
+        Record the events of device streams to `<directory>/<device id>.jsonl`.
+
+        Applies to streams opened afterwards; see smarter_client.recording.
+        """
+        if self.recorders is None:
+            self.recorders = StreamRecorders(directory)
+
+    def stop_recording(self):
+        """Stop recording device streams and close the recordings."""
+        if self.recorders is not None:
+            self.recorders.close()
+            self.recorders = None
 
     def sign_in(self, email, password) -> LoginSession:
         auth = self.app.auth()
 
+        self.metrics.increment('session.sign_ins')
         user = auth.sign_in_with_email_and_password(email, password)
         self.token = user.get("idToken")
         self.session = LoginSession(user)
+        self._notify_session()
+        return self.session
+
+    def sign_in_with_refresh_token(self, refresh_token: str) -> LoginSession:
+        """
+        Start a session from the refresh token of an earlier one.
+
+        No password is needed. Raises HTTPError if the token is rejected.
+        """
+        auth = self.app.auth()
+
+        self.metrics.increment('session.token_sign_ins')
+        refresh_response = auth.refresh(refresh_token)
+        self.token = refresh_response.get("idToken")
+        self.session = LoginSession({
+            'localId': refresh_response.get('userId'),
+            'idToken': refresh_response.get('idToken'),
+            'refreshToken': refresh_response.get('refreshToken'),
+            'expiresIn': refresh_response.get('expiresIn') or DEFAULT_SESSION_DURATION,
+        })
+        self._notify_session()
         return self.session
 
     def refresh(self):
         auth = self.app.auth()
+        self.metrics.increment('session.refreshes')
         refresh_response = auth.refresh(self.session.refresh_token)
         self.token = refresh_response.get("idToken")
         self.session.update(refresh_response)
+        self._notify_session()
         return self.session
 
+    def add_session_listener(
+            self, listener: Callable[[LoginSession], None]) -> Callable[[], None]:
+        """
+        Call `listener` with the session whenever it is started or refreshed.
+
+        Used e.g. to store a rotated refresh token. Returns a function removing
+        the listener.
+        """
+        self._session_listeners.append(listener)
+        return lambda: self._session_listeners.remove(listener)
+
+    def _notify_session(self):
+        for listener in list(self._session_listeners):
+            listener(self.session)
+
     @refreshsession
     def get_user(self, user_id: str):
         database = self.app.database()
-        return database.child("users").child(user_id).get(self.token).val()
+        return database.child("users").child(user_id).get(self.token).raw()
 
     @refreshsession
     def get_network(self, network_id: str):
         database = self.app.database()
-        return database.child("networks").child(network_id).get(self.token).val()
+        return database.child("networks").child(network_id).get(self.token).raw()
 
     @refreshsession
     def get_device(self, device_id: str):
         database = self.app.database()
-        return database.child('devices').child(device_id).get(self.token).val()
+        return database.child('devices').child(device_id).get(self.token).raw()
 
     @refreshsession
     def get_status(self, device_id: str):
         database = self.app.database()
-        return database.child('devices').child(device_id).child('status').get(self.token).val()
+        return database.child('devices').child(device_id).child('status') \
+            .get(self.token).raw()
+
+    @refreshsession
+    def get_command_history(self, device_id: str, command: str,
+                            limit: int = 20) -> dict:
+        """
+        Return the last `limit` instances of a command sent to a device.
+
+        Instances are returned oldest first, keyed by push ID. The server trims
+        the instances, so only `limit` of them are downloaded however long the
+        history of the command is.
+        """
+        database = self.app.database()
+        # Push IDs start with '-' and sort in creation order, the example does not
+        return database.child('devices').child(device_id) \
+            .child('commands').child(command) \
+            .order_by_key().start_at('-').end_at('-\uf8ff').limit_to_last(limit) \
+            .get(self.token).raw() or {}
+
+    @refreshsession
+    def get_status_if_changed(self, device_id: str, timeout: float = READ_TIMEOUT):
+        """
+        Read the status of a device conditionally on the ETag of the last read.
+
+        Returns None, without parsing the body, if the status did not change.
+        Records the bytes received and the bytes of unchanged bodies not sent.
+        Raises a requests Timeout if the server does not answer within `timeout`.
+        """
+        database = self.app.database()
+        etag, last_size = self._status_etags.get(device_id, (None, 0))
+        response = database.child('devices').child(device_id).child('status') \
+            .conditional_get(etag, self.token, timeout=timeout)
+
+        self.metrics.increment('poll.requests', device_id)
+        self.metrics.increment('poll.bytes_received', device_id, response['size'])
+        if not response['modified']:
+            self.metrics.increment('poll.unchanged', device_id)
+            # Only a 304 spares the body, a server ignoring the ETag sends it anyway
+            if response['not_modified']:
+                self.metrics.increment('poll.bytes_saved', device_id, last_size)
+            return None
+
+        self._status_etags[device_id] = (response['ETag'], response['size'])
+        return response['value']
+
+    def poll_device_status(self, device_id: str, callback,
+                           active_interval: float = None,
+                           idle_interval: float = None) -> StatusPoller:
+        """
+        Poll the status of a device instead of streaming it.
+
+        Used while the stream is unavailable, for example. `callback` receives a
+        put event of the whole status whenever it changes, as a stream handler
+        would. Call close() on the returned poller to stop.
+        """
+        # The first read of a poller is unconditional, so it delivers the status
+        self._status_etags.pop(device_id, None)
+        return StatusPoller(self, device_id, callback, active_interval, idle_interval)
 
     def get_db(self):
         return self.app.database()
 
     @refreshsession
-    def send_command(self, device_id: str, command: str, data: dict):
-        database = self.app.database()
+    def send_command(self, device_id: str, command: str, data: dict,
+                     command_id: str = None):
+        """
+        Write an instance of a command to a device.
+
+        The instance is keyed by `command_id` or a new push ID. It is written
+        with PUT at its own key rather than pushed, so a retry after a request
+        failed on the way back, e.g. timed out after the server stored the
+        instance, rewrites the same instance instead of sending the command
+        twice. Transient failures are retried with backoff, counted in
+        `commands.retries`. Returns {'name': <key>}, as a push does.
+        """
+        command_id = command_id or generate_push_id()
+
+        def write():
+            return self.app.database() \
+                .child('devices') \
+                .child(device_id) \
+                .child('commands') \
+                .child(command) \
+                .child(command_id) \
+                .set(data, self.token)
+
+        def on_retry(attempt: int, error: Exception):
+            self.metrics.increment('commands.retries', device_id)
 
-        return database \
-            .child('devices') \
-            .child(device_id) \
-            .child('commands') \
-            .child(command) \
-            .push(data, self.token)
+        self.metrics.increment('commands.sent', device_id)
+        try:
+            with self.metrics.timer('commands.round_trip', device_id):
+                call_with_retries(write, on_retry=on_retry)
+        except Exception:
+            self.metrics.increment('commands.failed', device_id)
+            raise
+        return {'name': command_id}
 
     # TODO fix leaky abstraction
     @refreshsession
     def watch_device_attribute(self, device_id: str, callback):
         database = self.app.database()
-        stream = database.child('devices').child(
-            device_id).stream(callback, self.token)
+        recorder = self.recorders.get(device_id) if self.recorders is not None else None
+        stream = database.child('devices').child(device_id).stream(
+            callback,
+            self.token,
+            metrics=self.metrics.scope(device_id),
+            recorder=recorder)
         return stream
@@ -0,0 +1,147 @@
+"""Recent status samples of a device, for statistics without recorder queries."""
+from __future__ import annotations
+
+import math
+import operator
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from collections.abc import Mapping
+from itertools import compress
+
+# Numeric status fields sampled
+FIELDS = ('water_temperature', 'water_level')
+# Samples kept per device, a few boils at the rate a kettle reports while boiling
+CAPACITY = 512
+# Seconds of samples a rate is estimated from
+RATE_WINDOW = 60.0
+
+
+def _number(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+class StatusHistory:
+    """
+    Ring buffer of the last `capacity` status samples of a device.
+
+    A sample holds the monotonic time it was appended at and the `FIELDS` of the
+    status, NaN for fields missing or not numeric. Samples are kept in one
+    preallocated array per field, so appending is O(1) and allocates nothing,
+    and the statistics of a window run over array slices rather than samples.
+    Thread-safe.
+    """
+
+    def __init__(self, capacity: int = CAPACITY):
+        """Create an empty history of at most `capacity` samples."""
+        self.capacity = capacity
+        self._times = array('d', [0.0]) * capacity
+        self._values = {field: array('d', [math.nan]) * capacity for field in FIELDS}
+        # Index the next sample is written at, and samples written so far
+        self._next = 0
+        self._count = 0
+        self._last_status: Mapping = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Return the number of samples kept."""
+        return min(self._count, self.capacity)
+
+    def append(self, status: Mapping, timestamp: float = None) -> bool:
+        """
+        Sample a status, unless it is the status sampled last.
+
+        Events leaving the status unchanged keep the same status, see
+        Status.version, so they add no sample. Returns whether the status was
+        sampled.
+        """
+        with self._lock:
+            if status is self._last_status:
+                return False
+            self._last_status = status
+
+            index = self._next
+            self._times[index] = time.monotonic() if timestamp is None else timestamp
+            for field, values in self._values.items():
+                values[index] = _number(status.get(field))
+            self._next = (index + 1) % self.capacity
+            self._count += 1
+            return True
+
+    def window(self, field: str, seconds: float,
+               now: float = None) -> tuple[array, array]:
+        """
+        Return the times and values of `field` sampled in the last `seconds`.
+
+        Samples are returned oldest first, leaving out samples without a value.
+        """
+        if now is None:
+            now = time.monotonic()
+        with self._lock:
+            times = self._ordered(self._times)
+            values = self._ordered(self._values[field])
+
+        start = bisect_left(times, now - seconds)
+        times, values = times[start:], values[start:]
+        # NaN is the only value not equal to itself
+        if any(map(operator.ne, values, values)):
+            present = list(map(operator.eq, values, values))
+            times = array('d', compress(times, present))
+            values = array('d', compress(values, present))
+        return times, values
+
+    def rate(self, field: str, seconds: float = RATE_WINDOW,
+             now: float = None) -> float | None:
+        """
+        Return the change of `field` per second over the last `seconds`.
+
+        The rate is the slope of the least-squares line through the samples.
+        None with fewer than two samples at different times.
+        """
+        times, values = self.window(field, seconds, now)
+        count = len(times)
+        if count < 2:
+            return None
+
+        # Times relative to the last sample keep the sums small
+        origin = times[-1]
+        times = array('d', map(operator.sub, times, [origin] * count))
+        sum_t = math.fsum(times)
+        sum_v = math.fsum(values)
+        sum_tt = math.fsum(map(operator.mul, times, times))
+        sum_tv = math.fsum(map(operator.mul, times, values))
+
+        denominator = count * sum_tt - sum_t * sum_t
+        if denominator <= 0:
+            return None
+        return (count * sum_tv - sum_t * sum_v) / denominator
+
+    def time_to(self, field: str, target: float, seconds: float = RATE_WINDOW,
+                now: float = None) -> float | None:
+        """
+        Return the seconds until `field` reaches `target` at its recent rate.
+
+        The rate is taken over the last `seconds`, see `rate`. 0 at `target`,
+        None if unknown or not moving towards `target`.
+        """
+        target = _number(target)
+        times, values = self.window(field, seconds, now)
+        if not len(values) or math.isnan(target):
+            return None
+
+        remaining = target - values[-1]
+        if remaining == 0:
+            return 0.0
+        rate = self.rate(field, seconds, now)
+        if not rate or (remaining > 0) != (rate > 0):
+            return None
+        return remaining / rate
+
+    def _ordered(self, samples: array) -> array:
+        if self._count <= self.capacity:
+            return samples[:self._count]
+        return samples[self._next:] + samples[:self._next]
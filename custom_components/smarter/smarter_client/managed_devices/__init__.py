@@ -1,9 +1,13 @@
 """
 Module containing wrappers for specific devices
 """
-from ..domain import Network, Device
-from .kettle_v3 import SmarterKettleV3
+import logging
+
+from ..domain import Device, Network
 from .base import BaseDevice
+from .kettle_v3 import SmarterKettleV3
+
+_LOGGER = logging.getLogger(__name__)
 
 
 def load_from_network(network: Network, user_id: str) -> list[Device]:
@@ -34,4 +38,5 @@ def get_device_wrapper(device: Device, user_id: str):
             managed.subscribe_status()
             return managed
         case _:
-            print(f'Unknown device model: {model}')
+            _LOGGER.warning('Unknown device model %s of device %s',
+                            model, device.identifier)
@@ -1,8 +1,15 @@
 from abc import ABCMeta
 from collections.abc import Callable
+import inspect
+import logging
 import threading
 from typing import Any
 from ..domain.models import Device
+from ..history import StatusHistory
+from ..polling import StatusPoller
+from .catalogue import CommandCatalogue, get_catalogue
+
+_LOGGER = logging.getLogger(__name__)
 
 
 class BaseDevice(metaclass=ABCMeta):
@@ -10,20 +17,54 @@ class BaseDevice(metaclass=ABCMeta):
     friendly_name: str
     type: str
     user_id: str
-    _status_subscriptions: set[Callable[[dict], None]] = set()
-    refresh_timer: threading.Timer
+    _status_subscriptions: set[Callable[[dict], None]]
+    refresh_timer: threading.Timer = None
+    _poller: StatusPoller = None
+    history: StatusHistory
+    coalesce_window: float = 0
+    events_received: int = 0
+    updates_delivered: int = 0
+    typed_commands: frozenset[str] = frozenset()
     _logger = None
 
+    def __init_subclass__(cls, **kwargs):
+        """Collect the typed command methods of a device wrapper."""
+        super().__init_subclass__(**kwargs)
+        # Public methods declared by a device wrapper are typed shortcuts for the
+        # command of the same name
+        cls.typed_commands = frozenset(
+            name
+            for name, attr in vars(cls).items()
+            if not name.startswith('_') and inspect.isfunction(attr)
+        )
+
     def __init__(self, device: Device, friendly_name: str, device_type: str, user_id: str):
         device.fetch()
         self.device = device
         self.friendly_name = friendly_name
         self.user_id = user_id
         self.type = device_type
+        self._status_subscriptions = set()
+        self._coalesce_lock = threading.Lock()
+        self._coalesce_timer: threading.Timer = None
+        self.history = StatusHistory()
+        self.history.append(device.status)
+        self.validate_commands()
 
     def set_logger(self, logger):
         self._logger = logger
 
+    def set_coalesce_window(self, seconds: float):
+        """
+        Batch status notifications arriving within `seconds` of each other.
+
+        Every event is still applied to the device model as it arrives; only the
+        notification of subscribers is deferred until the window closes, so a burst
+        of patches results in a single callback with the latest status. A window of
+        0 disables coalescing.
+        """
+        self.coalesce_window = max(0.0, float(seconds or 0))
+
     def log(self, message):
         if self._logger is not None:
             self._logger.debug(message)
@@ -40,15 +81,133 @@ class BaseDevice(metaclass=ABCMeta):
     def firmware_version(self):
         return self.device.status.get('firmware_version')
 
+    @property
+    def command_catalogue(self) -> CommandCatalogue:
+        """Returns the commands supported by this device's model and firmware."""
+        return get_catalogue(self.model, self.firmware_version, self.device.commands)
+
+    def validate_commands(self) -> set[str]:
+        """
+        Check the typed command methods of this wrapper against the catalogue.
+
+        Returns the names of typed commands the device does not report.
+        """
+        missing = set(self.typed_commands.difference(self.command_catalogue))
+        if missing:
+            _LOGGER.warning('%s (%s, firmware %s) does not support commands: %s',
+                            self.__class__.__name__,
+                            self.model,
+                            self.firmware_version,
+                            ', '.join(sorted(missing)))
+
+        return missing
+
+    @property
+    def metrics(self) -> dict[str, dict]:
+        """Returns the counters and timers recorded for this device."""
+        return self.device.client.metrics.snapshot(self.id)
+
+    @property
+    def worker_threads(self) -> dict[str, threading.Thread]:
+        """Returns the threads currently handling events of this device, by role."""
+        threads = {}
+        if (stream_thread := self.device.stream_thread) is not None:
+            threads['stream'] = stream_thread
+        if (timer := self._coalesce_timer) is not None:
+            threads['coalesce'] = timer
+        if (poller := self._poller) is not None:
+            threads['poll'] = poller.thread
+        return threads
+
+    @property
+    def coalesce_stats(self) -> dict[str, int]:
+        """Returns counters of raw status events vs delivered notifications."""
+        with self._coalesce_lock:
+            return {
+                'events_received': self.events_received,
+                'updates_delivered': self.updates_delivered,
+            }
+
     def _on_event(self, event):
         if 'status' not in event.get('path', []):
             return
 
-        for cb in self._status_subscriptions:
-            cb(self.device.status)
+        # Sampled as applied, even when the notification is coalesced
+        self.history.append(self.device.status)
+
+        with self._coalesce_lock:
+            self.events_received += 1
+            if self.coalesce_window > 0:
+                if self._coalesce_timer is None:
+                    self._coalesce_timer = threading.Timer(
+                        self.coalesce_window, self._flush_coalesced)
+                    self._coalesce_timer.daemon = True
+                    self._coalesce_timer.start()
+                return
+
+        self._deliver_status()
+
+    def _flush_coalesced(self):
+        with self._coalesce_lock:
+            self._coalesce_timer = None
+
+        self._deliver_status()
+
+    def _cancel_coalesced(self):
+        with self._coalesce_lock:
+            if self._coalesce_timer is not None:
+                self._coalesce_timer.cancel()
+                self._coalesce_timer = None
+
+    def _deliver_status(self):
+        # Delivered from the stream and poller threads, and the coalesce timer
+        with self._coalesce_lock:
+            self.updates_delivered += 1
+        metrics = self.device.client.metrics
+        metrics.increment('status.notifications', self.id)
+        with metrics.timer('status.fanout', self.id):
+            for cb in list(self._status_subscriptions):
+                cb(self.device.status)
+
+    def is_stream_healthy(self, max_idle: float) -> bool:
+        """
+        Return whether the stream of the device is running and recently active.
+
+        The stream is active if it received an event or keep-alive in the last
+        `max_idle` seconds.
+        """
+        stream_thread = self.device.stream_thread
+        return (stream_thread is not None and stream_thread.is_alive()
+                and self.device.stream_idle_time < max_idle)
+
+    @property
+    def is_polling(self) -> bool:
+        """Whether the status of the device is polled."""
+        return self._poller is not None
+
+    def start_polling(self, active_interval: float = None, idle_interval: float = None):
+        """
+        Poll the status of the device, e.g. while its stream is unhealthy.
+
+        Changes are applied and notified to subscribers as stream events are.
+        See smarter_client.polling for the intervals.
+        """
+        if self._poller is None:
+            self._poller = self.device.client.poll_device_status(
+                self.id, self._on_polled_event, active_interval, idle_interval)
+
+    def stop_polling(self):
+        """Stop polling the status of the device, if polled."""
+        if self._poller is not None:
+            self._poller.close()
+            self._poller = None
+
+    def _on_polled_event(self, event):
+        self.device._on_event(event)
+        self._on_event(event)
 
     def send_command(self, command: str, value: Any):
-        self.device.commands.get(command).execute(self.user_id, value)
+        return self.device.commands[command].execute(self.user_id, value)
 
     @property
     def status(self):
@@ -82,10 +241,17 @@ class BaseDevice(metaclass=ABCMeta):
     def unsubscribe_status(self, handler: Callable[[dict], None] = None):
         self._status_subscriptions.discard(handler)
         if len(self._status_subscriptions) == 0:
-            self.refresh_timer.cancel()
+            if self.refresh_timer is not None:
+                self.refresh_timer.cancel()
+            self._cancel_coalesced()
+            self.stop_polling()
             self.device.unwatch()
 
     def dispose(self):
+        if self.refresh_timer is not None:
+            self.refresh_timer.cancel()
+        self._cancel_coalesced()
+        self.stop_polling()
         self.device.unwatch()
 
     def __str__(self):
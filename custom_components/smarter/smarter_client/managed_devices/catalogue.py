@@ -0,0 +1,81 @@
+"""Catalogue of the commands supported by a device model."""
+from __future__ import annotations
+
+import threading
+from collections.abc import Mapping
+from types import MappingProxyType
+from typing import Any, NamedTuple
+
+from ..domain.models import Command
+
+
+class CommandSpec(NamedTuple):
+    """A command of a catalogue and the type of value it expects."""
+
+    name: str
+    example: Any
+    value_type: str | None
+
+
+CommandCatalogue = Mapping[str, CommandSpec]
+
+_catalogues: dict[tuple[str, str], CommandCatalogue] = {}
+_lock = threading.Lock()
+
+
+def infer_value_type(example: Any) -> str | None:
+    """
+    Infer the type of value a command expects from its example payload.
+
+    Returns one of 'boolean', 'number', 'text' or 'object', or None if the
+    command has no usable example.
+    """
+    if isinstance(example, dict) and 'value' in example:
+        example = example['value']
+
+    match example:
+        case bool():
+            return 'boolean'
+        case int() | float():
+            return 'number'
+        case str():
+            return 'text'
+        case dict() | list():
+            return 'object'
+        case _:
+            return None
+
+
+def get_catalogue(model: str,
+                  firmware_version: str,
+                  commands: Mapping[str, Command]) -> CommandCatalogue:
+    """
+    Get the command catalogue of a device model and firmware version.
+
+    The catalogue is built from `commands` the first time it is requested and
+    shared by every device of the same model and firmware version afterwards.
+    """
+    key = (model, firmware_version)
+    catalogue = _catalogues.get(key)
+    if catalogue is not None:
+        return catalogue
+
+    with _lock:
+        catalogue = _catalogues.get(key)
+        if catalogue is None:
+            catalogue = MappingProxyType({
+                name: CommandSpec(name,
+                                  command.example,
+                                  infer_value_type(command.example))
+                for name, command
+                in sorted(commands.items())
+            })
+            _catalogues[key] = catalogue
+
+    return catalogue
+
+
+def clear_catalogues():
+    """Forget all cached catalogues."""
+    with _lock:
+        _catalogues.clear()
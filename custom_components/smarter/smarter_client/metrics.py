@@ -0,0 +1,145 @@
+"""Counters and timers for the stages of the event and command paths."""
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any
+
+# Key used for metrics not attributed to a device or endpoint
+ALL = '*'
+
+
+@dataclass
+class TimerStats:
+    """Count and durations of the runs of a timer."""
+
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+    last: float = 0.0
+
+    def add(self, seconds: float):
+        """Add a run of `seconds`."""
+        self.count += 1
+        self.total += seconds
+        self.last = seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def as_dict(self) -> dict[str, float]:
+        """Return the count and the mean, max and last duration in milliseconds."""
+        mean = self.total / self.count if self.count else 0.0
+        return {
+            'count': self.count,
+            'mean_ms': round(mean * 1000, 3),
+            'max_ms': round(self.max * 1000, 3),
+            'last_ms': round(self.last * 1000, 3),
+        }
+
+
+class Metrics:
+    """
+    Thread-safe registry of named counters and timers.
+
+    Every metric is kept per key, typically a device identifier or an HTTP
+    endpoint, so that one registry can be shared by all devices of a client.
+    """
+
+    def __init__(self):
+        """Create an empty registry."""
+        self._lock = threading.Lock()
+        self._counters: dict[str, dict[str, int]] = {}
+        self._timers: dict[str, dict[str, TimerStats]] = {}
+
+    def increment(self, name: str, key: str = ALL, amount: int = 1):
+        """Add `amount` to a counter."""
+        with self._lock:
+            counters = self._counters.setdefault(name, {})
+            counters[key] = counters.get(key, 0) + amount
+
+    def record(self, name: str, seconds: float, key: str = ALL):
+        """Record a run of a timer taking `seconds`."""
+        with self._lock:
+            timers = self._timers.setdefault(name, {})
+            stats = timers.get(key)
+            if stats is None:
+                stats = timers[key] = TimerStats()
+            stats.add(seconds)
+
+    @contextmanager
+    def timer(self, name: str, key: str = ALL) -> Iterator[None]:
+        """Time the body of a `with` block, including when it raises."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started, key)
+
+    def counter(self, name: str, key: str = ALL) -> int:
+        """Return the value of a counter, 0 if never incremented."""
+        with self._lock:
+            return self._counters.get(name, {}).get(key, 0)
+
+    def timer_stats(self, name: str, key: str = ALL) -> dict[str, float]:
+        """Return the statistics of a timer, see TimerStats.as_dict."""
+        with self._lock:
+            stats = self._timers.get(name, {}).get(key) or TimerStats()
+            return stats.as_dict()
+
+    def scope(self, key: str) -> ScopedMetrics:
+        """Return a view recording every metric under `key`."""
+        return ScopedMetrics(self, key)
+
+    def snapshot(self, key: str = None) -> dict[str, Any]:
+        """
+        Return a copy of all metrics, or of the metrics of `key` only.
+
+        Counters are returned as `{name: {key: value}}` and timers as
+        `{name: {key: {count, mean_ms, max_ms, last_ms}}}`.
+        """
+        def select(metrics: dict[str, dict], convert=lambda value: value):
+            return {
+                name: {
+                    k: convert(v)
+                    for k, v in sorted(values.items())
+                    if key is None or k == key
+                }
+                for name, values in sorted(metrics.items())
+                if key is None or key in values
+            }
+
+        with self._lock:
+            return {
+                'counters': select(self._counters),
+                'timers': select(self._timers, TimerStats.as_dict),
+            }
+
+    def reset(self):
+        """Forget all metrics."""
+        with self._lock:
+            self._counters.clear()
+            self._timers.clear()
+
+
+class ScopedMetrics:
+    """Metrics recorded under a fixed key."""
+
+    def __init__(self, metrics: Metrics, key: str):
+        """Create a view of `metrics` recording under `key`."""
+        self.metrics = metrics
+        self.key = key
+
+    def increment(self, name: str, amount: int = 1):
+        """Add `amount` to a counter, see Metrics.increment."""
+        self.metrics.increment(name, self.key, amount)
+
+    def record(self, name: str, seconds: float):
+        """Record a run of a timer, see Metrics.record."""
+        self.metrics.record(name, seconds, self.key)
+
+    def timer(self, name: str):
+        """Time the body of a `with` block, see Metrics.timer."""
+        return self.metrics.timer(name, self.key)
@@ -0,0 +1,85 @@
+"""Polling of device status, for when the event stream is unavailable."""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections.abc import Callable
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .domain.smarter_client import SmarterClient
+
+_LOGGER = logging.getLogger(__name__)
+
+# States in which the status of a kettle changes every few seconds
+ACTIVE_STATES = ('Boiling', 'Keeping Warm', 'Cooling')
+ACTIVE_INTERVAL = 10.0
+IDLE_INTERVAL = 60.0
+# Seconds a read may wait for the server, so a stalled connection ends the read
+READ_TIMEOUT = 10.0
+# Seconds close() waits for a read in progress, the thread is a daemon
+CLOSE_TIMEOUT = 1.0
+
+
+class StatusPoller:
+    """
+    Polls the status of a device in a background thread.
+
+    Every read is conditional on the ETag of the previous one, so an unchanged
+    status is neither parsed nor delivered. The status is read every
+    `active_interval` seconds while the device is active, e.g. boiling, and every
+    `idle_interval` seconds otherwise.
+    """
+
+    def __init__(self,
+                 client: SmarterClient,
+                 device_id: str,
+                 callback: Callable[[dict], None],
+                 active_interval: float = None,
+                 idle_interval: float = None):
+        """Start polling, passing a put event of every new status to `callback`."""
+        self.client = client
+        self.device_id = device_id
+        self.callback = callback
+        self.active_interval = active_interval or ACTIVE_INTERVAL
+        self.idle_interval = idle_interval or IDLE_INTERVAL
+        # Monotonic time of the last successful read, as Stream.last_message_at
+        self.last_message_at = time.monotonic()
+        self._status: dict = None
+        self._stop = threading.Event()
+        self.thread = threading.Thread(target=self._run,
+                                       name=f'smarter-poll-{device_id}',
+                                       daemon=True)
+        self.thread.start()
+
+    @property
+    def interval(self) -> float:
+        """Seconds until the next read, shorter while the device is active."""
+        if self._status is not None and self._status.get('state') in ACTIVE_STATES:
+            return self.active_interval
+        return self.idle_interval
+
+    def _run(self):
+        while True:
+            try:
+                status = self.client.get_status_if_changed(self.device_id)
+                self.last_message_at = time.monotonic()
+                if status is not None:
+                    self._status = status
+                    self.callback({'event': 'put', 'path': '/status', 'data': status})
+            except Exception as e:
+                self.client.metrics.increment('poll.errors', self.device_id)
+                _LOGGER.warning('Error polling status of %s: %s', self.device_id, e)
+
+            if self._stop.wait(self.interval):
+                return
+
+    def close(self):
+        """Stop polling, waiting briefly for a read in progress to finish."""
+        self._stop.set()
+        if self.thread is not threading.current_thread():
+            self.thread.join(CLOSE_TIMEOUT)
+            if self.thread.is_alive():
+                # The read ends within READ_TIMEOUT and the thread with it
+                _LOGGER.debug('Stopped polling %s during a read', self.device_id)
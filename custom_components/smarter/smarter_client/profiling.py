@@ -0,0 +1,165 @@
+"""Sampling profiler for the threads handling device events."""
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable, Mapping
+from types import FrameType
+
+ThreadSource = Callable[[], Mapping[str, threading.Thread]]
+
+
+def _frame_name(frame: FrameType) -> str:
+    code = frame.f_code
+    filename = os.path.basename(code.co_filename)
+    return f'{code.co_qualname} ({filename}:{code.co_firstlineno})'
+
+
+def _stack(frame: FrameType) -> tuple[str, ...]:
+    stack = []
+    while frame is not None:
+        stack.append(_frame_name(frame))
+        frame = frame.f_back
+    stack.reverse()
+    return tuple(stack)
+
+
+class ProfileResult:
+    """Stacks sampled by a SamplingProfiler, rooted at a label per thread."""
+
+    def __init__(self,
+                 samples: Counter[tuple[str, ...]],
+                 interval: float,
+                 duration: float):
+        """Create a result of `samples` taken every `interval` seconds."""
+        self.samples = samples
+        self.interval = interval
+        self.duration = duration
+
+    @property
+    def sample_count(self) -> int:
+        """Number of stacks sampled."""
+        return sum(self.samples.values())
+
+    def functions(self) -> list[tuple[str, int, int]]:
+        """
+        Return the self and total samples of every sampled function.
+
+        Functions are returned as (function, self samples, total samples), most
+        expensive first. Multiply samples by `interval` for an estimate of the
+        time spent.
+        """
+        own: Counter[str] = Counter()
+        total: Counter[str] = Counter()
+        for stack, count in self.samples.items():
+            own[stack[-1]] += count
+            for name in set(stack[1:]):
+                total[name] += count
+
+        return sorted(((name, own[name], count) for name, count in total.items()),
+                      key=lambda function: (function[2], function[1]),
+                      reverse=True)
+
+    def summary(self, limit: int = 20) -> dict:
+        """Return the duration, samples and `limit` most expensive functions."""
+        return {
+            'duration_s': round(self.duration, 3),
+            'interval_ms': self.interval * 1000,
+            'samples': self.sample_count,
+            'functions': [
+                {
+                    'function': name,
+                    'self_ms': round(own * self.interval * 1000, 1),
+                    'total_ms': round(total * self.interval * 1000, 1),
+                }
+                for name, own, total in self.functions()[:limit]
+            ],
+        }
+
+    def write_collapsed(self, path: str):
+        """
+        Write the samples to `path` in collapsed stack format.
+
+        The format has one `frame;frame;... count` line per stack, as read by
+        flamegraph.pl and speedscope.
+        """
+        with open(path, 'w', encoding='utf-8') as file:
+            for stack, count in sorted(self.samples.items()):
+                file.write(f"{';'.join(stack)} {count}\n")
+
+
+class SamplingProfiler:
+    """
+    Periodically samples the call stacks of a set of threads.
+
+    `threads` is called on every sample and returns the threads to sample keyed
+    by a label, so threads replaced while profiling (e.g. a stream reconnecting
+    after a session refresh) are picked up. Stacks of threads blocked on I/O are
+    sampled too and show up under the blocking call.
+
+    Nothing runs while the profiler is not recording.
+    """
+
+    def __init__(self, threads: ThreadSource, interval: float = 0.005):
+        """Create a profiler sampling `threads` every `interval` seconds."""
+        self.threads = threads
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread = None
+        self._samples: Counter[tuple[str, ...]] = Counter()
+        self._started: float = None
+        self._stopped: float = None
+
+    @property
+    def active(self) -> bool:
+        """Whether the profiler is recording."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, duration: float):
+        """Sample for at most `duration` seconds in a background thread."""
+        with self._lock:
+            if self.active:
+                raise RuntimeError('Profiler is already running')
+            self._stop.clear()
+            self._samples = Counter()
+            self._started = time.monotonic()
+            self._thread = threading.Thread(target=self._run,
+                                            args=(self._started + duration,),
+                                            name='smarter-profiler',
+                                            daemon=True)
+            self._thread.start()
+
+    def wait(self, timeout: float = None) -> ProfileResult:
+        """Wait for the profiling window to end and returns the result."""
+        self._thread.join(timeout)
+        return self.result()
+
+    def stop(self) -> ProfileResult:
+        """End the profiling window early and returns the result."""
+        self._stop.set()
+        return self.wait()
+
+    def result(self) -> ProfileResult:
+        """Return the samples taken so far."""
+        end = self._stopped if not self.active else time.monotonic()
+        with self._lock:
+            samples = Counter(self._samples)
+        return ProfileResult(samples, self.interval, end - self._started)
+
+    def _run(self, deadline: float):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval) and time.monotonic() < deadline:
+            threads = {thread.ident: label
+                       for label, thread in self.threads().items()
+                       if thread.ident is not None and thread.ident != own}
+            frames = sys._current_frames()
+            stacks = [(label, *_stack(frames[ident]))
+                      for ident, label in threads.items()
+                      if ident in frames]
+            with self._lock:
+                self._samples.update(stacks)
+        self._stopped = time.monotonic()
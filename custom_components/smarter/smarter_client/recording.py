@@ -0,0 +1,124 @@
+"""
+Record and replay device event streams.
+
+A recording is an append-only file with one JSON array per line:
+
+    [<unix time>, "<event>", {"path": "<path>", "data": <data>}]
+
+The third item is the data of the server-sent event exactly as received.
+"""
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from collections.abc import Callable, Iterator
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .managed_devices.base import BaseDevice
+
+
+class StreamRecorder:
+    """Appends the events of a stream to a recording file."""
+
+    def __init__(self, path: str):
+        """Open `path` for appending."""
+        self.path = path
+        self._lock = threading.Lock()
+        # Line buffered, so a recording survives the process being killed
+        self._file = open(path, 'a', buffering=1, encoding='utf-8')
+
+    def record(self, event: str, data: str):
+        """Append an event with its data as received, a JSON document."""
+        line = f'[{time.time():.3f},{json.dumps(event)},{data}]\n'
+        with self._lock:
+            if self._file is not None:
+                self._file.write(line)
+
+    def close(self):
+        """Close the file, dropping events recorded afterwards."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class StreamRecorders:
+    """Recorders of the streams of several devices, one file per device."""
+
+    def __init__(self, directory: str):
+        """Record to files in `directory`, created if missing."""
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._recorders: dict[str, StreamRecorder] = {}
+
+    def get(self, device_id: str) -> StreamRecorder:
+        """Return the recorder of a device, opening its file on first use."""
+        with self._lock:
+            recorder = self._recorders.get(device_id)
+            if recorder is None:
+                recorder = self._recorders[device_id] = StreamRecorder(
+                    os.path.join(self.directory, f'{device_id}.jsonl'))
+            return recorder
+
+    def close(self):
+        """Close the files of all devices."""
+        with self._lock:
+            for recorder in self._recorders.values():
+                recorder.close()
+            self._recorders.clear()
+
+
+def read_recording(path: str) -> Iterator[tuple[float, dict]]:
+    """
+    Yield the timestamp and event of every line of a recording.
+
+    Events are dicts with `event`, `path` and `data` keys, as passed to stream
+    handlers. Events whose data is not an object, e.g. `cancel` with a reason,
+    have the data under `data` and no `path`. A truncated last line, e.g. of a
+    recording still being written, is skipped.
+    """
+    with open(path, encoding='utf-8') as file:
+        for line in file:
+            try:
+                timestamp, event, data = json.loads(line)
+            except (TypeError, ValueError):
+                continue
+            if isinstance(data, dict):
+                yield timestamp, {**data, 'event': event}
+            else:
+                yield timestamp, {'event': event, 'data': data}
+
+
+def replay(path: str, handler: Callable[[dict], None], speed: float = 1.0) -> int:
+    """
+    Feed a recording to `handler`, keeping the original time between events.
+
+    `speed` scales the replay: 2 replays twice as fast, 0 replays as fast as
+    possible. Returns the number of events replayed.
+    """
+    count = 0
+    started = first = None
+    for timestamp, event in read_recording(path):
+        if speed > 0:
+            if first is None:
+                started, first = time.monotonic(), timestamp
+            delay = (timestamp - first) / speed - (time.monotonic() - started)
+            if delay > 0:
+                time.sleep(delay)
+        handler(event)
+        count += 1
+
+    return count
+
+
+def device_handler(device: BaseDevice) -> Callable[[dict], None]:
+    """Return a handler applying events to a device as its stream would."""
+    def on_event(event: dict):
+        device.device._on_event(event)
+        device._on_event(event)
+
+    return on_event
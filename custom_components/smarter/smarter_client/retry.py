@@ -0,0 +1,61 @@
+"""Retries of requests failing with transient errors."""
+from __future__ import annotations
+
+import logging
+import time
+from collections.abc import Callable
+
+import requests
+
+_LOGGER = logging.getLogger(__name__)
+
+RETRIES = 3
+# Seconds before the first retry, doubling for every further retry
+BACKOFF = 0.5
+
+
+def is_transient_error(ex: BaseException) -> bool:
+    """Return whether a failed request may succeed when retried."""
+    if isinstance(ex, requests.ConnectionError | requests.Timeout):
+        return True
+    if not isinstance(ex, requests.HTTPError):
+        return False
+
+    response = ex.response
+    # pyrebase wraps the HTTPError raised for the response with the response body
+    if response is None and ex.args and isinstance(ex.args[0], requests.HTTPError):
+        response = ex.args[0].response
+    return response is not None and (
+        response.status_code == 429 or response.status_code >= 500
+    )
+
+
+def call_with_retries[T](func: Callable[[], T],
+                         retries: int = RETRIES,
+                         backoff: float = BACKOFF,
+                         on_retry: Callable[[int, Exception], None] = None) -> T:
+    """
+    Return `func()`, retrying it while it fails with a transient error.
+
+    Retries back off exponentially, at most `retries` of them. Only idempotent
+    calls may be retried, as a request failing on the way back may have been
+    applied.
+
+    `on_retry` is called with the number of the retry and the error before every
+    retry.
+    """
+    attempt = 0
+    while True:
+        try:
+            return func()
+        except Exception as e:
+            if attempt >= retries or not is_transient_error(e):
+                raise
+            error = e
+
+        delay = backoff * 2 ** attempt
+        attempt += 1
+        if on_retry is not None:
+            on_retry(attempt, error)
+        _LOGGER.debug('Request failed (%s), retry %d in %.1fs', error, attempt, delay)
+        time.sleep(delay)
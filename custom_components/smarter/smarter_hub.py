@@ -1,13 +1,16 @@
 """Defines module for integrating HomeAssistant with the Smarter API Client."""
 
-import itertools
-from collections.abc import Generator
+import asyncio
+import time
+from collections.abc import Generator, Mapping
 from typing import Any
 
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers import device_registry as dr
+from .commands import CommandPipeline
 from .smarter_client.domain.models import LoginSession, User
 from .smarter_client.domain.smarter_client import SmarterClient
-from .smarter_client.managed_devices import load_from_network
+from .smarter_client.managed_devices import get_device_wrapper
 from .smarter_client.managed_devices.base import BaseDevice
 
 from custom_components.smarter.const import DOMAIN
@@ -36,6 +39,7 @@ class SmarterHub:
         """Create a new instance of the SmarterHub class."""
         self.hass = hass
         self.client = SmarterClient()
+        self.commands = CommandPipeline(hass, self.client.metrics)
 
     async def sign_in(self, username, password):
         """
@@ -48,6 +52,17 @@ class SmarterHub:
             self.client.sign_in, username, password
         )
 
+    async def sign_in_with_refresh_token(self, refresh_token: str) -> LoginSession:
+        """
+        Asynchronously resume a session of the Smarter API from its refresh token.
+
+        Raises HTTPError if the refresh token is rejected, e.g. after a password
+        change.
+        """
+        return await self.hass.async_add_executor_job(
+            self.client.sign_in_with_refresh_token, refresh_token
+        )
+
     async def get_user(self, session: LoginSession):
         """Retrieve Smarter API user from current session."""
         user: User = User.from_id(self.client, session.local_id)
@@ -56,18 +71,27 @@ class SmarterHub:
         return user
 
     async def discover_devices(self, user: User) -> list[BaseDevice]:
-        """Asynchronously discover devices."""
-
-        def _discover_devices() -> list[BaseDevice]:
-            """Get a list of device wrappers from the user's networks."""
-            return list(
-                itertools.chain.from_iterable(
-                    load_from_network(network, user.identifier)
-                    for network in user.networks.values()
+        """
+        Asynchronously discover devices.
+
+        The networks of the user are fetched concurrently, then every device of
+        every network.
+        """
+        networks = list(user.networks.values())
+        await asyncio.gather(
+            *(self.hass.async_add_executor_job(network.fetch) for network in networks)
+        )
+        wrappers = await asyncio.gather(
+            *(
+                self.hass.async_add_executor_job(
+                    get_device_wrapper, device, user.identifier
                 )
+                for network in networks
+                for device in network.associated_devices
             )
+        )
 
-        return await self.hass.async_add_executor_job(_discover_devices)
+        return [wrapper for wrapper in wrappers if wrapper is not None]
 
     def _domain_data(self, config_entry_id: str) -> dict[str, Any]:
         return self.hass.data[DOMAIN][config_entry_id]
@@ -77,13 +101,83 @@ class SmarterHub:
 
     def _get_device(self, external_device_id: str, config_entry_id: str) -> BaseDevice:
         try:
-            return next(
-                device
-                for device in self._get_devices(config_entry_id)
-                if device.id == external_device_id
-            )
-        except StopIteration:
-            raise DeviceNotFoundError(external_device_id)
+            return self._domain_data(config_entry_id)["device_index"][
+                external_device_id
+            ]
+        except KeyError:
+            raise DeviceNotFoundError(external_device_id) from None
+
+    def index_devices(self, config_entry_id: str) -> None:
+        """
+        Rebuild the device lookup index of a config entry.
+
+        Must be called whenever the devices of the config entry are discovered or
+        reloaded.
+
+        Args:
+            config_entry_id: HASS config entry ID that owns the devices
+        """
+        data = self._domain_data(config_entry_id)
+        data["device_index"] = {device.id: device for device in data["devices"]}
+        data["registry_index"] = {}
+
+    def remove_device(
+        self, external_device_id: str, config_entry_id: str
+    ) -> BaseDevice:
+        """
+        Stop tracking a device.
+
+        The caller is responsible for disposing of the returned device.
+
+        Args:
+            external_device_id: Device ID in Smarter API
+            config_entry_id: HASS config entry ID that owns the device
+        Returns:
+            the removed device
+        """
+        device = self._get_device(external_device_id, config_entry_id)
+        data = self._domain_data(config_entry_id)
+
+        data["devices"].remove(device)
+        del data["device_index"][external_device_id]
+        data["registry_index"] = {
+            registry_id: device_id
+            for registry_id, device_id in data["registry_index"].items()
+            if device_id != external_device_id
+        }
+
+        return device
+
+    def find_device(self, device_id: str) -> tuple[str, BaseDevice]:
+        """
+        Find a device in any config entry.
+
+        Args:
+            device_id: Device ID in Smarter API, or HASS device registry ID
+        Returns:
+            tuple[str, BaseDevice] where the items are:
+            [0] ID of the config entry that owns the device
+            [1] the device
+        """
+        domain_data: dict[str, dict[str, Any]] = self.hass.data.get(DOMAIN, {})
+
+        for config_entry_id, data in domain_data.items():
+            external_device_id = data["registry_index"].get(device_id, device_id)
+            if (device := data["device_index"].get(external_device_id)) is not None:
+                return (config_entry_id, device)
+
+        registry_device = dr.async_get(self.hass).async_get(device_id)
+        if registry_device is not None:
+            for domain, identifier in registry_device.identifiers:
+                if domain != DOMAIN:
+                    continue
+                for config_entry_id in registry_device.config_entries:
+                    data = domain_data.get(config_entry_id)
+                    if data is not None and identifier in data["device_index"]:
+                        data["registry_index"][device_id] = identifier
+                        return (config_entry_id, data["device_index"][identifier])
+
+        raise DeviceNotFoundError(device_id)
 
     def get_commands(
         self,
@@ -103,7 +197,7 @@ class SmarterHub:
         """
         device = self._get_device(external_device_id, config_entry_id)
 
-        for command in device.device.commands.values():
+        for command in device.command_catalogue.values():
             yield (command.name, command.example)
 
     async def send_command(
@@ -124,7 +218,8 @@ class SmarterHub:
         """
         try:
             device = self._get_device(external_device_id, config_entry_id)
-            await self.hass.async_add_executor_job(
+            await self.commands.async_send(
+                device,
                 device.send_command,
                 command_name,
                 command_data,
@@ -133,3 +228,52 @@ class SmarterHub:
             raise ValueError(f"Device does not support command '{command_name}'")
         except DeviceNotFoundError:
             return "not found"
+
+    async def send_command_bulk(
+        self,
+        targets: Mapping[str, BaseDevice],
+        command_name: str,
+        command_data: Any,
+    ) -> dict[str, dict[str, Any]]:
+        """
+        Send a command to many devices concurrently.
+
+        Failures are reported per device instead of aborting the whole call. The
+        latency includes time waiting for earlier commands to the same device.
+
+        Args:
+            targets: devices to send the command to, keyed by an ID of the caller's
+                choosing (e.g. entity ID)
+            command_name: name of command (see `get_commands`)
+            command_data: data for given command
+        Returns:
+            dict keyed like `targets`. Each value has a `latency_ms` key and either
+            a `result` key with the API response or an `error` key.
+        """
+
+        async def _send(device: BaseDevice) -> dict[str, Any]:
+            started = time.perf_counter()
+            try:
+                result = await self.commands.async_send(
+                    device,
+                    device.send_command,
+                    command_name,
+                    command_data,
+                )
+            except KeyError:
+                response = {
+                    "error": f"Device does not support command '{command_name}'"
+                }
+            except Exception as ex:  # report any failure per device
+                response = {"error": str(ex)}
+            else:
+                response = {"result": result}
+
+            response["latency_ms"] = round((time.perf_counter() - started) * 1000, 1)
+            return response
+
+        responses = await asyncio.gather(
+            *(_send(device) for device in targets.values())
+        )
+
+        return dict(zip(targets, responses))
@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from collections.abc import Callable
+from collections.abc import Callable, Mapping
 from dataclasses import dataclass
 from typing import Any
 
@@ -19,8 +19,8 @@ from .entity import SmarterEntity
 def make_check_status(key: str, values: list[Any]) -> bool:
     """Return a function that checks the status of a device."""
 
-    def _check_status(device: BaseDevice) -> bool:
-        return device.device.status.get(key) in values
+    def _check_status(status: Mapping[str, Any]) -> bool:
+        return status.get(key) in values
 
     return _check_status
 
@@ -30,12 +30,18 @@ def set_boil(device: BaseDevice, value: bool):
     device.send_command("start_boil" if value else "stop_boil", True)
 
 
+def boil_status(value: bool) -> dict[str, Any]:
+    """Return the status expected from invoking or cancelling the boil command."""
+    return {"state": "Boiling" if value else "Ready"}
+
+
 @dataclass(frozen=True, kw_only=True)
 class SmarterSwitchEntityDescription(SwitchEntityDescription):
     """Represent the Smarter sensor entity description."""
 
-    get_fn: Callable[[BaseDevice], bool]
+    get_fn: Callable[[Mapping[str, Any]], bool]
     set_fn: Callable[[BaseDevice, Any], None]
+    optimistic_fn: Callable[[bool], Mapping[str, Any]]
 
 
 SWITCH_TYPES = [
@@ -44,6 +50,7 @@ SWITCH_TYPES = [
         name="Boiling",
         get_fn=make_check_status("state", ["Boiling", "Keeping Warm", "Cooling"]),
         set_fn=set_boil,
+        optimistic_fn=boil_status,
         icon="mdi:kettle-steam",
     ),
 ]
@@ -56,13 +63,14 @@ async def async_setup_entry(
 ) -> None:
     """Set up Smarter sensors."""
     data = hass.data[DOMAIN][config_entry.entry_id]
+    coordinator = data["coordinator"]
     entities = [
-        SmarterSwitch(device, description)
+        SmarterSwitch(coordinator, device, description)
         for device in data.get("devices")
         for description in SWITCH_TYPES
     ]
 
-    async_add_entities(entities, True)
+    async_add_entities(entities)
 
 
 class SmarterSwitch(SmarterEntity, SwitchEntity):
@@ -72,17 +80,21 @@ class SmarterSwitch(SmarterEntity, SwitchEntity):
 
     _attr_has_entity_name = True
 
-    @property
-    def is_on(self) -> bool | None:
-        """Return the state of the sensor."""
-        return self.entity_description.get_fn(self.device)
+    def _update_derived_state(self) -> None:
+        """Cache the state of the switch."""
+        super()._update_derived_state()
+        self._attr_is_on = self.entity_description.get_fn(self.status)
 
-    def turn_on(self, **kwargs: Any) -> None:
+    async def async_turn_on(self, **kwargs: Any) -> None:
         """Turn the switch on."""
-        self.entity_description.set_fn(self.device, True)
-        self._attr_is_on = True
+        await self._async_set(True)
 
-    def turn_off(self, **kwargs: Any) -> None:
+    async def async_turn_off(self, **kwargs: Any) -> None:
         """Turn the switch off."""
-        self.entity_description.set_fn(self.device, False)
-        self._attr_is_on = False
+        await self._async_set(False)
+
+    async def _async_set(self, value: bool) -> None:
+        description = self.entity_description
+        await self._async_send_optimistic(
+            description.optimistic_fn(value), description.set_fn, self.device, value
+        )
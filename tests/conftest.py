@@ -4,6 +4,7 @@ from typing import Any
 from unittest.mock import MagicMock, patch
 
 import pytest
+from custom_components.smarter.smarter_client.history import StatusHistory
 from custom_components.smarter.smarter_hub import SmarterHub
 from homeassistant.core import HomeAssistant
 from pytest_homeassistant_custom_component.common import MockConfigEntry
@@ -42,6 +43,10 @@ def error_get_data_fixture():
             "custom_components.smarter.smarter_hub.SmarterHub.sign_in",
             side_effect=Exception,
         ),
+        patch(
+            "custom_components.smarter.smarter_hub.SmarterHub.sign_in_with_refresh_token",
+            side_effect=Exception,
+        ),
         patch(
             "custom_components.smarter.smarter_hub.SmarterHub.get_user",
             side_effect=Exception,
@@ -86,7 +91,7 @@ def mock_user(mock_network):
 @pytest.fixture
 def mock_device():
     """Return mock device object."""
-    return MagicMock(**MOCK_DEVICE)
+    return MagicMock(**MOCK_DEVICE, history=StatusHistory())
 
 
 # This fixture, when used, will result in calls to async_get_data to return None. To
@@ -108,6 +113,10 @@ def bypass_get_data_fixture(mock_session, mock_user, mock_device, request):
             "custom_components.smarter.smarter_hub.SmarterHub.sign_in",
             return_value=get_param("session", mock_session),
         ),
+        patch(
+            "custom_components.smarter.smarter_hub.SmarterHub.sign_in_with_refresh_token",
+            return_value=get_param("session", mock_session),
+        ),
         patch(
             "custom_components.smarter.smarter_hub.SmarterHub.get_user",
             return_value=get_param("user", mock_user),
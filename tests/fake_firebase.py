@@ -0,0 +1,897 @@
+"""
+Local stand-in for the Firebase services used by the Smarter API client.
+
+Implements the subset of the Realtime Database REST and streaming protocol used
+by the integration (GET, POST push, PATCH, PUT and DELETE on ``<path>.json``,
+``put``/``patch``/``keep-alive``/``auth_revoked`` server-sent events, ETag
+headers and conditional reads, ``orderBy`` queries) together with the password
+sign-in and token refresh endpoints and the Storage upload and download
+endpoints. It can inject latency, drop stream connections, lose the responses
+to writes and simulate kettles running boil cycles, so the streaming, refresh
+and command paths can be exercised under load without network access.
+
+Usage::
+
+    with FakeFirebase() as firebase:
+        user_id, kettles = simulate_account(firebase, kettles=20)
+        client = SmarterClient(config=firebase.config)
+        client.sign_in(EMAIL, PASSWORD)
+        kettles[0].boil()
+"""
+
+from __future__ import annotations
+
+import hashlib
+import itertools
+import json
+import queue
+import random
+import socket
+import threading
+import time
+import uuid
+from collections import Counter
+from collections.abc import Callable
+from copy import deepcopy
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import parse_qs, unquote, urlsplit
+
+EMAIL = "kettle.owner@example.com"
+PASSWORD = "password"
+
+IDENTITY_TOOLKIT_PATH = "/identitytoolkit/v3/relyingparty"
+SECURE_TOKEN_PATH = "/securetoken/v1"
+STORAGE_PATH = "/v0/b/"
+
+# Commands reported by a Smarter Kettle V3, with their example payloads
+KETTLE_COMMANDS: dict[str, Any] = {
+    "add_alarm": {"value": 0},
+    "calibrate_weight_sensor": {"value": 0},
+    "change_alarm": {"value": 0},
+    "remove_alarm": {"value": 0},
+    "reset_settings": {"value": 0},
+    "resync_database": {"value": 0},
+    "send_notification": {"value": 0},
+    "send_ping": {"value": 0},
+    "server_restart": {"value": 0},
+    "set_boil_temperature": {"value": 100},
+    "set_formula_mode_enable": {"value": False},
+    "set_formula_mode_temperature": {"value": 40},
+    "set_handle_right_side": {"value": True},
+    "set_keep_warm_time": {"value": 5},
+    "set_manual_boil_temperature": {"value": 100},
+    "set_manual_formula_mode_enable": {"value": False},
+    "set_manual_formula_mode_temperature": {"value": 40},
+    "set_manual_keep_warm_time": {"value": 5},
+    "set_options": {"value": 0},
+    "set_region": {"value": 0},
+    "set_user": {"value": {}},
+    "start_auto_boil": None,
+    "start_boil": {"value": True},
+    "stats_update": {"value": 0},
+    "stop_boil": {"value": True},
+    "turn_off_wifi": {"value": 0},
+}
+
+WriteHook = Callable[[str, list[str], Any], None]
+
+QUERY_PARAMETERS = (
+    "orderBy",
+    "startAt",
+    "endAt",
+    "equalTo",
+    "limitToFirst",
+    "limitToLast",
+)
+
+
+def tokenize(path: str) -> list[str]:
+    """Split a database path into its keys."""
+    return [token for token in path.strip("/").split("/") if token]
+
+
+def etag(value: Any) -> str:
+    """Compute the ETag of a database value."""
+    return hashlib.sha1(
+        json.dumps(value, sort_keys=True).encode("utf-8"), usedforsecurity=False
+    ).hexdigest()
+
+
+def _order(value: Any) -> tuple:
+    """Order values as Firebase does: null, false, true, numbers, strings, objects."""
+    if value is None:
+        return (0,)
+    if isinstance(value, bool):
+        return (1 + value,)
+    if isinstance(value, int | float):
+        return (3, value)
+    if isinstance(value, str):
+        return (4, value)
+    return (5,)
+
+
+def apply_query(value: Any, query: dict[str, str]) -> Any:
+    """
+    Filter the children of `value` as the orderBy query parameters ask.
+
+    Keys are ordered lexicographically only, which is enough for push IDs.
+    Results are returned in reverse order, since the REST API does not promise
+    any, so clients relying on the order of the response would fail.
+    """
+    params = {
+        name: json.loads(query[name]) for name in QUERY_PARAMETERS if name in query
+    }
+    order_by = params.get("orderBy")
+    if order_by is None or not isinstance(value, dict):
+        return value
+
+    def ordered_value(item: tuple[str, Any]) -> tuple:
+        key, child = item
+        if order_by == "$key":
+            return _order(key)
+        if order_by != "$value":
+            for token in tokenize(order_by):
+                child = child.get(token) if isinstance(child, dict) else None
+        return _order(child)
+
+    items = sorted(value.items(), key=lambda item: (ordered_value(item), item[0]))
+    if "equalTo" in params:
+        equal_to = _order(params["equalTo"])
+        items = [item for item in items if ordered_value(item) == equal_to]
+    if "startAt" in params:
+        start_at = _order(params["startAt"])
+        items = [item for item in items if ordered_value(item) >= start_at]
+    if "endAt" in params:
+        end_at = _order(params["endAt"])
+        items = [item for item in items if ordered_value(item) <= end_at]
+    if "limitToFirst" in params:
+        items = items[: params["limitToFirst"]]
+    if "limitToLast" in params:
+        items = items[-params["limitToLast"] :] if params["limitToLast"] else []
+    return dict(reversed(items))
+
+
+class _Listener:
+    """An open event stream on a database path."""
+
+    def __init__(self, tokens: list[str]) -> None:
+        self.tokens = tokens
+        self.events: queue.Queue[tuple[str, Any] | None] = queue.Queue()
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = False
+    block_on_close = True
+
+    def __init__(self, firebase: FakeFirebase) -> None:
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.firebase = firebase
+        self.connections: set[socket.socket] = set()
+
+
+class FakeFirebase:
+    """In-process stand-in for Firebase Realtime Database and authentication."""
+
+    def __init__(
+        self,
+        *,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        keep_alive_interval: float = 30.0,
+        token_lifetime: int = 3600,
+        sse_retry: int | None = None,
+        keep_uploads: bool = True,
+        etag_matching: bool = True,
+    ) -> None:
+        """
+        Create the server. It does not listen until `start` is called.
+
+        Args:
+            latency: seconds added to every response and every streamed event
+            jitter: maximum random seconds added on top of `latency`
+            keep_alive_interval: seconds between keep-alive events on idle streams
+            token_lifetime: seconds until issued ID tokens expire
+            sse_retry: reconnection delay, in milliseconds, advertised to stream
+                clients
+            keep_uploads: whether uploaded Storage objects are kept, rather than
+                only counted, e.g. to benchmark large uploads
+            etag_matching: whether reads with a matching If-None-Match are
+                answered 304 Not Modified, rather than with the full value as
+                by a proxy ignoring the header
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.keep_alive_interval = keep_alive_interval
+        self.token_lifetime = token_lifetime
+        self.sse_retry = sse_retry
+        self.keep_uploads = keep_uploads
+        self.etag_matching = etag_matching
+
+        self.data: dict[str, Any] = {}
+        # Storage objects by name
+        self.files: dict[str, bytes] = {}
+        self.request_counts: Counter[str] = Counter()
+
+        self._lock = threading.RLock()
+        self._listeners: set[_Listener] = set()
+        self._write_hooks: list[WriteHook] = []
+        self._users: dict[str, tuple[str, str]] = {}
+        self._tokens: dict[str, tuple[str, float]] = {}
+        self._refresh_tokens: dict[str, str] = {}
+        self._push_ids = itertools.count()
+        self._lost_responses = 0
+        self._closing = False
+
+        self._server = _Server(self)
+        self._thread: threading.Thread | None = None
+
+    # Lifecycle
+
+    @property
+    def url(self) -> str:
+        """Return the base URL of the server."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def config(self) -> dict[str, str]:
+        """Return the Firebase configuration that points a client at this server."""
+        return {
+            "databaseURL": self.url,
+            "identityToolkitURL": self.url + IDENTITY_TOOLKIT_PATH,
+            "secureTokenURL": self.url + SECURE_TOKEN_PATH,
+            "storageURL": self.url,
+        }
+
+    def start(self) -> FakeFirebase:
+        """Start serving requests on a background thread."""
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="fake-firebase", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Close all connections and stop the server."""
+        self._closing = True
+        self.disconnect_streams()
+        self._server.shutdown()
+        with self._lock:
+            connections = list(self._server.connections)
+        for connection in connections:
+            try:
+                connection.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> FakeFirebase:
+        """Start the server."""
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        """Stop the server."""
+        self.stop()
+
+    # Authentication
+
+    def add_user(self, email: str, password: str, local_id: str | None = None) -> str:
+        """Register a user that can sign in with a password. Returns its ID."""
+        local_id = local_id or uuid.uuid4().hex[:28]
+        with self._lock:
+            self._users[email] = (password, local_id)
+        return local_id
+
+    def issue_token(self, local_id: str) -> tuple[str, str]:
+        """Issue an ID token and a refresh token for a user."""
+        id_token = uuid.uuid4().hex
+        refresh_token = uuid.uuid4().hex
+        with self._lock:
+            self._tokens[id_token] = (local_id, time.time() + self.token_lifetime)
+            self._refresh_tokens[refresh_token] = local_id
+        return (id_token, refresh_token)
+
+    def revoke_tokens(self) -> None:
+        """Invalidate every issued ID token and end all event streams."""
+        with self._lock:
+            self._tokens.clear()
+            listeners = list(self._listeners)
+        for listener in listeners:
+            # The reason is a JSON string, as every event's data is JSON
+            listener.events.put(
+                ("auth_revoked", json.dumps("credential is no longer valid"))
+            )
+            listener.events.put(None)
+
+    def is_authorized(self, token: str | None) -> bool:
+        """Return True if `token` is a valid, unexpired ID token."""
+        with self._lock:
+            _, expires = self._tokens.get(token, (None, 0))
+        return expires > time.time()
+
+    # Database
+
+    def get(self, path: str) -> Any:
+        """Return a copy of the value at `path`."""
+        with self._lock:
+            return deepcopy(self._get(tokenize(path)))
+
+    def set(self, path: str, value: Any) -> None:
+        """Replace the value at `path`, emitting a `put` event."""
+        self._write("PUT", tokenize(path), value)
+
+    def update(self, path: str, value: dict[str, Any]) -> None:
+        """Update children of `path`, emitting a `patch` event."""
+        self._write("PATCH", tokenize(path), value)
+
+    def push(self, path: str, value: Any) -> str:
+        """Add `value` under a new push ID below `path`. Returns the push ID."""
+        key = self.generate_push_id()
+        self._write("POST", [*tokenize(path), key], value)
+        return key
+
+    def delete(self, path: str) -> None:
+        """Delete the value at `path`."""
+        self._write("DELETE", tokenize(path), None)
+
+    def generate_push_id(self) -> str:
+        """Generate a chronologically ordered key."""
+        return f"-{int(time.time() * 1000):012x}{next(self._push_ids):07x}"
+
+    def on_write(self, hook: WriteHook) -> None:
+        """Call `hook(method, path tokens, data)` after every database write."""
+        self._write_hooks.append(hook)
+
+    def disconnect_streams(self) -> None:
+        """Drop every open event stream, as a network interruption would."""
+        with self._lock:
+            listeners = list(self._listeners)
+        for listener in listeners:
+            listener.events.put(None)
+
+    def lose_responses(self, count: int = 1) -> None:
+        """Apply the next `count` writes, but drop their connection unanswered."""
+        with self._lock:
+            self._lost_responses += count
+
+    def _take_lost_response(self) -> bool:
+        with self._lock:
+            if self._lost_responses <= 0:
+                return False
+            self._lost_responses -= 1
+            return True
+
+    def delay(self) -> None:
+        """Sleep for the configured latency."""
+        delay = self.latency + random.uniform(0, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+    def _get(self, tokens: list[str]) -> Any:
+        node = self.data
+        for token in tokens:
+            if not isinstance(node, dict) or token not in node:
+                return None
+            node = node[token]
+        return node
+
+    def _set(self, tokens: list[str], value: Any) -> None:
+        if not tokens:
+            self.data = deepcopy(value) if isinstance(value, dict) else {}
+            return
+
+        parent = self.data
+        for token in tokens[:-1]:
+            child = parent.get(token)
+            if not isinstance(child, dict):
+                child = parent[token] = {}
+            parent = child
+
+        if value is None:
+            parent.pop(tokens[-1], None)
+        else:
+            parent[tokens[-1]] = deepcopy(value)
+
+    def _write(self, method: str, tokens: list[str], data: Any) -> None:
+        with self._lock:
+            if method == "PATCH":
+                for key, value in data.items():
+                    self._set([*tokens, *tokenize(key)], value)
+            else:
+                self._set(tokens, data)
+            self._notify(
+                "patch" if method == "PATCH" else "put", tokens, deepcopy(data)
+            )
+
+        for hook in list(self._write_hooks):
+            hook(method, tokens, data)
+
+    def _notify(self, event: str, tokens: list[str], data: Any) -> None:
+        for listener in self._listeners:
+            depth = len(listener.tokens)
+            if tokens[:depth] == listener.tokens:
+                path = "/" + "/".join(tokens[depth:])
+                listener.events.put((event, {"path": path, "data": data}))
+            elif listener.tokens[: len(tokens)] == tokens:
+                value = deepcopy(self._get(listener.tokens))
+                listener.events.put(("put", {"path": "/", "data": value}))
+
+    def _listen(self, tokens: list[str]) -> tuple[_Listener, Any]:
+        listener = _Listener(tokens)
+        with self._lock:
+            self._listeners.add(listener)
+            return (listener, deepcopy(self._get(tokens)))
+
+    def _unlisten(self, listener: _Listener) -> None:
+        with self._lock:
+            self._listeners.discard(listener)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: _Server
+
+    def setup(self) -> None:
+        super().setup()
+        with self.firebase._lock:
+            self.server.connections.add(self.connection)
+
+    def finish(self) -> None:
+        with self.firebase._lock:
+            self.server.connections.discard(self.connection)
+        super().finish()
+
+    def log_message(self, format: str, *args: Any) -> None:
+        """Silence request logging."""
+
+    @property
+    def firebase(self) -> FakeFirebase:
+        return self.server.firebase
+
+    def do_GET(self) -> None:
+        self._dispatch("GET")
+
+    def do_POST(self) -> None:
+        self._dispatch("POST")
+
+    def do_PUT(self) -> None:
+        self._dispatch("PUT")
+
+    def do_PATCH(self) -> None:
+        self._dispatch("PATCH")
+
+    def do_DELETE(self) -> None:
+        self._dispatch("DELETE")
+
+    def _dispatch(self, method: str) -> None:
+        url = urlsplit(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        firebase = self.firebase
+        firebase.delay()
+
+        if url.path.startswith(STORAGE_PATH):
+            firebase.request_counts["storage"] += 1
+            self._storage(method, url.path, query)
+            return
+
+        body = self._read_body()
+        if url.path == f"{IDENTITY_TOOLKIT_PATH}/verifyPassword":
+            firebase.request_counts["sign_in"] += 1
+            self._sign_in(body)
+        elif url.path == f"{SECURE_TOKEN_PATH}/token":
+            firebase.request_counts["refresh"] += 1
+            self._refresh(body)
+        elif not url.path.endswith(".json"):
+            self._send_json(404, {"error": "Not found"})
+        elif not firebase.is_authorized(query.get("auth")):
+            firebase.request_counts["unauthorized"] += 1
+            self._send_json(401, {"error": "Permission denied"})
+        elif method == "GET" and "text/event-stream" in self.headers.get("Accept", ""):
+            firebase.request_counts["stream"] += 1
+            self._stream(tokenize(url.path[: -len(".json")]))
+        else:
+            firebase.request_counts[method] += 1
+            self._database(method, tokenize(url.path[: -len(".json")]), query, body)
+
+    def _read_body(self) -> Any:
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return None
+        return json.loads(self.rfile.read(length))
+
+    def _read_upload(self) -> tuple[bytes, int]:
+        """Return the uploaded bytes, if kept, and their size."""
+        data = bytearray()
+        size = 0
+
+        def receive(length: int) -> None:
+            nonlocal size
+            while length:
+                chunk = self.rfile.read(min(length, 1 << 20))
+                if self.firebase.keep_uploads:
+                    data.extend(chunk)
+                size += len(chunk)
+                length -= len(chunk)
+
+        if self.headers.get("Transfer-Encoding") == "chunked":
+            while length := int(self.rfile.readline().split(b";")[0], 16):
+                receive(length)
+                self.rfile.readline()
+            # Trailers end with an empty line
+            while self.rfile.readline().strip():
+                pass
+        else:
+            receive(int(self.headers.get("Content-Length") or 0))
+        return bytes(data), size
+
+    def _send_json(
+        self, status: int, value: Any, headers: dict[str, str] | None = None
+    ) -> None:
+        payload = json.dumps(value).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, header in (headers or {}).items():
+            self.send_header(name, header)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _send_not_modified(self, headers: dict[str, str]) -> None:
+        self.send_response(304)
+        for name, header in headers.items():
+            self.send_header(name, header)
+        self.end_headers()
+
+    def _sign_in(self, body: dict[str, Any]) -> None:
+        firebase = self.firebase
+        body = body or {}
+        password, local_id = firebase._users.get(body.get("email"), (None, None))
+        if password is None or password != body.get("password"):
+            self._send_json(400, {"error": {"code": 400, "message": "INVALID_LOGIN"}})
+            return
+
+        id_token, refresh_token = firebase.issue_token(local_id)
+        self._send_json(
+            200,
+            {
+                "kind": "identitytoolkit#VerifyPasswordResponse",
+                "localId": local_id,
+                "email": body["email"],
+                "displayName": "",
+                "idToken": id_token,
+                "registered": True,
+                "refreshToken": refresh_token,
+                "expiresIn": str(firebase.token_lifetime),
+            },
+        )
+
+    def _refresh(self, body: dict[str, Any]) -> None:
+        firebase = self.firebase
+        local_id = firebase._refresh_tokens.get((body or {}).get("refreshToken"))
+        if local_id is None:
+            self._send_json(
+                400, {"error": {"code": 400, "message": "INVALID_REFRESH_TOKEN"}}
+            )
+            return
+
+        id_token, refresh_token = firebase.issue_token(local_id)
+        self._send_json(
+            200,
+            {
+                "user_id": local_id,
+                "id_token": id_token,
+                "refresh_token": refresh_token,
+                "expires_in": str(firebase.token_lifetime),
+                "token_type": "Bearer",
+            },
+        )
+
+    def _database(
+        self, method: str, tokens: list[str], query: dict[str, str], body: Any
+    ) -> None:
+        firebase = self.firebase
+        path = "/".join(tokens)
+        with firebase._lock:
+            current = firebase.get(path)
+            if_match = self.headers.get("if-match")
+            if if_match is not None and if_match != etag(current):
+                self._send_json(412, current, {"ETag": etag(current)})
+                return
+
+        match method:
+            case "GET":
+                value = apply_query(current, query)
+                if query.get("shallow") == "true" and isinstance(value, dict):
+                    value = {key: True for key in value}
+                headers = {}
+                if self.headers.get("X-Firebase-ETag") == "true":
+                    headers["ETag"] = etag(current)
+                    if_none_match = self.headers.get("if-none-match")
+                    if firebase.etag_matching and if_none_match == headers["ETag"]:
+                        self._send_not_modified(headers)
+                        return
+                self._send_json(200, value, headers)
+            case "PUT":
+                firebase.set(path, body)
+                self._send_write_response(body)
+            case "PATCH":
+                firebase.update(path, body)
+                self._send_write_response(body)
+            case "POST":
+                self._send_write_response({"name": firebase.push(path, body)})
+            case "DELETE":
+                firebase.delete(path)
+                self._send_json(200, None)
+
+    def _send_write_response(self, body: Any) -> None:
+        if self.firebase._take_lost_response():
+            # The write is applied, but the client never hears back
+            self.close_connection = True
+            return
+        self._send_json(200, body)
+
+    def _storage(self, method: str, path: str, query: dict[str, str]) -> None:
+        # Uploads are posted to <bucket>/o, objects are read from <bucket>/o/<name>
+        tokens = path[len(STORAGE_PATH) :].split("/", 2)
+        firebase = self.firebase
+
+        if method == "POST" and tokens[1:] == ["o"] and "name" in query:
+            data, size = self._read_upload()
+            if firebase.keep_uploads:
+                with firebase._lock:
+                    firebase.files[query["name"]] = data
+            self._send_json(
+                200, {"name": query["name"], "bucket": tokens[0], "size": str(size)}
+            )
+            return
+        if method != "GET" or len(tokens) != 3 or query.get("alt") != "media":
+            self._send_json(404, {"error": {"code": 404, "message": "Not Found"}})
+            return
+
+        with firebase._lock:
+            data = firebase.files.get(unquote(tokens[2]))
+        if data is None:
+            self._send_json(404, {"error": {"code": 404, "message": "Not Found"}})
+            return
+
+        start = 0
+        if (range_header := self.headers.get("Range")) is not None:
+            start = int(range_header.removeprefix("bytes=").split("-")[0])
+            if start >= len(data):
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{len(data)}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+
+        self.send_response(206 if start else 200)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(len(data) - start))
+        if start:
+            self.send_header(
+                "Content-Range", f"bytes {start}-{len(data) - 1}/{len(data)}"
+            )
+        self.end_headers()
+        view = memoryview(data)
+        for offset in range(start, len(data), 1 << 20):
+            self.wfile.write(view[offset : offset + (1 << 20)])
+
+    def _stream(self, tokens: list[str]) -> None:
+        firebase = self.firebase
+        listener, value = firebase._listen(tokens)
+        self.close_connection = True
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+
+        try:
+            self._send_event("put", {"path": "/", "data": value}, firebase.sse_retry)
+            while not firebase._closing:
+                try:
+                    event = listener.events.get(timeout=firebase.keep_alive_interval)
+                except queue.Empty:
+                    self._send_event("keep-alive", None)
+                    continue
+
+                if event is None:
+                    break
+
+                firebase.delay()
+                self._send_event(*event)
+        except OSError:
+            # client went away
+            pass
+        finally:
+            firebase._unlisten(listener)
+
+    def _send_event(self, event: str, data: Any, retry: int | None = None) -> None:
+        lines = [] if retry is None else [f"retry: {retry}"]
+        lines.append(f"event: {event}")
+        lines.append(f"data: {data if isinstance(data, str) else json.dumps(data)}")
+        self.wfile.write(("\n".join(lines) + "\n\n").encode("utf-8"))
+        self.wfile.flush()
+
+
+class KettleSimulator:
+    """A simulated Smarter Kettle V3 that reacts to commands and boils water."""
+
+    def __init__(
+        self,
+        firebase: FakeFirebase,
+        device_id: str,
+        network_id: str,
+        *,
+        start_temperature: float = 20.0,
+        boil_step: float = 1.0,
+        step_interval: float = 0.05,
+    ) -> None:
+        """
+        Create the kettle in the database.
+
+        Args:
+            firebase: server to create the kettle on
+            device_id: ID of the kettle
+            network_id: ID of the network the kettle belongs to
+            start_temperature: water temperature before boiling
+            boil_step: degrees the water heats up per status update while boiling
+            step_interval: seconds between status updates while boiling
+        """
+        self.firebase = firebase
+        self.device_id = device_id
+        self.boil_step = boil_step
+        self.step_interval = step_interval
+        self.start_temperature = start_temperature
+        self.status_path = f"devices/{device_id}/status"
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+        firebase.set(
+            f"devices/{device_id}",
+            {
+                "commands": {
+                    name: {} if example is None else {"example": example}
+                    for name, example in KETTLE_COMMANDS.items()
+                },
+                "settings": {"network": network_id, "network_ssid": "kitchen"},
+                "status": {
+                    "device_model": "SMKET01",
+                    "firmware_version": "1.0.0",
+                    "state": "Ready",
+                    "water_temperature": start_temperature,
+                    "boil_temperature": 100,
+                    "target_temperature": 100,
+                    "water_level": 3,
+                    "keep_warm_time": 0,
+                    "kettle_is_present": True,
+                    "calibrated": True,
+                },
+            },
+        )
+        firebase.on_write(self._on_write)
+
+    @property
+    def status(self) -> dict[str, Any]:
+        """Return the current status of the kettle."""
+        return self.firebase.get(self.status_path)
+
+    @property
+    def is_boiling(self) -> bool:
+        """Return True while a boil cycle is running."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def boil(self) -> None:
+        """Start a boil cycle in the background."""
+        if self.is_boiling:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._boil_cycle, name=f"kettle-{self.device_id}", daemon=True
+        )
+        self._thread.start()
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Wait for the running boil cycle to finish. Returns False on timeout."""
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return not self.is_boiling
+
+    def stop(self) -> None:
+        """Abort the running boil cycle."""
+        self._stop.set()
+        self.wait()
+
+    def _boil_cycle(self) -> None:
+        status = self.status
+        target = status["boil_temperature"]
+        temperature = min(status["water_temperature"], target)
+        self.firebase.update(
+            self.status_path, {"state": "Boiling", "target_temperature": target}
+        )
+
+        while temperature < target and not self._stop.wait(self.step_interval):
+            temperature = min(temperature + self.boil_step, target)
+            self.firebase.update(
+                self.status_path, {"water_temperature": round(temperature, 1)}
+            )
+
+        if status["keep_warm_time"] and not self._stop.is_set():
+            self.firebase.update(self.status_path, {"state": "Keeping Warm"})
+            self._stop.wait(self.step_interval)
+        self.firebase.update(self.status_path, {"state": "Ready"})
+
+    def _on_write(self, method: str, tokens: list[str], data: Any) -> None:
+        # A command instance is written to devices/<id>/commands/<name>/<instance>
+        if (
+            method not in ("POST", "PUT")
+            or len(tokens) != 5
+            or tokens[:3] != ["devices", self.device_id, "commands"]
+            or not isinstance(data, dict)
+        ):
+            return
+
+        name, instance = tokens[3:]
+        value = data.get("value")
+        match name:
+            case "start_boil" | "start_auto_boil":
+                self.boil()
+            case "stop_boil":
+                self._stop.set()
+            case "set_boil_temperature":
+                self.firebase.update(self.status_path, {"boil_temperature": value})
+            case "set_keep_warm_time":
+                self.firebase.update(self.status_path, {"keep_warm_time": value})
+
+        self.firebase.update(
+            f"devices/{self.device_id}/commands/{name}/{instance}",
+            {"state": "success", "response": {"code": 0}},
+        )
+
+
+def simulate_account(
+    firebase: FakeFirebase,
+    kettles: int = 1,
+    email: str = EMAIL,
+    password: str = PASSWORD,
+    **kettle_options: Any,
+) -> tuple[str, list[KettleSimulator]]:
+    """
+    Create a user owning a network of simulated kettles.
+
+    Returns the ID of the user and the kettles.
+    """
+    user_id = firebase.add_user(email, password)
+    network_id = f"network-{user_id}"
+
+    simulators = [
+        KettleSimulator(firebase, f"kettle-{index:03d}", network_id, **kettle_options)
+        for index in range(kettles)
+    ]
+    firebase.set(
+        f"networks/{network_id}",
+        {
+            "access_tokens_fcm": {},
+            "associated_devices": {kettle.device_id: True for kettle in simulators},
+            "name": "Home",
+            "owner": user_id,
+        },
+    )
+    firebase.set(
+        f"users/{user_id}",
+        {
+            "accepted": int(time.time() * 1000),
+            "email": email,
+            "first_name": "Kettle",
+            "last_name": "Owner",
+            "locationAccepted": 1,
+            "networks_index": {network_id: "Home"},
+            "temperature_unit": 0,
+        },
+    )
+
+    return (user_id, simulators)
@@ -0,0 +1,152 @@
+"""Test the Smarter managed device wrapper."""
+
+import threading
+from unittest.mock import MagicMock
+
+from custom_components.smarter.smarter_client.managed_devices.base import BaseDevice
+from custom_components.smarter.smarter_client.managed_devices.kettle_v3 import (
+    SmarterKettleV3,
+)
+from custom_components.smarter.smarter_client.metrics import Metrics
+
+STATUS_EVENT = {"event": "patch", "path": "/status", "data": {"water_temperature": 1}}
+
+
+class StubDevice(BaseDevice):
+    """Concrete BaseDevice for tests."""
+
+
+def make_device(coalesce_window: float = 0) -> StubDevice:
+    """Create a device wrapper around a mocked model."""
+    model = MagicMock(status={}, identifier="stub", client=MagicMock(metrics=Metrics()))
+    device = StubDevice(model, "Stub", "kettle", "user")
+    device.set_coalesce_window(coalesce_window)
+    return device
+
+
+def test_status_events_delivered_immediately_without_window():
+    """Test that every status event notifies subscribers when coalescing is off."""
+    device = make_device()
+    handler = MagicMock()
+    device._status_subscriptions.add(handler)
+
+    for _ in range(3):
+        device._on_event(STATUS_EVENT)
+
+    assert handler.call_count == 3
+    assert device.coalesce_stats == {"events_received": 3, "updates_delivered": 3}
+
+
+def test_status_fanout_recorded_in_metrics():
+    """Test that notifications and their fan-out time are recorded per device."""
+    device = make_device()
+    device._status_subscriptions.add(MagicMock())
+
+    device._on_event(STATUS_EVENT)
+    device._on_event(STATUS_EVENT)
+
+    metrics = device.metrics
+    assert metrics["counters"] == {"status.notifications": {"stub": 2}}
+    assert metrics["timers"]["status.fanout"]["stub"]["count"] == 2
+
+
+def test_status_events_coalesced_within_window():
+    """Test that a burst of status events results in a single notification."""
+    device = make_device(coalesce_window=0.05)
+    delivered = threading.Event()
+    handler = MagicMock(side_effect=lambda status: delivered.set())
+    device._status_subscriptions.add(handler)
+
+    for _ in range(10):
+        device._on_event(STATUS_EVENT)
+    device._on_event({"event": "patch", "path": "/settings", "data": {}})
+
+    assert delivered.wait(1)
+    assert handler.call_count == 1
+    assert device.coalesce_stats == {"events_received": 10, "updates_delivered": 1}
+
+
+def test_stats_counted_across_threads():
+    """Test that events delivered from several threads are all counted."""
+    device = make_device()
+    device._status_subscriptions.add(MagicMock())
+
+    def deliver() -> None:
+        for _ in range(200):
+            device._on_event(STATUS_EVENT)
+
+    threads = [threading.Thread(target=deliver) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert device.coalesce_stats == {"events_received": 800, "updates_delivered": 800}
+
+
+def test_command_catalogue_shared_by_model():
+    """Test that devices of the same model and firmware share a catalogue."""
+    status = {"device_model": "SMKET01", "firmware_version": "catalogue-test"}
+    commands = {
+        "start_boil": MagicMock(example={"value": True}),
+        "set_boil_temperature": MagicMock(example={"value": 100}),
+    }
+    first = StubDevice(MagicMock(status=status, commands=commands), "A", "kettle", "")
+    second = StubDevice(MagicMock(status=status, commands={}), "B", "kettle", "")
+
+    assert second.command_catalogue is first.command_catalogue
+    assert first.command_catalogue["start_boil"].value_type == "boolean"
+    assert first.command_catalogue["set_boil_temperature"].value_type == "number"
+
+
+def test_typed_commands_validated_against_catalogue():
+    """Test that typed kettle commands missing from the device are reported."""
+    status = {"device_model": "SMKET01", "firmware_version": "validation-test"}
+    commands = {
+        name: MagicMock(example=None) for name in SmarterKettleV3.typed_commands
+    }
+    del commands["turn_off_wifi"]
+
+    device = SmarterKettleV3(MagicMock(status=status, commands=commands), "user")
+
+    assert "start_boil" in SmarterKettleV3.typed_commands
+    assert "from_device" not in SmarterKettleV3.typed_commands
+    assert device.validate_commands() == {"turn_off_wifi"}
+
+
+def test_stream_health():
+    """Test that a stream is healthy only while running and recently active."""
+    device = make_device()
+    device.device.stream_thread = None
+    assert not device.is_stream_healthy(90)
+
+    device.device.stream_thread = MagicMock(is_alive=MagicMock(return_value=True))
+    device.device.stream_idle_time = 10.0
+    assert device.is_stream_healthy(90)
+
+    device.device.stream_idle_time = 120.0
+    assert not device.is_stream_healthy(90)
+
+
+def test_polled_status_notifies_subscribers():
+    """Test that polled status changes are applied and notified as stream events."""
+    device = make_device()
+    handler = MagicMock()
+    device._status_subscriptions.add(handler)
+    poller = device.device.client.poll_device_status.return_value
+
+    device.start_polling(10, 60)
+    device.start_polling(10, 60)
+
+    device.device.client.poll_device_status.assert_called_once_with(
+        "stub", device._on_polled_event, 10, 60
+    )
+    assert device.worker_threads["poll"] is poller.thread
+
+    device._on_polled_event(STATUS_EVENT)
+    device.device._on_event.assert_called_once_with(STATUS_EVENT)
+    handler.assert_called_once()
+
+    device.stop_polling()
+    poller.close.assert_called_once()
+    assert not device.is_polling
@@ -50,10 +50,11 @@ def test_binary_sensor_values(
         hass, generate_unique_id(data.key), platform=Platform.BINARY_SENSOR
     )
 
-    device = entity.device
+    status = entity.coordinator.data[entity.device.id]
 
     for value in data.state_on_values:
-        with patch.dict(device.status, {data.get_status_field: value}):
-            assert (
-                entity.is_on
-            ), f"expected entity {entity.unique_id} to be on when status is {value}"
+        with patch.dict(status, {data.get_status_field: value}):
+            entity._update_derived_state()
+            assert entity.is_on, (
+                f"expected entity {entity.unique_id} to be on when status is {value}"
+            )
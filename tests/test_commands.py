@@ -0,0 +1,60 @@
+"""Test the Smarter Kettle and Coffee command pipeline."""
+
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+from custom_components.smarter.commands import CommandPipeline
+from custom_components.smarter.smarter_client.metrics import Metrics
+from homeassistant.core import HomeAssistant
+
+
+async def test_commands_to_device_sent_in_order(hass: HomeAssistant):
+    """Test that commands to a device are sent one at a time in issue order."""
+    pipeline = CommandPipeline(hass, Metrics())
+    device = SimpleNamespace(id="kettle")
+    sent = []
+
+    def send(name: str, delay: float) -> str:
+        time.sleep(delay)
+        sent.append(name)
+        return name
+
+    results = await asyncio.gather(
+        pipeline.async_send(device, send, "set_boil_temperature", 0.05),
+        pipeline.async_send(device, send, "start_boil", 0),
+        pipeline.async_send(device, send, "stop_boil", 0),
+    )
+
+    assert sent == ["set_boil_temperature", "start_boil", "stop_boil"]
+    assert results == sent
+    assert pipeline.queue_depth("kettle") == 0
+    assert pipeline.metrics.counter("commands.queued", "kettle") == 2
+    assert pipeline.metrics.timer_stats("commands.latency", "kettle")["count"] == 3
+
+
+async def test_concurrency_bounded_across_devices(hass: HomeAssistant):
+    """Test that commands to different devices run concurrently up to the limit."""
+    pipeline = CommandPipeline(hass, Metrics(), max_concurrency=2)
+    lock = threading.Lock()
+    running = 0
+    peak = 0
+
+    def send() -> None:
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.05)
+        with lock:
+            running -= 1
+
+    await asyncio.gather(
+        *(
+            pipeline.async_send(SimpleNamespace(id=f"kettle-{index}"), send)
+            for index in range(5)
+        )
+    )
+
+    assert peak == 2
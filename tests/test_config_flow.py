@@ -3,9 +3,14 @@
 from unittest.mock import MagicMock, patch
 
 import pytest
-from custom_components.smarter.const import DOMAIN
+from custom_components.smarter.const import (
+    CONF_COALESCE_WINDOW,
+    CONF_RECORD_STREAMS,
+    DOMAIN,
+)
 from homeassistant import config_entries, data_entry_flow
 from homeassistant.const import CONF_USERNAME
+from pytest_homeassistant_custom_component.common import MockConfigEntry
 
 from .const import MOCK_CONFIG, MOCK_SESSION
 
@@ -106,3 +111,21 @@ async def test_failed_config_flow_error(hass, error_on_get_data):
 
     assert result["type"] == data_entry_flow.RESULT_TYPE_FORM
     assert result["errors"] == {"base": "cannot_connect"}
+
+
+async def test_options_flow(hass):
+    """Test configuring the integration options through the options flow."""
+    entry = MockConfigEntry(domain=DOMAIN, data=MOCK_CONFIG)
+    entry.add_to_hass(hass)
+
+    result = await hass.config_entries.options.async_init(entry.entry_id)
+
+    assert result["type"] == data_entry_flow.RESULT_TYPE_FORM
+    assert result["step_id"] == "init"
+
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"], user_input={CONF_COALESCE_WINDOW: 250}
+    )
+
+    assert result["type"] == data_entry_flow.RESULT_TYPE_CREATE_ENTRY
+    assert entry.options == {CONF_COALESCE_WINDOW: 250, CONF_RECORD_STREAMS: False}
@@ -0,0 +1,171 @@
+"""Test the Smarter Kettle and Coffee coordinator."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+from custom_components.smarter.const import (
+    ACTIVE_POLL_INTERVAL,
+    DOMAIN,
+    IDLE_POLL_INTERVAL,
+)
+from custom_components.smarter.coordinator import SmarterCoordinator
+from custom_components.smarter.smarter_client.domain import Device
+from custom_components.smarter.smarter_client.metrics import Metrics
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+
+def get_coordinator(hass: HomeAssistant, entry: MockConfigEntry) -> SmarterCoordinator:
+    """Return the coordinator of a config entry."""
+    return hass.data[DOMAIN][entry.entry_id]["coordinator"]
+
+
+@pytest.mark.parametrize("init_integration", [(False,)], indirect=True)
+@pytest.mark.parametrize("bypass_get_data", [{}], indirect=True)
+async def test_notifications_batched_per_loop_iteration(
+    hass: HomeAssistant,
+    bypass_get_data,
+    init_integration: MockConfigEntry,
+):
+    """Test that notifications received meanwhile are published together."""
+    coordinator = get_coordinator(hass, init_integration)
+    device = next(iter(coordinator.devices.values()))
+    listener = MagicMock()
+    coordinator.async_add_listener(listener)
+
+    with patch.dict(device.status, {"water_temperature": 42.0}):
+        for _ in range(5):
+            coordinator._on_status(device.id, device.status)
+        await hass.async_block_till_done()
+
+    listener.assert_called_once()
+    assert coordinator.changed == {device.id}
+    assert coordinator.data[device.id]["water_temperature"] == 42.0
+
+
+@pytest.mark.parametrize("init_integration", [(False,)], indirect=True)
+@pytest.mark.parametrize("bypass_get_data", [{}], indirect=True)
+async def test_no_polling_while_streams_healthy(
+    hass: HomeAssistant,
+    bypass_get_data,
+    init_integration: MockConfigEntry,
+):
+    """Test that the status is not polled while the streams are healthy."""
+    coordinator = get_coordinator(hass, init_integration)
+    device = next(iter(coordinator.devices.values()))
+    device.is_stream_healthy.return_value = True
+
+    await coordinator.async_refresh()
+
+    device.start_polling.assert_not_called()
+    assert coordinator.unhealthy == set()
+
+
+@pytest.mark.parametrize("init_integration", [(False,)], indirect=True)
+@pytest.mark.parametrize("bypass_get_data", [{}], indirect=True)
+async def test_unhealthy_stream_polled_until_recovered(
+    hass: HomeAssistant,
+    bypass_get_data,
+    init_integration: MockConfigEntry,
+):
+    """Test that devices are polled while their stream is unhealthy."""
+    coordinator = get_coordinator(hass, init_integration)
+    device = next(iter(coordinator.devices.values()))
+    device.is_stream_healthy.return_value = False
+
+    await coordinator.async_refresh()
+    await coordinator.async_refresh()
+
+    device.start_polling.assert_called_once_with(
+        ACTIVE_POLL_INTERVAL.total_seconds(), IDLE_POLL_INTERVAL.total_seconds()
+    )
+    assert coordinator.unhealthy == {device.id}
+
+    device.is_stream_healthy.return_value = True
+    await coordinator.async_refresh()
+
+    device.stop_polling.assert_called_once()
+    assert coordinator.unhealthy == set()
+
+
+@pytest.mark.parametrize("init_integration", [(False,)], indirect=True)
+@pytest.mark.parametrize("bypass_get_data", [{}], indirect=True)
+async def test_device_removed_during_health_check(
+    hass: HomeAssistant,
+    bypass_get_data,
+    init_integration: MockConfigEntry,
+):
+    """Test that a device removed while the streams are checked is not polled."""
+    coordinator = get_coordinator(hass, init_integration)
+    device = next(iter(coordinator.devices.values()))
+
+    def remove_device(_max_idle: float) -> bool:
+        # As the event loop removing the device while the executor checks it
+        coordinator.devices.pop(device.id)
+        return False
+
+    device.is_stream_healthy.side_effect = remove_device
+
+    await coordinator.async_refresh()
+
+    assert coordinator.last_update_success
+    device.start_polling.assert_not_called()
+    assert coordinator.unhealthy == set()
+
+
+@pytest.mark.parametrize("init_integration", [(False,)], indirect=True)
+@pytest.mark.parametrize("bypass_get_data", [{}], indirect=True)
+async def test_optimistic_value_superseded_by_report(
+    hass: HomeAssistant,
+    bypass_get_data,
+    init_integration: MockConfigEntry,
+):
+    """Test that any reported change of a field replaces its optimistic value."""
+    coordinator = get_coordinator(hass, init_integration)
+    device = next(iter(coordinator.devices.values()))
+
+    rollback = coordinator.async_set_optimistic(device.id, {"state": "Boiling"})
+    assert coordinator.data[device.id]["state"] == "Boiling"
+    assert device.status["state"] == "Idle"
+
+    with patch.dict(device.status, {"state": "Keeping Warm"}):
+        coordinator._on_status(device.id, device.status)
+        await hass.async_block_till_done()
+        rollback()
+
+        assert coordinator.data[device.id]["state"] == "Keeping Warm"
+
+
+@pytest.mark.parametrize("init_integration", [(False,)], indirect=True)
+@pytest.mark.parametrize("bypass_get_data", [{}], indirect=True)
+async def test_status_version_published_once(
+    hass: HomeAssistant,
+    bypass_get_data,
+    init_integration: MockConfigEntry,
+):
+    """Test that notifications of a status already published are skipped."""
+    coordinator = get_coordinator(hass, init_integration)
+    device = next(iter(coordinator.devices.values()))
+    model = Device.from_data(
+        MagicMock(metrics=Metrics()),
+        {"commands": {}, "status": dict(device.status)},
+        device.id,
+    )
+    listener = MagicMock()
+    coordinator.async_add_listener(listener)
+
+    with patch.object(device, "status", model.status):
+        coordinator._on_status(device.id, device.status)
+        await hass.async_block_till_done()
+        coordinator._on_status(device.id, device.status)
+        await hass.async_block_till_done()
+
+    listener.assert_called_once()
+
+    model._on_event({"event": "patch", "path": "/status", "data": {"state": "Boiling"}})
+    with patch.object(device, "status", model.status):
+        coordinator._on_status(device.id, device.status)
+        await hass.async_block_till_done()
+
+    assert listener.call_count == 2
+    assert coordinator.data[device.id]["state"] == "Boiling"
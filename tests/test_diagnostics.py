@@ -0,0 +1,30 @@
+"""Test Smarter Kettle and Coffee diagnostics."""
+
+import pytest
+from custom_components.smarter.const import DOMAIN
+from custom_components.smarter.diagnostics import async_get_config_entry_diagnostics
+from homeassistant.components.diagnostics import REDACTED
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from .const import MOCK_DEVICE_ID
+
+
+@pytest.mark.parametrize("init_integration", [(False,)], indirect=True)
+@pytest.mark.parametrize("bypass_get_data", [{}], indirect=True)
+async def test_config_entry_diagnostics(
+    hass: HomeAssistant,
+    bypass_get_data,
+    init_integration: MockConfigEntry,
+):
+    """Test that diagnostics include device metrics and redact credentials."""
+    entry = init_integration
+    hub = hass.data[DOMAIN][entry.entry_id]["hub"]
+    hub.client.metrics.increment("model.events", MOCK_DEVICE_ID)
+
+    diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+
+    assert diagnostics["entry"]["data"]["password"] == REDACTED
+    assert diagnostics["entry"]["data"]["username"] == REDACTED
+    assert diagnostics["devices"][MOCK_DEVICE_ID]["status"]["state"] == "Idle"
+    assert diagnostics["metrics"]["counters"]["model.events"] == {MOCK_DEVICE_ID: 1}
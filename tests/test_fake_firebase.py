@@ -0,0 +1,347 @@
+"""Test the API client against the local Firebase stand-in."""
+
+import io
+import json
+import threading
+import time
+
+import pytest
+from custom_components.smarter.smarter_client.domain import Device, SmarterClient
+from custom_components.smarter.smarter_client.managed_devices import SmarterKettleV3
+from custom_components.smarter.smarter_client.recording import (
+    device_handler,
+    read_recording,
+    replay,
+)
+from requests.exceptions import HTTPError, Timeout
+
+from .fake_firebase import EMAIL, PASSWORD, FakeFirebase, simulate_account
+
+
+@pytest.fixture
+def firebase(socket_enabled):
+    """Run a Firebase stand-in with three simulated kettles."""
+    # Closing a stream waits for the next event, so keep idle streams chatty
+    with FakeFirebase(sse_retry=10, keep_alive_interval=0.05) as firebase:
+        _, kettles = simulate_account(
+            firebase, kettles=3, boil_step=20, step_interval=0.01
+        )
+        yield firebase
+        for kettle in kettles:
+            kettle.stop()
+
+
+@pytest.fixture
+def client(firebase: FakeFirebase) -> SmarterClient:
+    """Return a client signed in to the stand-in."""
+    client = SmarterClient(config=firebase.config)
+    client.sign_in(EMAIL, PASSWORD)
+    return client
+
+
+def watch_until(device: Device, predicate, action=None, timeout: float = 5) -> bool:
+    """Watch a device until `predicate(device)` holds after running `action`."""
+    connected = threading.Event()
+    done = threading.Event()
+
+    def _on_event(event):
+        connected.set()
+        if predicate(device):
+            done.set()
+
+    device.watch(_on_event)
+    try:
+        # The stream sends the current data on connect; act only once it is open
+        assert connected.wait(timeout)
+        if action is not None:
+            action()
+        return done.wait(timeout)
+    finally:
+        device.unwatch()
+
+
+def test_sign_in_and_fetch(firebase: FakeFirebase, client: SmarterClient):
+    """Test that a user, their network and devices can be fetched."""
+    user = client.get_user(client.session.local_id)
+    network_id = next(iter(user["networks_index"]))
+
+    network = client.get_network(network_id)
+    device = client.get_device(next(iter(network["associated_devices"])))
+
+    assert len(network["associated_devices"]) == 3
+    assert device["status"]["device_model"] == "SMKET01"
+    assert firebase.request_counts["sign_in"] == 1
+
+
+def test_invalid_password(firebase: FakeFirebase):
+    """Test that signing in with the wrong password fails."""
+    with pytest.raises(HTTPError):
+        SmarterClient(config=firebase.config).sign_in(EMAIL, "wrong")
+
+
+def test_refresh(firebase: FakeFirebase, client: SmarterClient):
+    """Test that the session can be refreshed."""
+    token = client.token
+
+    client.refresh()
+
+    assert client.token != token
+    assert client.get_status("kettle-000")["state"] == "Ready"
+
+
+def test_sign_in_with_refresh_token(firebase: FakeFirebase, client: SmarterClient):
+    """Test that a session is resumed from its refresh token, without the password."""
+    sessions = []
+    resumed = SmarterClient(config=firebase.config)
+    resumed.add_session_listener(sessions.append)
+
+    session = resumed.sign_in_with_refresh_token(client.session.refresh_token)
+
+    assert session.local_id == client.session.local_id
+    assert sessions == [session]
+    assert resumed.get_status("kettle-000")["state"] == "Ready"
+    assert firebase.request_counts["sign_in"] == 1
+
+    with pytest.raises(HTTPError):
+        resumed.sign_in_with_refresh_token("revoked")
+
+
+def test_revoked_tokens_end_stream(firebase: FakeFirebase, client: SmarterClient):
+    """Test that revoking tokens ends a live stream without a device event."""
+    device = Device.from_id(client, "kettle-000")
+    events = []
+    connected = threading.Event()
+
+    def _on_event(event):
+        events.append(event)
+        connected.set()
+
+    device.watch(_on_event)
+    try:
+        assert connected.wait(5)
+        thread = device.stream_thread
+
+        firebase.revoke_tokens()
+        thread.join(5)
+
+        assert not thread.is_alive()
+        assert [event["event"] for event in events] == ["put"]
+        # The stream reconnected once, with the revoked token
+        assert firebase.request_counts["unauthorized"] == 1
+    finally:
+        device.unwatch()
+
+
+def test_command_starts_boil_cycle(client: SmarterClient):
+    """Test that a streamed device follows a boil cycle started by a command."""
+    device = Device.from_id(client, "kettle-000")
+    device.fetch()
+    seen = []
+
+    def boiled(device: Device) -> bool:
+        seen.append(device.status.get("state"))
+        return "Boiling" in seen and device.status.get("state") == "Ready"
+
+    assert watch_until(
+        device,
+        boiled,
+        lambda: client.send_command(
+            "kettle-000", "start_boil", {"user_id": "", "value": True}
+        ),
+    )
+    assert device.status["water_temperature"] == 100
+
+
+def test_recorded_stream_replays_to_same_state(client: SmarterClient, tmp_path):
+    """Test that replaying a recorded boil cycle reproduces the device state."""
+    client.start_recording(str(tmp_path))
+    device = Device.from_id(client, "kettle-002")
+    device.fetch()
+
+    assert watch_until(
+        device,
+        lambda device: device.status.get("water_temperature") == 100,
+        lambda: client.send_command(
+            "kettle-002", "start_boil", {"user_id": "", "value": True}
+        ),
+    )
+    client.stop_recording()
+
+    path = str(tmp_path / "kettle-002.jsonl")
+    (_, initial), *_ = read_recording(path)
+    replayed = Device.from_data(client, initial["data"], "kettle-002")
+    replayed.is_stub = False
+    kettle = SmarterKettleV3(replayed, "user")
+    notifications = []
+    kettle._status_subscriptions.add(notifications.append)
+
+    count = replay(path, device_handler(kettle), speed=0)
+
+    assert count > 2
+    assert notifications
+    assert kettle.status == device.status
+
+
+def test_stream_reconnects(firebase: FakeFirebase, client: SmarterClient):
+    """Test that a dropped stream reconnects and resumes delivering events."""
+    device = Device.from_id(client, "kettle-001")
+    device.fetch()
+
+    def disconnect_and_update():
+        firebase.disconnect_streams()
+        firebase.update("devices/kettle-001/status", {"water_level": 1})
+
+    assert watch_until(
+        device,
+        lambda device: device.status.get("water_level") == 1,
+        disconnect_and_update,
+    )
+    assert firebase.request_counts["stream"] >= 2
+    assert client.metrics.counter("stream.reconnects", "kettle-001") >= 1
+
+
+def test_conditional_status_reads(firebase: FakeFirebase, client: SmarterClient):
+    """Test that unchanged status reads are skipped based on their ETag."""
+    status = client.get_status_if_changed("kettle-001")
+    assert status["state"] == "Ready"
+    assert client.get_status_if_changed("kettle-001") is None
+
+    firebase.update("devices/kettle-001/status", {"water_level": 1})
+    assert client.get_status_if_changed("kettle-001")["water_level"] == 1
+
+    assert client.metrics.counter("poll.requests", "kettle-001") == 3
+    assert client.metrics.counter("poll.unchanged", "kettle-001") == 1
+    assert client.metrics.counter("poll.bytes_saved", "kettle-001") > 0
+
+
+def test_conditional_reads_ignored_by_server(
+    firebase: FakeFirebase, client: SmarterClient
+):
+    """Test that no bytes count as saved when the server ignores the ETag."""
+    firebase.etag_matching = False
+    status = client.get_status_if_changed("kettle-001")
+    assert status["state"] == "Ready"
+    assert client.get_status_if_changed("kettle-001") is None
+
+    assert client.metrics.counter("poll.unchanged", "kettle-001") == 1
+    assert client.metrics.counter("poll.bytes_saved", "kettle-001") == 0
+    received = client.metrics.counter("poll.bytes_received", "kettle-001")
+    assert received == 2 * len(json.dumps(firebase.get("devices/kettle-001/status")))
+
+
+def test_conditional_read_times_out(firebase: FakeFirebase, client: SmarterClient):
+    """Test that a status read stalled on the server ends at its timeout."""
+    firebase.latency = 0.5
+
+    started = time.monotonic()
+    with pytest.raises(Timeout):
+        client.get_status_if_changed("kettle-001", timeout=0.1)
+
+    assert time.monotonic() - started < 0.5
+
+
+def test_polling_delivers_status_changes(firebase: FakeFirebase, client: SmarterClient):
+    """Test that a status poller delivers the status, then only its changes."""
+    events = []
+    changed = threading.Event()
+
+    def on_event(event):
+        events.append(event)
+        if event["data"].get("water_level") == 1:
+            changed.set()
+
+    poller = client.poll_device_status("kettle-001", on_event, 0.01, 0.01)
+    try:
+        # Change the status only once the poller has read it unchanged
+        deadline = time.monotonic() + 5
+        while client.metrics.counter("poll.unchanged", "kettle-001") < 1:
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+        firebase.update("devices/kettle-001/status", {"water_level": 1})
+        assert changed.wait(5)
+    finally:
+        poller.close()
+
+    assert events[0]["event"] == "put"
+    assert events[0]["path"] == "/status"
+    assert len(events) <= 2
+    assert client.metrics.counter("poll.unchanged", "kettle-001") >= 1
+
+
+def test_command_history_trimmed_by_server(
+    firebase: FakeFirebase, client: SmarterClient
+):
+    """Test that only the last instances of a command are downloaded, in order."""
+    for value in range(30):
+        firebase.push("devices/kettle-002/commands/set_region", {"value": value})
+
+    history = client.get_command_history("kettle-002", "set_region", limit=20)
+
+    assert [instance["value"] for instance in history.values()] == list(range(10, 30))
+    assert client.get_command_history("kettle-002", "stop_boil") == {}
+
+
+def test_command_retried_once_stored(firebase: FakeFirebase, client: SmarterClient):
+    """Test that retrying a command whose response was lost stores it once."""
+    firebase.lose_responses(1)
+
+    response = client.send_command("kettle-001", "set_region", {"value": 1})
+
+    instances = firebase.get("devices/kettle-001/commands/set_region")
+    assert list(instances) == ["example", response["name"]]
+    assert firebase.request_counts["PUT"] == 2
+    assert client.metrics.counter("commands.retries", "kettle-001") == 1
+
+
+def test_storage_transfers_in_chunks(firebase: FakeFirebase, tmp_path):
+    """Test that files are uploaded and downloaded in chunks, with progress."""
+    content = bytes(range(256)) * 1000
+    source = tmp_path / "firmware.bin"
+    source.write_bytes(content)
+    storage = SmarterClient(config=firebase.config).app.storage()
+    uploaded = []
+
+    storage.child("firmware", "kettle.bin").put(
+        str(source), chunk_size=64 * 1024, progress=uploaded.append
+    )
+    with io.BytesIO(content) as file_object:
+        storage.child("firmware", "copy.bin").put(file_object)
+    storage.child("firmware", "mapped.bin").put(str(source), use_mmap=True)
+
+    assert firebase.files["firmware/kettle.bin"] == content
+    assert firebase.files["firmware/copy.bin"] == content
+    assert firebase.files["firmware/mapped.bin"] == content
+    assert len(uploaded) == 4
+    assert uploaded[-1].transferred == uploaded[-1].total == len(content)
+
+    target = tmp_path / "download.bin"
+    downloaded = []
+    storage.child("firmware", "kettle.bin").download(
+        "", str(target), chunk_size=64 * 1024, progress=downloaded.append
+    )
+
+    assert target.read_bytes() == content
+    assert downloaded[-1].transferred == len(content)
+    assert downloaded[-1].throughput > 0
+
+
+def test_storage_download_resumed(firebase: FakeFirebase, tmp_path):
+    """Test that an interrupted download is completed with a range request."""
+    content = bytes(range(256)) * 1000
+    firebase.files["logs/kettle.log"] = content
+    target = tmp_path / "kettle.log"
+    target.write_bytes(content[:100_000])
+    storage = SmarterClient(config=firebase.config).app.storage()
+    progress = []
+
+    storage.child("logs", "kettle.log").download(
+        "", str(target), progress=progress.append, resume=True
+    )
+
+    assert target.read_bytes() == content
+    assert progress[0].resumed_from == 100_000
+    assert progress[-1].total == len(content)
+
+    # Resuming a complete file downloads nothing
+    storage.child("logs", "kettle.log").download("", str(target), resume=True)
+    assert target.read_bytes() == content
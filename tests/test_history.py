@@ -0,0 +1,73 @@
+"""Test the recent status samples kept per device."""
+
+import math
+
+import pytest
+from custom_components.smarter.smarter_client.history import StatusHistory
+
+
+def test_samples_kept_up_to_capacity():
+    """Test that the oldest samples are overwritten once the buffer is full."""
+    history = StatusHistory(capacity=4)
+    for second in range(6):
+        history.append({"water_temperature": second}, timestamp=second)
+
+    times, values = history.window("water_temperature", 10, now=5)
+
+    assert len(history) == 4
+    assert list(times) == [2, 3, 4, 5]
+    assert list(values) == [2, 3, 4, 5]
+
+
+def test_status_sampled_once():
+    """Test that the status sampled last is not sampled again."""
+    history = StatusHistory()
+    status = {"water_temperature": 20}
+
+    assert history.append(status)
+    assert not history.append(status)
+    assert history.append(dict(status))
+    assert len(history) == 2
+
+
+def test_window_skips_old_and_missing_values():
+    """Test that a window holds recent samples of the field only."""
+    history = StatusHistory()
+    history.append({"water_temperature": 20}, timestamp=0)
+    history.append({"water_temperature": 30, "water_level": 2}, timestamp=50)
+    history.append({"water_level": 2}, timestamp=60)
+    history.append({"water_temperature": "n/a"}, timestamp=70)
+    history.append({"water_temperature": 40}, timestamp=80)
+
+    times, values = history.window("water_temperature", 60, now=100)
+
+    assert list(times) == [50, 80]
+    assert list(values) == [30, 40]
+
+
+def test_rate_fitted_over_window():
+    """Test that the rate is the slope of the samples in the window."""
+    history = StatusHistory()
+    for second in range(0, 120, 5):
+        # Heating by 0.5 degrees a second, with noise cancelling out in pairs
+        noise = 0.2 if second % 10 else -0.2
+        history.append({"water_temperature": 20 + second / 2 + noise}, timestamp=second)
+
+    assert history.rate("water_temperature", 60, now=115) == pytest.approx(
+        0.5, abs=0.01
+    )
+    assert history.rate("water_temperature", 1, now=115) is None
+    assert history.rate("water_level", 60, now=115) is None
+
+
+def test_time_to_target():
+    """Test that the time to a target is estimated from the rate towards it."""
+    history = StatusHistory()
+    for second in range(0, 60, 10):
+        history.append({"water_temperature": 40 + second}, timestamp=second)
+
+    assert history.time_to("water_temperature", 100, now=50) == pytest.approx(10)
+    assert history.time_to("water_temperature", 90, now=50) == 0
+    assert history.time_to("water_temperature", 20, now=50) is None
+    assert history.time_to("water_temperature", None, now=50) is None
+    assert math.isclose(history.rate("water_temperature", now=50), 1)
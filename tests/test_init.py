@@ -1,10 +1,13 @@
 """Test Smarter Kettle and Coffee integration setup process."""
 
+from unittest.mock import patch
+
 import pytest
-from custom_components.smarter.const import DOMAIN
+from custom_components.smarter.const import CONF_REFRESH_TOKEN, DOMAIN
 from homeassistant.config_entries import ConfigEntryState
 from homeassistant.core import HomeAssistant
 from pytest_homeassistant_custom_component.common import MockConfigEntry
+from requests import HTTPError
 
 
 @pytest.mark.parametrize("init_integration", [(True,)], indirect=True)
@@ -65,3 +68,95 @@ async def test_async_reload_entry(
     # Unload
     await hass.config_entries.async_unload(entry.entry_id)
     await hass.async_block_till_done()
+
+
+@pytest.mark.parametrize("init_integration", [(True,)], indirect=True)
+@pytest.mark.parametrize("bypass_get_data", [{}], indirect=True)
+async def test_stored_refresh_token_skips_password_sign_in(
+    hass: HomeAssistant,
+    init_integration: MockConfigEntry,
+    bypass_get_data,
+    mock_session,
+):
+    """Test that the session is resumed from the stored refresh token."""
+    entry = init_integration
+    hass.config_entries.async_update_entry(
+        entry, data={**entry.data, CONF_REFRESH_TOKEN: "stored_refresh_token"}
+    )
+
+    with (
+        patch(
+            "custom_components.smarter.smarter_hub.SmarterHub.sign_in_with_refresh_token",
+            return_value=mock_session,
+        ) as sign_in_with_refresh_token,
+        patch(
+            "custom_components.smarter.smarter_hub.SmarterHub.sign_in",
+        ) as sign_in,
+    ):
+        await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+
+    assert entry.state == ConfigEntryState.LOADED
+    sign_in_with_refresh_token.assert_called_once_with("stored_refresh_token")
+    sign_in.assert_not_called()
+    assert entry.data[CONF_REFRESH_TOKEN] == mock_session.refresh_token
+
+    await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+
+
+@pytest.mark.parametrize("init_integration", [(True,)], indirect=True)
+@pytest.mark.parametrize("bypass_get_data", [{}], indirect=True)
+async def test_rejected_refresh_token_falls_back_to_password(
+    hass: HomeAssistant,
+    init_integration: MockConfigEntry,
+    bypass_get_data,
+    mock_session,
+):
+    """Test that the password is used when the stored refresh token is rejected."""
+    entry = init_integration
+    hass.config_entries.async_update_entry(
+        entry, data={**entry.data, CONF_REFRESH_TOKEN: "revoked_refresh_token"}
+    )
+
+    with (
+        patch(
+            "custom_components.smarter.smarter_hub.SmarterHub.sign_in_with_refresh_token",
+            side_effect=HTTPError("INVALID_REFRESH_TOKEN"),
+        ),
+        patch(
+            "custom_components.smarter.smarter_hub.SmarterHub.sign_in",
+            return_value=mock_session,
+        ) as sign_in,
+    ):
+        await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+
+    assert entry.state == ConfigEntryState.LOADED
+    sign_in.assert_called_once_with("test_username", "test_password")
+    assert entry.data[CONF_REFRESH_TOKEN] == mock_session.refresh_token
+
+    await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+
+
+@pytest.mark.parametrize("init_integration", [(False,)], indirect=True)
+@pytest.mark.parametrize("bypass_get_data", [{}], indirect=True)
+async def test_rotated_refresh_token_stored_without_reload(
+    hass: HomeAssistant,
+    bypass_get_data,
+    init_integration: MockConfigEntry,
+    mock_session,
+):
+    """Test that a refresh token rotated at runtime is stored in the entry."""
+    entry = init_integration
+    data = hass.data[DOMAIN][entry.entry_id]
+    mock_session.refresh_token = "rotated_refresh_token"
+
+    with patch.object(hass.config_entries, "async_reload") as async_reload:
+        data["hub"].client.session = mock_session
+        data["hub"].client._notify_session()
+        await hass.async_block_till_done()
+
+    assert entry.data[CONF_REFRESH_TOKEN] == "rotated_refresh_token"
+    async_reload.assert_not_called()
@@ -0,0 +1,51 @@
+"""Test the metrics recorded by the Smarter client."""
+
+import pytest
+from custom_components.smarter.smarter_client.domain.smarter_client import (
+    endpoint_name,
+)
+from custom_components.smarter.smarter_client.metrics import Metrics
+
+
+def test_metrics_snapshot_by_key():
+    """Test that counters and timers are reported per key."""
+    metrics = Metrics()
+    kettle = metrics.scope("kettle1")
+
+    kettle.increment("model.events")
+    kettle.increment("model.events")
+    metrics.increment("model.events", "kettle2")
+    with pytest.raises(ValueError), kettle.timer("model.apply"):
+        raise ValueError
+
+    assert metrics.counter("model.events", "kettle1") == 2
+    assert metrics.timer_stats("model.apply", "kettle1")["count"] == 1
+    assert metrics.snapshot("kettle2") == {
+        "counters": {"model.events": {"kettle2": 1}},
+        "timers": {},
+    }
+    assert set(metrics.snapshot()["counters"]["model.events"]) == {
+        "kettle1",
+        "kettle2",
+    }
+
+
+@pytest.mark.parametrize(
+    ("method", "url", "expected"),
+    [
+        ("GET", "https://db.example/users/abc.json?auth=t", "GET /users/*"),
+        (
+            "POST",
+            "https://db.example/devices/abc/commands/start_boil.json?auth=t",
+            "POST /devices/*/commands/start_boil",
+        ),
+        (
+            "POST",
+            "https://auth.example/identitytoolkit/v3/relyingparty/verifyPassword?key=k",
+            "POST verifyPassword",
+        ),
+    ],
+)
+def test_endpoint_name(method: str, url: str, expected: str):
+    """Test that identifiers are removed from endpoint names."""
+    assert endpoint_name(method, url) == expected
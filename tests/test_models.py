@@ -0,0 +1,185 @@
+"""Test the Smarter device model."""
+
+import sys
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+from custom_components.smarter.smarter_client.domain.models import Device
+from custom_components.smarter.smarter_client.metrics import Metrics
+
+EVENTS = 500
+READERS = 4
+
+
+def device_data() -> dict:
+    """Return the data of a device, as read from the database."""
+    return {
+        "commands": {"start_boil": {"example": {"value": 0}}},
+        "settings": {"network_ssid": "0"},
+        "status": {"water_temperature": 0, "boil_temperature": 0},
+    }
+
+
+def make_device() -> Device:
+    """Create a device from data, as read from the database."""
+    client = MagicMock(metrics=Metrics())
+    return Device.from_data(client, device_data(), "kettle")
+
+
+@pytest.fixture
+def switch_often():
+    """Switch threads often, so reads interleave with the events applied."""
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+
+def test_status_read_only():
+    """Test that the status is only replaced by events, never changed in place."""
+    device = make_device()
+    status = device.status
+
+    with pytest.raises(TypeError):
+        status["water_temperature"] = 1
+    with pytest.raises(TypeError):
+        status.update(water_temperature=1)
+    with pytest.raises(TypeError):
+        status.clear()
+
+    device._on_event(
+        {"event": "patch", "path": "/status", "data": {"water_temperature": 1}}
+    )
+
+    assert status["water_temperature"] == 0
+    assert device.status["water_temperature"] == 1
+    assert dict(device.status) == {"water_temperature": 1, "boil_temperature": 0}
+
+
+def test_status_versioned():
+    """Test that every change of the status is published as a new version."""
+    device = make_device()
+    initial = device.status
+
+    assert initial.version == 1
+    assert initial.changed == {"water_temperature", "boil_temperature"}
+
+    device._on_event(
+        {"event": "patch", "path": "/status", "data": {"water_temperature": 1}}
+    )
+    device._on_event({"event": "put", "path": "/settings/network_ssid", "data": "1"})
+    device._on_event({"event": "put", "path": "/status/boil_temperature", "data": None})
+
+    assert device.settings.network_ssid == "1"
+    assert device.status.version == 3
+    assert device.status.changed == {"boil_temperature"}
+    assert device.status.timestamp >= initial.timestamp
+
+
+def test_status_kept_when_unchanged():
+    """Test that events leaving the status as it was keep the same version."""
+    device = make_device()
+    status = device.status
+
+    device._on_event(
+        {"event": "patch", "path": "/status", "data": {"water_temperature": 0}}
+    )
+    device._on_event(
+        {"event": "patch", "path": "/commands/start_boil", "data": {"-id": {}}}
+    )
+
+    assert device.status is status
+    assert device.status.version == 1
+    assert "-id" in device.commands["start_boil"].instances
+
+
+def test_fetch_published_under_event_lock():
+    """Test that fetched data is published as events are, under the event lock."""
+    fetched = threading.Event()
+
+    def get_device(_identifier: str) -> dict:
+        fetched.set()
+        return device_data()
+
+    client = MagicMock(metrics=Metrics(), get_device=get_device)
+    device = Device.from_id(client, "kettle")
+    thread = threading.Thread(target=device.fetch)
+
+    with device._event_lock:
+        thread.start()
+        assert fetched.wait(5)
+        thread.join(0.05)
+        # Waiting for the event being applied
+        assert thread.is_alive()
+        assert device.is_stub
+    thread.join(5)
+
+    assert not device.is_stub
+    assert device.status["water_temperature"] == 0
+    assert device.settings.network_ssid == "0"
+
+
+def test_concurrent_events_and_reads(switch_often):
+    """Test that readers never see partial state while events are applied."""
+    device = make_device()
+    done = threading.Event()
+    errors = []
+
+    def stream() -> None:
+        # Each event changes the status and settings together
+        for value in range(1, EVENTS + 1):
+            device._on_event(
+                {
+                    "event": "patch",
+                    "path": "/",
+                    "data": {
+                        "settings": {"network_ssid": str(value)},
+                        "status": {
+                            "water_temperature": value,
+                            "boil_temperature": value,
+                        },
+                    },
+                }
+            )
+
+    def commands() -> None:
+        for value in range(1, EVENTS + 1):
+            device._on_event(
+                {
+                    "event": "patch",
+                    "path": "/commands/start_boil",
+                    "data": {"example": {"value": value}},
+                }
+            )
+
+    def read() -> None:
+        while not done.is_set():
+            status = device.status
+            state = device.state
+            if len(status) != 2:
+                errors.append(f"partial status {dict(status)}")
+            if status["water_temperature"] != status["boil_temperature"]:
+                errors.append(f"torn status {dict(status)}")
+            if state.settings.network_ssid != str(state.status["water_temperature"]):
+                errors.append("settings and status of different events")
+            if "start_boil" not in state.commands:
+                errors.append("commands missing")
+
+    readers = [threading.Thread(target=read) for _ in range(READERS)]
+    writers = [threading.Thread(target=stream), threading.Thread(target=commands)]
+    for thread in readers + writers:
+        thread.start()
+    for thread in writers:
+        thread.join()
+    done.set()
+    for thread in readers:
+        thread.join()
+
+    assert errors == []
+    assert device.status["water_temperature"] == EVENTS
+    # No event was lost to an event applied concurrently
+    assert device.commands["start_boil"].example == {"value": EVENTS}
+    assert device.client.metrics.counter("model.errors", "kettle") == 0
+    # One version per event changing the status, none of them skipped
+    assert device.status.version == EVENTS + 1
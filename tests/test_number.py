@@ -63,3 +63,5 @@ async def test_number_services(
     handler = getattr(device, f"set_{key}")
     assert handler.called
     assert handler.call_args == call(value)
+    # Shown before the device reports the new value
+    assert entity.native_value == value
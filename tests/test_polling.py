@@ -0,0 +1,69 @@
+"""Test polling of device status."""
+
+import threading
+import time
+from unittest.mock import MagicMock
+
+from custom_components.smarter.smarter_client import polling
+from custom_components.smarter.smarter_client.metrics import Metrics
+from custom_components.smarter.smarter_client.polling import StatusPoller
+
+
+def test_interval_adapts_to_device_state():
+    """Test that an active device is polled faster than an idle one."""
+    client = MagicMock(metrics=Metrics())
+    client.get_status_if_changed.side_effect = [
+        {"state": "Boiling"},
+        None,
+        {"state": "Ready"},
+        Exception("offline"),
+    ]
+    callback = MagicMock()
+    intervals = []
+    stopped = threading.Event()
+
+    class Poller(StatusPoller):
+        @property
+        def interval(self):
+            value = super().interval
+            intervals.append(value)
+            if len(intervals) == 4:
+                self._stop.set()
+                stopped.set()
+            return 0
+
+    poller = Poller(client, "kettle", callback, 1, 30)
+    assert stopped.wait(5)
+    poller.close()
+
+    assert intervals == [1, 1, 30, 30]
+    assert [call.args[0]["data"] for call in callback.call_args_list] == [
+        {"state": "Boiling"},
+        {"state": "Ready"},
+    ]
+    assert client.metrics.counter("poll.errors", "kettle") == 1
+
+
+def test_close_does_not_wait_for_stalled_read(monkeypatch):
+    """Test that closing a poller returns while a read is still in progress."""
+    monkeypatch.setattr(polling, "CLOSE_TIMEOUT", 0.05)
+    reading = threading.Event()
+    release = threading.Event()
+
+    def stalled_read(_device_id):
+        reading.set()
+        release.wait(5)
+
+    client = MagicMock(metrics=Metrics())
+    client.get_status_if_changed.side_effect = stalled_read
+    poller = StatusPoller(client, "kettle", MagicMock())
+    assert reading.wait(5)
+
+    started = time.monotonic()
+    poller.close()
+    assert time.monotonic() - started < 1
+    assert poller.thread.is_alive()
+
+    release.set()
+    poller.thread.join(5)
+    assert not poller.thread.is_alive()
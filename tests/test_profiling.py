@@ -0,0 +1,65 @@
+"""Test profiling of the threads handling device events."""
+
+import os
+import threading
+
+import pytest
+from custom_components.smarter.const import (
+    DOMAIN,
+    SERVICE_ATTR_DURATION,
+    SERVICE_ATTR_INTERVAL,
+    SERVICE_PROFILE,
+)
+from custom_components.smarter.smarter_client.profiling import SamplingProfiler
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+
+def _busy_worker(stop: threading.Event):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_sampling_profiler_samples_threads(tmp_path):
+    """Test that the stacks of the given threads are sampled and written out."""
+    stop = threading.Event()
+    worker = threading.Thread(target=_busy_worker, args=(stop,))
+    worker.start()
+    try:
+        profiler = SamplingProfiler(lambda: {"kettle1 stream": worker}, 0.001)
+        profiler.start(duration=10)
+        while profiler.result().sample_count < 20:
+            stop.wait(0.01)
+        result = profiler.stop()
+    finally:
+        stop.set()
+        worker.join()
+
+    assert not profiler.active
+    functions = [name for name, _, _ in result.functions()]
+    assert any(name.startswith("_busy_worker ") for name in functions)
+
+    path = tmp_path / "profile.folded"
+    result.write_collapsed(path)
+    assert path.read_text().startswith("kettle1 stream;")
+
+
+@pytest.mark.parametrize("init_integration", [(False,)], indirect=True)
+@pytest.mark.parametrize("bypass_get_data", [{}], indirect=True)
+async def test_profile_service(
+    hass: HomeAssistant,
+    bypass_get_data,
+    init_integration: MockConfigEntry,
+):
+    """Test that the profile service writes a profile to the config directory."""
+    response = await hass.services.async_call(
+        DOMAIN,
+        SERVICE_PROFILE,
+        {SERVICE_ATTR_DURATION: 1, SERVICE_ATTR_INTERVAL: 10},
+        blocking=True,
+        return_response=True,
+    )
+
+    assert response["path"].startswith(hass.config.config_dir)
+    assert os.path.exists(response["path"])
+    os.remove(response["path"])
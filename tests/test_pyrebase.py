@@ -0,0 +1,135 @@
+"""Test the vendored pyrebase database client."""
+
+import threading
+from unittest.mock import MagicMock, patch
+
+import pytest
+from custom_components.smarter.pyrebase.pyrebase import Database, PushIdGenerator
+
+
+def make_database(payload) -> Database:
+    """Return a database answering every read with `payload`."""
+    session = MagicMock()
+    session.get.return_value.json.return_value = payload
+    return Database(None, "api-key", "https://example.firebaseio.com", session)
+
+
+def test_list_response_keyed_by_position():
+    """Test that list items are keyed by their position, duplicates included."""
+    payload = ["Ready", "Boiling", "Ready"]
+
+    response = make_database(payload).child("states").get("token")
+
+    assert response.val() is payload
+    assert [(pyre.key(), pyre.val()) for pyre in response.each()] == [
+        (0, "Ready"),
+        (1, "Boiling"),
+        (2, "Ready"),
+    ]
+
+
+def test_dict_response_returned_as_decoded():
+    """Test that a dict response is returned without being rebuilt."""
+    payload = {"status": {"state": "Ready"}, "settings": {"network": "network0"}}
+
+    response = make_database(payload).child("devices").child("kettle0").get("token")
+
+    assert response.val() is payload
+    assert [pyre.key() for pyre in response.each()] == ["status", "settings"]
+    assert response[0].val() == {"state": "Ready"}
+
+
+def test_items_wrapped_on_access():
+    """Test that the items of a response are only wrapped as they are accessed."""
+    payload = {f"-instance{index}": {"value": index} for index in range(3)}
+
+    response = make_database(payload).child("commands").get("token")
+    items = response.each()
+
+    assert response.raw() is payload
+    assert len(items) == 3
+    assert items[-1].key() == "-instance2"
+    assert [pyre.val() for pyre in items[1:]] == [{"value": 1}, {"value": 2}]
+
+
+def test_dict_items_indexed_by_position():
+    """Test that every item of a dict response can be read by its position."""
+    payload = {f"-instance{index}": {"value": index} for index in range(1000)}
+
+    items = make_database(payload).child("commands").get("token").each()
+
+    assert [items[index].key() for index in range(len(items))] == list(payload)
+    assert items[-1000].val() == {"value": 0}
+    with pytest.raises(IndexError):
+        items[1000]
+
+
+def test_ordered_response_sorted_like_firebase():
+    """Test that ordered children are sorted by type, then value, then key."""
+    payload = {
+        "c": {"temperature": 100},
+        "a": {"temperature": "hot"},
+        "d": {},
+        "b": {"temperature": 40},
+        "e": {"temperature": 40},
+    }
+
+    response = (
+        make_database(payload)
+        .child("presets")
+        .order_by_child("temperature")
+        .limit_to_last(5)
+        .get("token")
+    )
+
+    assert list(response.raw()) == ["d", "b", "e", "c", "a"]
+
+
+def test_unbounded_query_warned_once(caplog: pytest.LogCaptureFixture):
+    """Test that a query downloading a whole subtree is warned about once."""
+    database = make_database({})
+
+    for _ in range(2):
+        database.child("devices", "kettle0", "commands", "start_boil").order_by_key()
+        database.get("token")
+    database.child("devices", "kettle0", "commands", "start_boil").order_by_key()
+    database.limit_to_last(20).get("token")
+
+    assert len(caplog.records) == 1
+    assert "without a limit or range" in caplog.text
+
+
+def test_push_ids_strictly_increasing_across_threads():
+    """Test that push IDs generated concurrently are unique and increasing."""
+    generate = PushIdGenerator()
+    batches: list[list[str]] = [[] for _ in range(4)]
+
+    def generate_batch(batch: list[str]) -> None:
+        batch.extend(generate() for _ in range(1000))
+
+    threads = [
+        threading.Thread(target=generate_batch, args=(batch,)) for batch in batches
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    ids = [push_id for batch in batches for push_id in batch]
+    assert all(len(push_id) == 20 for push_id in ids)
+    assert len(set(ids)) == len(ids)
+    assert all(batch == sorted(batch) for batch in batches)
+
+
+def test_push_ids_increasing_while_clock_behind():
+    """Test that push IDs keep increasing when the clock goes back."""
+    generate = PushIdGenerator()
+
+    with patch("time.time", return_value=1_700_000_000.0):
+        first = generate()
+        same_millisecond = generate()
+    with patch("time.time", return_value=1_600_000_000.0):
+        clock_behind = generate()
+
+    assert first < same_millisecond < clock_behind
+    assert clock_behind[:8] == first[:8]
@@ -0,0 +1,66 @@
+"""Test recording and replay of device event streams."""
+
+import time
+
+from custom_components.smarter.smarter_client.recording import (
+    StreamRecorder,
+    read_recording,
+    replay,
+)
+
+
+def test_recording_round_trip(tmp_path):
+    """Test that recorded events are read back as stream handlers receive them."""
+    path = str(tmp_path / "kettle.jsonl")
+    recorder = StreamRecorder(path)
+    recorder.record("put", '{"path": "/", "data": {"status": {"state": "Ready"}}}')
+    recorder.record("patch", '{"path": "/status", "data": {"state": "Boiling"}}')
+    recorder.close()
+    recorder.record("patch", '{"path": "/status", "data": {"state": "Ready"}}')
+    with open(path, "a", encoding="utf-8") as file:
+        file.write('[1.0,"patch",{"path": "/sta')
+
+    events = [event for _, event in read_recording(path)]
+
+    assert events == [
+        {"event": "put", "path": "/", "data": {"status": {"state": "Ready"}}},
+        {"event": "patch", "path": "/status", "data": {"state": "Boiling"}},
+    ]
+
+
+def test_recording_events_without_object_data(tmp_path):
+    """Test that events with data other than an object are read back too."""
+    path = tmp_path / "kettle.jsonl"
+    path.write_text(
+        '[1.0,"cancel","permission denied"]\n'
+        '[2.0,"keep-alive",null]\n'
+        "[3.0]\n"
+        "4.0\n"
+        '[5.0,"patch",{"path":"/status","data":{"state":"Boiling"}}]\n'
+    )
+
+    events = [event for _, event in read_recording(str(path))]
+
+    assert events == [
+        {"event": "cancel", "data": "permission denied"},
+        {"event": "keep-alive", "data": None},
+        {"event": "patch", "path": "/status", "data": {"state": "Boiling"}},
+    ]
+
+
+def test_replay_keeps_time_between_events(tmp_path):
+    """Test that replay waits between events, scaled by the replay speed."""
+    path = tmp_path / "kettle.jsonl"
+    path.write_text(
+        '[100.0,"put",{"path":"/","data":{}}]\n'
+        '[100.2,"patch",{"path":"/status","data":{"state":"Boiling"}}]\n'
+    )
+    received = []
+
+    started = time.monotonic()
+    assert replay(str(path), received.append, speed=2) == 2
+    elapsed = time.monotonic() - started
+
+    assert 0.1 <= elapsed < 0.2
+    assert [event["event"] for event in received] == ["put", "patch"]
+    assert replay(str(path), received.append, speed=0) == 2
@@ -0,0 +1,53 @@
+"""Test retries of requests failing with transient errors."""
+
+from unittest.mock import MagicMock
+
+import pytest
+import requests
+from custom_components.smarter.smarter_client.retry import (
+    call_with_retries,
+    is_transient_error,
+)
+
+
+def http_error(status_code: int) -> requests.HTTPError:
+    """Return an error as raised by pyrebase for a response status."""
+    response = requests.Response()
+    response.status_code = status_code
+    return requests.HTTPError(requests.HTTPError(response=response), "body")
+
+
+@pytest.mark.parametrize(
+    ("error", "transient"),
+    [
+        (requests.ConnectionError(), True),
+        (requests.Timeout(), True),
+        (http_error(503), True),
+        (http_error(429), True),
+        (http_error(401), False),
+        (KeyError("start_boil"), False),
+    ],
+)
+def test_transient_errors(error, transient):
+    """Test which errors are retried."""
+    assert is_transient_error(error) is transient
+
+
+def test_transient_errors_retried():
+    """Test that a call is retried after transient errors only."""
+    on_retry = MagicMock()
+
+    func = MagicMock(side_effect=[requests.ConnectionError(), http_error(503), "ok"])
+    assert call_with_retries(func, retries=3, backoff=0, on_retry=on_retry) == "ok"
+    assert func.call_count == 3
+    assert [call.args[0] for call in on_retry.call_args_list] == [1, 2]
+
+    func = MagicMock(side_effect=http_error(401))
+    with pytest.raises(requests.HTTPError):
+        call_with_retries(func, retries=3, backoff=0)
+    assert func.call_count == 1
+
+    func = MagicMock(side_effect=requests.ConnectionError())
+    with pytest.raises(requests.ConnectionError):
+        call_with_retries(func, retries=3, backoff=0)
+    assert func.call_count == 4
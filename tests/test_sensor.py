@@ -1,7 +1,8 @@
 """Test Smarter Kettle and Coffee integration sensors."""
 
+import time
 from types import SimpleNamespace
-from unittest.mock import call
+from unittest.mock import ANY, call, patch
 
 import pytest
 from custom_components.smarter.const import (
@@ -13,10 +14,20 @@ from custom_components.smarter.const import (
     SERVICE_QUICK_BOIL,
     SERVICE_SEND_COMMAND,
 )
-from custom_components.smarter.sensor import SENSOR_TYPES, SmarterSensor
-from homeassistant.const import ATTR_ENTITY_ID
+from custom_components.smarter.sensor import (
+    HISTORY_SENSOR_TYPES,
+    SENSOR_TYPES,
+    SmarterSensor,
+)
+from custom_components.smarter.smarter_client.history import RATE_WINDOW
+from homeassistant.components.sensor import SCAN_INTERVAL
+from homeassistant.const import ATTR_ENTITY_ID, STATE_UNKNOWN
 from homeassistant.core import HomeAssistant
-from pytest_homeassistant_custom_component.common import MockConfigEntry
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
 
 from .helpers import generate_unique_id, get_entity, get_unique_id
 
@@ -101,14 +112,17 @@ async def test_sensor_services(
         service_data.data[SERVICE_ATTR_COMMAND_NAME],
         service_data.data[service_data.data_key],
     )
-    assert result == {entity.entity_id: "executed"}
+    assert result == {entity.entity_id: {"result": "executed", "latency_ms": ANY}}
 
 
 @pytest.mark.parametrize("init_integration", [(False,)], indirect=True)
 @pytest.mark.parametrize("bypass_get_data", [{}], indirect=True)
 @pytest.mark.parametrize(
     "expected_unique_id",
-    [generate_unique_id(description.key) for description in SENSOR_TYPES],
+    [
+        generate_unique_id(description.key)
+        for description in SENSOR_TYPES + HISTORY_SENSOR_TYPES
+    ],
     indirect=False,
 )
 def test_expected_sensors(
@@ -120,3 +134,139 @@ def test_expected_sensors(
     """Test that the expected sensor entities are created."""
     entity_id = get_unique_id(hass, expected_unique_id)
     assert entity_id is not None, f"sensor {expected_unique_id} should exist"
+
+
+@pytest.mark.parametrize("init_integration", [(False,)], indirect=True)
+@pytest.mark.parametrize("bypass_get_data", [{}], indirect=True)
+async def test_sensor_value_cached_until_status_update(
+    hass: HomeAssistant,
+    bypass_get_data,
+    init_integration: MockConfigEntry,
+):
+    """Test that sensor state is recomputed only when the coordinator publishes."""
+    entity: SmarterSensor = get_entity(hass, generate_unique_id("water_temperature"))
+    device = entity.device
+
+    with patch.dict(device.status, {"water_temperature": 42.0}):
+        assert entity.native_value == 80.0
+
+        entity.coordinator._on_status(device.id, device.status)
+        await hass.async_block_till_done()
+
+        assert entity.native_value == 42.0
+
+
+@pytest.mark.parametrize("init_integration", [(False,)], indirect=True)
+@pytest.mark.parametrize("bypass_get_data", [{}], indirect=True)
+async def test_history_sensors_computed_from_samples(
+    hass: HomeAssistant,
+    bypass_get_data,
+    init_integration: MockConfigEntry,
+):
+    """Test that the heating rate and time to target follow the status samples."""
+    rate: SmarterSensor = get_entity(hass, generate_unique_id("heating_rate"))
+    time_to_target: SmarterSensor = get_entity(
+        hass, generate_unique_id("time_to_target")
+    )
+    device = rate.device
+    assert rate.native_value is None
+
+    # Heating by 0.5 degrees a second up to the reported 80 degrees
+    now = time.monotonic()
+    for seconds_ago in (20, 10, 0):
+        device.history.append(
+            {"water_temperature": 80 - seconds_ago / 2}, timestamp=now - seconds_ago
+        )
+    rate.coordinator._on_status(device.id, device.status)
+    await hass.async_block_till_done()
+
+    assert rate.native_value == pytest.approx(30)
+    # 19 degrees left to the target of 99 degrees
+    assert time_to_target.native_value == pytest.approx(38)
+
+
+@pytest.mark.parametrize("init_integration", [(False,)], indirect=True)
+@pytest.mark.parametrize("bypass_get_data", [{}], indirect=True)
+async def test_history_sensors_clear_once_samples_age_out(
+    hass: HomeAssistant,
+    bypass_get_data,
+    init_integration: MockConfigEntry,
+):
+    """Test that the statistics clear when the device stops reporting."""
+    rate: SmarterSensor = get_entity(hass, generate_unique_id("heating_rate"))
+    time_to_target: SmarterSensor = get_entity(
+        hass, generate_unique_id("time_to_target")
+    )
+    device = rate.device
+
+    now = time.monotonic()
+    for seconds_ago in (20, 10, 0):
+        device.history.append(
+            {"water_temperature": 80 - seconds_ago / 2}, timestamp=now - seconds_ago
+        )
+    rate.coordinator._on_status(device.id, device.status)
+    await hass.async_block_till_done()
+    assert rate.native_value == pytest.approx(30)
+
+    # No status published since, the samples are older than the rate window
+    later = SimpleNamespace(monotonic=lambda: now + RATE_WINDOW + 1)
+    with patch("custom_components.smarter.smarter_client.history.time", later):
+        async_fire_time_changed(hass, dt_util.utcnow() + SCAN_INTERVAL)
+        await hass.async_block_till_done()
+
+    assert rate.native_value is None
+    assert time_to_target.native_value is None
+    assert hass.states.get(rate.entity_id).state == STATE_UNKNOWN
+
+
+@pytest.mark.parametrize("init_integration", [(False,)], indirect=True)
+@pytest.mark.parametrize("bypass_get_data", [{}], indirect=True)
+async def test_send_command_reports_device_errors(
+    hass: HomeAssistant,
+    bypass_get_data,
+    init_integration: MockConfigEntry,
+):
+    """Test that a failing device is reported in the service response."""
+    entity: SmarterSensor = get_entity(hass, generate_unique_id(None))
+    entity.device.send_command.side_effect = KeyError("unknown")
+
+    result = await hass.services.async_call(
+        DOMAIN,
+        SERVICE_SEND_COMMAND,
+        service_data={
+            ATTR_ENTITY_ID: entity.entity_id,
+            SERVICE_ATTR_COMMAND_NAME: "unknown",
+        },
+        blocking=True,
+        return_response=True,
+    )
+
+    assert result == {
+        entity.entity_id: {
+            "error": "Device does not support command 'unknown'",
+            "latency_ms": ANY,
+        }
+    }
+
+
+@pytest.mark.parametrize("init_integration", [(False,)], indirect=True)
+@pytest.mark.parametrize("bypass_get_data", [{}], indirect=True)
+async def test_send_command_skips_unsupported_targets(
+    hass: HomeAssistant,
+    bypass_get_data,
+    init_integration: MockConfigEntry,
+):
+    """Test that commands are only sent to entities supporting the services."""
+    entity: SmarterSensor = get_entity(hass, generate_unique_id(None))
+
+    with patch.object(entity, "_attr_supported_features", 0):
+        result = await hass.services.async_call(
+            DOMAIN,
+            SERVICE_QUICK_BOIL,
+            service_data={ATTR_ENTITY_ID: entity.entity_id},
+            blocking=True,
+            return_response=True,
+        )
+
+    assert result == {}
+    entity.device.send_command.assert_not_called()
@@ -0,0 +1,53 @@
+"""Test the Smarter hub facade."""
+
+import pytest
+from custom_components.smarter.const import DOMAIN
+from custom_components.smarter.smarter_hub import DeviceNotFoundError, SmarterHub
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import device_registry as dr
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from .const import MOCK_DEVICE_ID
+
+
+@pytest.mark.parametrize("init_integration", [(False,)], indirect=True)
+@pytest.mark.parametrize("bypass_get_data", [{}], indirect=True)
+async def test_find_device(
+    hass: HomeAssistant,
+    bypass_get_data,
+    init_integration: MockConfigEntry,
+):
+    """Test device lookup by Smarter identifier and device registry id."""
+    entry = init_integration
+    hub: SmarterHub = hass.data[DOMAIN][entry.entry_id]["hub"]
+    registry_device = dr.async_get(hass).async_get_device(
+        identifiers={(DOMAIN, MOCK_DEVICE_ID)}
+    )
+
+    config_entry_id, device = hub.find_device(MOCK_DEVICE_ID)
+    assert config_entry_id == entry.entry_id
+    assert device.id == MOCK_DEVICE_ID
+
+    assert hub.find_device(registry_device.id) == (entry.entry_id, device)
+
+    with pytest.raises(DeviceNotFoundError):
+        hub.find_device("unknown")
+
+
+@pytest.mark.parametrize("init_integration", [(False,)], indirect=True)
+@pytest.mark.parametrize("bypass_get_data", [{}], indirect=True)
+async def test_remove_device(
+    hass: HomeAssistant,
+    bypass_get_data,
+    init_integration: MockConfigEntry,
+):
+    """Test that removed devices are dropped from the index."""
+    entry = init_integration
+    hub: SmarterHub = hass.data[DOMAIN][entry.entry_id]["hub"]
+
+    device = hub.remove_device(MOCK_DEVICE_ID, entry.entry_id)
+
+    assert device.id == MOCK_DEVICE_ID
+    assert device not in hass.data[DOMAIN][entry.entry_id]["devices"]
+    with pytest.raises(DeviceNotFoundError):
+        hub.find_device(MOCK_DEVICE_ID)
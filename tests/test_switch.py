@@ -1,15 +1,20 @@
 """Test Smarter Kettle and Coffee integration switches."""
 
 from types import SimpleNamespace
-from unittest.mock import call
+from unittest.mock import call, patch
 
 import pytest
+from custom_components.smarter.const import OPTIMISTIC_TIMEOUT
 from custom_components.smarter.sensor import SmarterSensor
 from custom_components.smarter.switch import SWITCH_TYPES
 from homeassistant.components.switch import SERVICE_TURN_OFF, SERVICE_TURN_ON
-from homeassistant.const import ATTR_ENTITY_ID, Platform
+from homeassistant.const import ATTR_ENTITY_ID, STATE_OFF, STATE_ON, Platform
 from homeassistant.core import HomeAssistant
-from pytest_homeassistant_custom_component.common import MockConfigEntry
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
 
 from .helpers import generate_unique_id, get_entity, get_unique_id
 
@@ -85,3 +90,63 @@ async def test_switch_services(
         service_data.off_command,
         True,
     )
+
+
+@pytest.mark.parametrize("bypass_get_data", [{}], indirect=True)
+@pytest.mark.parametrize("init_integration", [(False,)], indirect=True)
+async def test_switch_optimistic_until_confirmed(
+    hass: HomeAssistant,
+    bypass_get_data,
+    init_integration: MockConfigEntry,
+):
+    """Test that the switch reflects a command before the device confirms it."""
+    entity = get_entity(hass, generate_unique_id("start_boil"), Platform.SWITCH)
+    device = entity.device
+
+    await hass.services.async_call(
+        Platform.SWITCH,
+        SERVICE_TURN_ON,
+        service_data={ATTR_ENTITY_ID: entity.entity_id},
+        blocking=True,
+    )
+    assert hass.states.get(entity.entity_id).state == STATE_ON
+
+    with patch.dict(device.status, {"state": "Boiling"}):
+        entity.coordinator._on_status(device.id, device.status)
+        await hass.async_block_till_done()
+
+        async_fire_time_changed(hass, dt_util.utcnow() + OPTIMISTIC_TIMEOUT)
+        await hass.async_block_till_done()
+
+        assert hass.states.get(entity.entity_id).state == STATE_ON
+
+
+@pytest.mark.parametrize("bypass_get_data", [{}], indirect=True)
+@pytest.mark.parametrize("init_integration", [(False,)], indirect=True)
+async def test_switch_optimistic_rolled_back(
+    hass: HomeAssistant,
+    bypass_get_data,
+    init_integration: MockConfigEntry,
+):
+    """Test that the switch rolls back when a command fails or is not confirmed."""
+    entity = get_entity(hass, generate_unique_id("start_boil"), Platform.SWITCH)
+    device = entity.device
+    service_data = {ATTR_ENTITY_ID: entity.entity_id}
+
+    device.send_command.side_effect = Exception("offline")
+    with pytest.raises(Exception, match="offline"):
+        await hass.services.async_call(
+            Platform.SWITCH, SERVICE_TURN_ON, service_data, blocking=True
+        )
+    assert hass.states.get(entity.entity_id).state == STATE_OFF
+
+    device.send_command.side_effect = None
+    await hass.services.async_call(
+        Platform.SWITCH, SERVICE_TURN_ON, service_data, blocking=True
+    )
+    assert hass.states.get(entity.entity_id).state == STATE_ON
+
+    async_fire_time_changed(hass, dt_util.utcnow() + OPTIMISTIC_TIMEOUT)
+    await hass.async_block_till_done()
+
+    assert hass.states.get(entity.entity_id).state == STATE_OFF